@@ -1,42 +1,985 @@
-from fastapi import FastAPI, HTTPException, File, UploadFile, Form
+from fastapi import FastAPI, HTTPException, File, UploadFile, Form, Query, Request, Body, Depends, Header, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import iterate_in_threadpool, run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from pydantic import BaseModel, ValidationError
+from starlette.routing import Match
 from src.backend.models.detection_request import DetectionRequest
 from src.backend.models.detection_response import DetectionResponse
+from src.backend.models.batch_detection_item import BatchDetectionItem
+from src.backend.models.batch_detection_response import BatchDetectionResponse
+from src.backend.models.batching_stats import BatchingStats
+from src.backend.models.cache_stats import CacheStats
+from src.backend.models.model_stats import ModelStats
+from src.backend.models.routing_stats import RoutingStats
+from src.backend.models.admission_stats import AdmissionStats
+from src.backend.models.request_priority import RequestPriority
+from src.backend.models.motion_stats import MotionStats
+from src.backend.models.startup_status import StartupStatus
+from src.backend.models.tracking_stats import TrackingStats
+from src.backend.models.frame_detection import FrameDetection
+from src.backend.models.job_request import JobRequest
+from src.backend.models.job_spec import JobSpec
+from src.backend.models.job_status import JobStatus
 from src.backend.models.device_type import DeviceType
-from src.backend.services.human_detection_service import HumanDetectionService
-from src.backend.config import settings
-import base64
-from typing import Optional
+from src.backend.models.inference_executor import InferenceExecutor
+from src.backend.models.yolo_model_size import YoloModelSize
+from src.backend.models.response_format import ResponseFormat
+from src.backend.models.detection_options import DetectionOptions
+from src.backend.services.human_detection_service import HumanDetectionService, ImageInput, DetectionTask
+from src.backend.services.admission import (
+    AdmissionController,
+    AdmissionError,
+    AdmissionTicket,
+    RateLimit,
+    request_deadline
+)
+from src.backend.services.batch_scheduler import BatchScheduler
+from src.backend.services.device_router import DeviceRouter
+from src.backend.services.cpu_affinity import set_process_threads
+from src.backend.services.frame_stream import FrameStream, VideoFrameReader, VideoTooLargeError
+from src.backend.services.image_decoding import ImageTooLargeError, check_size
+from src.backend.services.job_queue import ArchiveTooLargeError, JobManager, JobNotFoundError
+from src.backend.services.motion_gate import MotionGate, MotionGateRegistry, encoded_thumbnail, frame_thumbnail
+from src.backend.services.result_cache import create_result_cache
+from src.backend.services.response_encoding import encode_response, negotiate_format
+from src.backend.services.shared_inference import SharedInferenceClient
+from src.backend.services.startup import StartupTracker, warm_up, warmup_plan
+from src.backend.services.tracker import StreamTracker, TrackerRegistry
+from src.backend.services.metrics import (
+    REQUESTS_IN_FLIGHT,
+    REQUEST_ERRORS,
+    StageTimer,
+    counter_family,
+    gauge_family,
+    labeled_counter_family,
+    optional_stage,
+    register_collector
+)
+from src.backend.services.inference_pool import (
+    InferencePool,
+    InferencePoolFullError,
+    init_process_worker,
+    detect_in_process_worker,
+    detect_batch_in_process_worker,
+    detect_many_in_process_worker,
+    warm_up_process_worker
+)
+from src.backend.config import settings, CPU_THREADS_MIN, CPU_THREADS_MAX, STREAM_ID_MAX_LENGTH
+from collections import Counter
+from contextlib import AsyncExitStack, ExitStack, asynccontextmanager, contextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, BinaryIO, Dict, Hashable, Iterator, List, Optional, Tuple, Union
+import asyncio
+import json
+import logging
+import numpy as np
+import os
+import tempfile
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+# How long a worker waits at startup for the shared inference server to come up and warm up.
+SHARED_SERVER_WAIT_SECONDS = 600.0
+
+startup = StartupTracker()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.warmup_enabled:
+        threading.Thread(target=_warm_up, name="warmup", daemon=True).start()
+    else:
+        startup.mark_ready()
+    if settings.jobs_enabled:
+        job_manager.start()
+    yield
+    job_manager.shutdown()
+    inference_pool.shutdown()
+    if batch_scheduler is not None:
+        batch_scheduler.shutdown()
+    if shared_client is not None:
+        shared_client.close()
+
 
 app = FastAPI(
     title="Human Detection API", 
     version="1.0.0",
     response_model_by_alias=True,
-    root_path=settings.root_path
+    root_path=settings.root_path,
+    lifespan=lifespan
+)
+
+service_options: Dict[str, Any] = {
+    "model_size": settings.model_size,
+    "confidence_threshold": settings.confidence_threshold,
+    "supported_devices": settings.supported_devices,
+    "backend": settings.inference_backend,
+    "int8": settings.inference_int8,
+    "model_dir": settings.model_dir,
+    "int8_data": settings.int8_calibration_data,
+    "max_loaded_models": settings.max_loaded_models,
+    "allowed_model_sizes": settings.allowed_model_sizes,
+    "reduced_decode": settings.reduced_decode,
+    "precision": settings.inference_precision,
+    "channels_last": settings.inference_channels_last,
+    "compile_model": settings.inference_compile,
+    "max_image_bytes": settings.image_max_bytes,
+    "max_image_pixels": settings.image_max_pixels,
+    # Models are loaded by the warm-up after the server starts, or on first request.
+    "preload": False
+}
+
+set_process_threads(settings.cpu_threads)
+with startup.phase("service"):
+    detection_service = HumanDetectionService(**service_options, result_cache=create_result_cache(settings))
+
+
+
+def _new_motion_gate() -> MotionGate:
+    return MotionGate(
+        pixel_threshold=settings.motion_pixel_threshold,
+        min_changed_fraction=settings.motion_min_changed_fraction,
+        refresh_frames=settings.motion_refresh_frames,
+        refresh_seconds=settings.motion_refresh_seconds
+    )
+
+
+motion_gates = MotionGateRegistry(
+    _new_motion_gate,
+    max_streams=settings.motion_max_streams,
+    ttl_seconds=settings.motion_stream_ttl_seconds
 )
 
-detection_service = HumanDetectionService(
-    model_size=settings.model_size,
-    confidence_threshold=settings.confidence_threshold,
-    supported_devices=settings.supported_devices
+
+def _new_tracker() -> StreamTracker:
+    return StreamTracker(
+        detect_every=settings.tracking_detect_every,
+        max_lost_frames=settings.tracking_max_lost_frames
+    )
+
+
+trackers = TrackerRegistry(
+    _new_tracker,
+    max_streams=settings.tracking_max_streams,
+    ttl_seconds=settings.tracking_stream_ttl_seconds
+)
+
+device_router = DeviceRouter(
+    lambda: detection_service.available_devices,
+    spill_queue_depth=settings.routing_spill_queue_depth,
+    smoothing=settings.routing_latency_smoothing
+)
+
+# HTTP detections wait here in priority order rather than in the inference pool's FIFO queue.
+admission = AdmissionController(
+    max_concurrent=settings.inference_workers,
+    max_queued=settings.inference_queue_size,
+    limits={
+        RequestPriority.INTERACTIVE: RateLimit(settings.admission_rate_per_second, settings.admission_burst),
+        RequestPriority.BULK: RateLimit(settings.admission_bulk_rate_per_second, settings.admission_bulk_burst)
+    },
+    max_clients=settings.admission_max_clients,
+    retry_after=settings.inference_retry_after_seconds
+)
+
+# In shared mode the models live in a separate inference server process (see
+# src/backend/cli/inference_server.py), which does the batching; this worker only
+# decodes and plans tiles.
+shared_client: Optional[SharedInferenceClient] = None
+batch_scheduler: Optional[BatchScheduler] = None
+if settings.inference_executor == InferenceExecutor.SHARED:
+    shared_client = SharedInferenceClient(
+        settings.inference_server_sockets[os.getpid() % len(settings.inference_server_sockets)],
+        slots=settings.inference_ring_slots,
+        slot_bytes=settings.inference_ring_slot_bytes
+    )
+    run_batch = shared_client.detect_batch
+else:
+    batch_scheduler = BatchScheduler(
+        detection_service,
+        max_batch_size=settings.batch_max_size,
+        max_wait_ms=settings.batch_max_wait_ms,
+        default_cpu_threads=settings.cpu_threads,
+        cpu_worker_threads=settings.cpu_worker_threads,
+        pin_cpus=settings.cpu_pinning
+    )
+    run_batch = batch_scheduler.detect_batch
+
+if settings.inference_executor == InferenceExecutor.PROCESS:
+    inference_pool = InferencePool(
+        kind=InferenceExecutor.PROCESS,
+        max_workers=settings.inference_workers,
+        max_queue_size=settings.inference_queue_size,
+        retry_after=settings.inference_retry_after_seconds,
+        initializer=init_process_worker,
+        initargs=(service_options,)
+    )
+else:
+    # Shared mode runs requests on threads too; they block on the server rather than the model.
+    inference_pool = InferencePool(
+        kind=settings.inference_executor,
+        max_workers=settings.inference_workers,
+        max_queue_size=settings.inference_queue_size,
+        retry_after=settings.inference_retry_after_seconds
+    )
+
+
+@contextmanager
+def _routed_tasks(tasks: List[DetectionTask]) -> Iterator[List[DetectionTask]]:
+    """Resolves auto devices, counting every task against its device's load while the block runs."""
+    with ExitStack() as routes:
+        devices = {
+            device: routes.enter_context(device_router.route(device, count))
+            for device, count in Counter(task[1] for task in tasks).items()
+        }
+        yield [(image_data, devices[device], *rest) for image_data, device, *rest in tasks]
+
+
+def _run_job_chunk(tasks: List[DetectionTask]) -> List[Union[DetectionResponse, Exception]]:
+    while True:
+        try:
+            with _routed_tasks(tasks) as routed:
+                if inference_pool.kind == InferenceExecutor.PROCESS:
+                    # Memory-mapped inputs cannot be pickled, so they are copied for the worker process.
+                    copied = [(bytes(image_data), *rest) for image_data, *rest in routed]
+                    outcomes, _ = inference_pool.submit(detect_many_in_process_worker, copied).result()
+                    return outcomes
+                return detection_service.detect_humans_many(routed, run_batch=run_batch)
+        except InferencePoolFullError as e:
+            time.sleep(max(e.retry_after, 0.1))
+
+
+def _interactive_in_flight() -> int:
+    # In process mode job chunks go through the inference pool too, so they are subtracted.
+    in_flight = inference_pool.in_flight
+    if inference_pool.kind == InferenceExecutor.PROCESS:
+        in_flight -= job_manager.chunks_in_flight
+    return in_flight
+
+
+job_manager = JobManager(
+    settings.job_dir,
+    _run_job_chunk,
+    max_concurrent_jobs=settings.job_max_concurrent,
+    chunk_size=settings.job_chunk_size,
+    input_dirs=settings.job_input_dirs,
+    interactive_load=_interactive_in_flight,
+    yield_in_flight=settings.job_yield_in_flight,
+    max_yield_seconds=settings.job_max_yield_seconds,
+    max_image_bytes=settings.image_max_bytes,
+    max_archive_bytes=settings.job_archive_max_bytes
 )
 
 
+def _wait_for_shared_server(client: SharedInferenceClient) -> None:
+    """Waits for the inference server to finish warming up and offers the devices it serves."""
+    deadline = time.monotonic() + SHARED_SERVER_WAIT_SECONDS
+    with startup.phase("wait for inference server"):
+        client.connect(timeout=SHARED_SERVER_WAIT_SECONDS)
+        status, devices = client.status()
+        while not status.ready and time.monotonic() < deadline:
+            time.sleep(0.5)
+            status, devices = client.status()
+    for name, seconds in status.phases.items():
+        startup.add(f"server {name}", seconds)
+    if not status.ready:
+        raise RuntimeError(f"Inference server at {client.address} did not become ready")
+    if status.error:
+        raise RuntimeError(f"Inference server failed to warm up: {status.error}")
+    detection_service.available_devices[:] = devices
+
+
+def _warm_up() -> None:
+    model_sizes, batch_sizes, cpu_threads = warmup_plan(settings, settings.cpu_threads)
+    try:
+        if inference_pool.kind == InferenceExecutor.PROCESS:
+            # Each worker warms itself once, so submitting one task per worker warms them all.
+            with startup.phase("warmup process workers"):
+                futures = [
+                    inference_pool.submit(warm_up_process_worker, model_sizes, batch_sizes, cpu_threads)
+                    for _ in range(inference_pool.max_workers)
+                ]
+                for future in futures:
+                    pid, phases = future.result()
+                    if phases:
+                        logger.info("Worker %s warmed up: %s", pid, phases)
+        elif shared_client is not None:
+            _wait_for_shared_server(shared_client)
+        else:
+            warm_up(detection_service, startup, model_sizes, batch_sizes, cpu_threads, run_batch)
+            if not detection_service.available_devices:
+                raise RuntimeError("No model could be loaded on any supported device")
+    except Exception as e:
+        logger.exception("Warm-up failed")
+        startup.mark_ready(error=str(e))
+        return
+    startup.mark_ready()
+
+
+def _collect_runtime_metrics():
+    # In shared mode the queue is in the inference server, which exports no metrics here.
+    if batch_scheduler is not None:
+        yield gauge_family(
+            "human_detector_batch_queue_depth",
+            "Requests waiting for a micro-batch",
+            batch_scheduler.queue_depth(),
+            "device"
+        )
+    yield gauge_family(
+        "human_detector_inference_pool_in_flight",
+        "Requests admitted to the inference pool",
+        {inference_pool.kind.value: inference_pool.in_flight},
+        "executor"
+    )
+    yield gauge_family(
+        "human_detector_startup_seconds",
+        "Seconds spent in each startup phase",
+        startup.phases(),
+        "phase"
+    )
+    if detection_service.result_cache is not None:
+        cache = detection_service.result_cache.get_stats()
+        yield counter_family("human_detector_cache_hits", "Result cache hits", cache.hits)
+        yield counter_family("human_detector_cache_misses", "Result cache misses", cache.misses)
+        yield counter_family("human_detector_cache_evictions", "Result cache evictions", cache.evictions)
+    motion = motion_gates.get_stats()
+    yield counter_family(
+        "human_detector_motion_frames_inferred", "Motion-gated frames run through the model", motion.frames_inferred
+    )
+    yield counter_family(
+        "human_detector_motion_frames_reused", "Motion-gated frames that reused a previous result", motion.frames_reused
+    )
+    routing = device_router.get_stats()
+    yield gauge_family(
+        "human_detector_device_queue_depth",
+        "Images in flight per device",
+        {device: load.queue_depth for device, load in routing.devices.items()},
+        "device"
+    )
+    yield counter_family(
+        "human_detector_routing_spilled",
+        "Images of auto requests spilled to the CPU from a saturated accelerator",
+        routing.spilled
+    )
+    admitting = admission.get_stats()
+    yield gauge_family(
+        "human_detector_admission_queued",
+        "Requests waiting for admission",
+        admitting.queued,
+        "priority"
+    )
+    yield labeled_counter_family(
+        "human_detector_admission_rate_limited",
+        "Requests rejected because their client was over its rate limit",
+        admitting.rate_limited,
+        "priority"
+    )
+    yield labeled_counter_family(
+        "human_detector_admission_shed",
+        "Requests rejected or displaced because the admission queue was full",
+        admitting.shed,
+        "priority"
+    )
+    yield labeled_counter_family(
+        "human_detector_admission_dropped",
+        "Requests dropped because their deadline passed before inference",
+        admitting.dropped,
+        "priority"
+    )
+    tracking = trackers.get_stats()
+    yield counter_family(
+        "human_detector_tracking_frames_detected", "Tracked frames run through the model", tracking.frames_detected
+    )
+    yield counter_family(
+        "human_detector_tracking_frames_propagated",
+        "Tracked frames answered by propagating tracks",
+        tracking.frames_propagated
+    )
+
+
+register_collector(_collect_runtime_metrics)
+
+
+def _route_path(request: Request) -> str:
+    for route in app.router.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return route.path
+    return "unmatched"
+
+
+@app.middleware("http")
+async def record_metrics(request: Request, call_next):
+    endpoint = _route_path(request)
+    timer = StageTimer()
+    request.state.timer = timer
+    REQUESTS_IN_FLIGHT.labels(endpoint).inc()
+    try:
+        response = await call_next(request)
+    except Exception:
+        REQUEST_ERRORS.labels(endpoint, "500").inc()
+        raise
+    finally:
+        REQUESTS_IN_FLIGHT.labels(endpoint).dec()
+    
+    if response.status_code >= 400:
+        REQUEST_ERRORS.labels(endpoint, str(response.status_code)).inc()
+    if endpoint != "/metrics":
+        timer.observe(endpoint)
+    response.headers["Server-Timing"] = timer.server_timing()
+    return response
+
+
+def get_stage_timer(request: Request) -> StageTimer:
+    timer = getattr(request.state, "timer", None) or StageTimer()
+    # Everything before the handler runs is body read, parsing and validation.
+    timer.add("read", timer.elapsed())
+    return timer
+
+
+def get_response_format(accept: Optional[str] = Header(None)) -> ResponseFormat:
+    return negotiate_format(accept)
+
+
+def get_admission_ticket(
+    request: Request,
+    timer: StageTimer = Depends(get_stage_timer),
+    api_key: Optional[str] = Header(None, alias="X-API-Key"),
+    priority: RequestPriority = Header(RequestPriority.INTERACTIVE, alias="X-Priority"),
+    deadline_ms: Optional[float] = Header(None, alias="X-Deadline-Ms", gt=0)
+) -> AdmissionTicket:
+    # Keys are not authenticated, so only configured ones get a bucket of their own;
+    # any other key would hand a client a fresh bucket per request. Requests with an
+    # unknown key or none share their address's bucket.
+    if api_key is not None and api_key in settings.admission_bulk_api_keys:
+        # Keys configured as bulk stay bulk whatever they ask for; any client may ask for bulk.
+        priority = RequestPriority.BULK
+        client = f"key:{api_key}"
+    elif api_key is not None and api_key in settings.admission_api_keys:
+        client = f"key:{api_key}"
+    else:
+        client = f"address:{request.client.host if request.client is not None else 'unknown'}"
+    # The deadline counts from when the request arrived, not from when its body was read.
+    deadline = admission.now() + deadline_ms / 1000 - timer.elapsed() if deadline_ms is not None else None
+    return AdmissionTicket(client, priority, deadline)
+
+
+@asynccontextmanager
+async def _admitted(ticket: AdmissionTicket, timer: StageTimer, images: int = 1) -> AsyncIterator[None]:
+    start = time.perf_counter()
+    async with admission.admit(ticket, images):
+        timer.add("admission", time.perf_counter() - start)
+        # Lets the batch scheduler drop the request's images if they expire in its queue.
+        token = request_deadline.set(ticket.deadline)
+        try:
+            yield
+        finally:
+            request_deadline.reset(token)
+
+
+def _respond(
+    model: BaseModel,
+    timer: StageTimer,
+    response_format: ResponseFormat = ResponseFormat.JSON,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    with timer.stage("serialize"):
+        body = encode_response(model, response_format)
+    return Response(content=body, media_type=response_format.value, headers={"Vary": "Accept", **(headers or {})})
+
+
+def _form_device(device: str) -> DeviceType:
+    # Forms take 'gpu' as well as 'cuda' for CUDA; anything unrecognised runs on the CPU.
+    value = device.lower()
+    if value == DeviceType.AUTO.value:
+        return DeviceType.AUTO
+    return DeviceType.GPU if value in ("gpu", DeviceType.GPU.value) else DeviceType.CPU
+
+
+def _label(timer: Optional[StageTimer], device: DeviceType, model_size: Optional[YoloModelSize]) -> None:
+    if timer is not None:
+        timer.labels.update(device=device.value, model_size=(model_size or detection_service.model_size).value)
+
+
+def _detect_in_thread(
+    image_data: ImageInput,
+    device: DeviceType,
+    cpu_threads: Optional[int],
+    timer: Optional[StageTimer],
+    model_size: Optional[YoloModelSize],
+    options: Optional[DetectionOptions]
+) -> DetectionResponse:
+    return detection_service.detect_humans(
+        image_data,
+        device,
+        cpu_threads,
+        run_batch=run_batch,
+        timer=timer,
+        model_size=model_size,
+        options=options
+    )
+
+
+async def _detect(
+    image_data: ImageInput,
+    device: DeviceType,
+    cpu_threads: Optional[int],
+    timer: Optional[StageTimer] = None,
+    model_size: Optional[YoloModelSize] = None,
+    options: Optional[DetectionOptions] = None
+) -> DetectionResponse:
+    with device_router.route(device) as device:
+        _label(timer, device, model_size)
+        if inference_pool.kind == InferenceExecutor.PROCESS:
+            response, stages = await inference_pool.run(
+                detect_in_process_worker, image_data, device, cpu_threads, model_size, options
+            )
+            if timer is not None:
+                timer.merge(stages)
+            return response
+        return await inference_pool.run(_detect_in_thread, image_data, device, cpu_threads, timer, model_size, options)
+
+
+def _settings_key(
+    device: DeviceType,
+    model_size: Optional[YoloModelSize],
+    options: Optional[DetectionOptions]
+) -> Hashable:
+    # Motion and tracking state is only carried over between frames detected with the same settings.
+    return device, model_size or detection_service.model_size, options.cache_token() if options is not None else ""
+
+
+def _stream_gate(stream_id: Optional[str]) -> Optional[MotionGate]:
+    return motion_gates.get(stream_id) if stream_id is not None else None
+
+
+def _motion_headers(stream_id: Optional[str], reused: bool) -> Dict[str, str]:
+    return {"X-Motion-Gate": "reused" if reused else "inferred"} if stream_id else {}
+
+
+async def _detect_gated(
+    image_data: ImageInput,
+    device: DeviceType,
+    cpu_threads: Optional[int],
+    timer: Optional[StageTimer],
+    model_size: Optional[YoloModelSize],
+    options: Optional[DetectionOptions],
+    gate: Optional[MotionGate]
+) -> Tuple[DetectionResponse, bool]:
+    """Detect, or with a motion gate reuse its last result when the frame shows no motion."""
+    if gate is None:
+        return await _detect(image_data, device, cpu_threads, timer, model_size, options), False
+    
+    buffer = detection_service.to_buffer(image_data, timer)
+    detection_service.inspect_image(buffer)
+    with optional_stage(timer, "motion"):
+        thumbnail = await run_in_threadpool(encoded_thumbnail, buffer)
+        key = _settings_key(device, model_size, options)
+        reused = gate.reuse(thumbnail, key)
+    motion_gates.count(reused=reused is not None)
+    if reused is not None:
+        # Labelled with the device the reused result ran on, which auto routing picked.
+        _label(timer, gate.device or device, model_size)
+        return reused, True
+    
+    response = await _detect(buffer, device, cpu_threads, timer, model_size, options)
+    resolved = DeviceType(timer.labels["device"]) if timer is not None else device
+    gate.record(thumbnail, response, key, resolved)
+    return response, False
+
+
+def _stream_tracker(stream_id: Optional[str], track: bool) -> Optional[StreamTracker]:
+    if not track:
+        return None
+    if stream_id is None:
+        raise ValueError("track requires a stream_id")
+    return trackers.get(stream_id)
+
+
+def _tracking_options(options: Optional[DetectionOptions]) -> Tuple[DetectionOptions, float]:
+    # The model runs at the low threshold; the requested one decides which boxes start tracks.
+    options = options or DetectionOptions()
+    confidence = options.confidence if options.confidence is not None else detection_service.confidence_threshold
+    return options.model_copy(update={"confidence": min(confidence, settings.tracking_low_confidence)}), confidence
+
+
+async def _detect_tracked(
+    image_data: ImageInput,
+    device: DeviceType,
+    cpu_threads: Optional[int],
+    timer: Optional[StageTimer],
+    model_size: Optional[YoloModelSize],
+    options: Optional[DetectionOptions],
+    tracker: StreamTracker,
+    detect_every: Optional[int] = None
+) -> Tuple[DetectionResponse, bool]:
+    """Detect and associate with the stream's tracks, or propagate them when detection is not due."""
+    frame, due = tracker.next_frame(_settings_key(device, model_size, options), detect_every)
+    trackers.count(detected=due)
+    if not due:
+        _label(timer, device, model_size)
+        with optional_stage(timer, "track"):
+            # Only the header is read, for the frame size the boxes are clipped to.
+            header = detection_service.inspect_image(image_data)
+            return tracker.propagate(frame, (header.width, header.height)), False
+    
+    detect_options, confidence = _tracking_options(options)
+    try:
+        response = await _detect(image_data, device, cpu_threads, timer, model_size, detect_options)
+    except Exception:
+        tracker.reschedule()
+        raise
+    with optional_stage(timer, "track"):
+        return tracker.update(frame, response, confidence), True
+
+
+async def _detect_stream(
+    image_data: ImageInput,
+    device: DeviceType,
+    cpu_threads: Optional[int],
+    timer: StageTimer,
+    model_size: Optional[YoloModelSize],
+    options: Optional[DetectionOptions],
+    stream_id: Optional[str],
+    track: bool = False,
+    detect_every: Optional[int] = None
+) -> Tuple[DetectionResponse, Dict[str, str]]:
+    """Detect one frame with the stream's tracking or motion gating, returning the headers that describe it."""
+    tracker = _stream_tracker(stream_id, track)
+    if tracker is not None:
+        response, detected = await _detect_tracked(
+            image_data, device, cpu_threads, timer, model_size, options, tracker, detect_every
+        )
+        return response, {"X-Tracking": "detected" if detected else "propagated"}
+    response, reused = await _detect_gated(
+        image_data, device, cpu_threads, timer, model_size, options, _stream_gate(stream_id)
+    )
+    return response, _motion_headers(stream_id, reused)
+
+
+def _detect_many_in_thread(
+    tasks: List[DetectionTask],
+    timer: Optional[StageTimer]
+) -> List[Union[DetectionResponse, Exception]]:
+    return detection_service.detect_humans_many(tasks, run_batch=run_batch, timer=timer)
+
+
+async def _detect_many(
+    entries: List[Union[DetectionTask, Exception]],
+    timer: Optional[StageTimer] = None
+) -> BatchDetectionResponse:
+    if len(entries) > settings.batch_request_max_items:
+        raise ValueError(
+            f"Batch contains {len(entries)} images, maximum is {settings.batch_request_max_items}"
+        )
+    
+    tasks = [entry for entry in entries if not isinstance(entry, Exception)]
+    with _routed_tasks(tasks) as tasks:
+        if tasks:
+            _label(timer, tasks[0][1], tasks[0][3])
+        if not tasks:
+            outcomes = []
+        elif inference_pool.kind == InferenceExecutor.PROCESS:
+            outcomes, stages = await inference_pool.run(detect_many_in_process_worker, tasks)
+            if timer is not None:
+                timer.merge(stages)
+        else:
+            outcomes = await inference_pool.run(_detect_many_in_thread, tasks, timer)
+    
+    results: List[BatchDetectionItem] = []
+    remaining = iter(outcomes)
+    for entry in entries:
+        outcome = entry if isinstance(entry, Exception) else next(remaining)
+        if isinstance(outcome, Exception):
+            results.append(BatchDetectionItem(error=str(outcome)))
+        else:
+            results.append(BatchDetectionItem(result=outcome))
+    return BatchDetectionResponse(results=results)
+
+
+async def _detect_frames(
+    frames: List[np.ndarray],
+    device: DeviceType,
+    cpu_threads: Optional[int],
+    model_size: Optional[YoloModelSize],
+    options: Optional[DetectionOptions]
+) -> List[DetectionResponse]:
+    while True:
+        try:
+            with device_router.route(device, len(frames)) as routed:
+                if inference_pool.kind == InferenceExecutor.PROCESS:
+                    responses, _ = await inference_pool.run(
+                        detect_batch_in_process_worker, frames, routed, cpu_threads, model_size, options
+                    )
+                    return responses
+                return await inference_pool.run(
+                    detection_service.detect_decoded,
+                    frames,
+                    routed,
+                    cpu_threads,
+                    run_batch,
+                    None,
+                    model_size,
+                    options
+                )
+        except InferencePoolFullError as e:
+            await asyncio.sleep(max(e.retry_after, 0.1))
+
+
+def _spool_to_disk(source: BinaryIO, suffix: str, max_bytes: int) -> str:
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as target:
+        try:
+            copied = 0
+            while True:
+                block = source.read(1024 * 1024)
+                if not block:
+                    return target.name
+                copied += len(block)
+                if copied > max_bytes:
+                    raise VideoTooLargeError(f"Video is over the limit of {max_bytes} bytes")
+                target.write(block)
+        except Exception:
+            os.unlink(target.name)
+            raise
+
+
+def _frame_size(frame: np.ndarray) -> Tuple[int, int]:
+    return frame.shape[1], frame.shape[0]
+
+
+async def _stream_video(
+    reader: VideoFrameReader,
+    path: str,
+    device: DeviceType,
+    cpu_threads: Optional[int],
+    model_size: Optional[YoloModelSize],
+    options: DetectionOptions,
+    stream: FrameStream,
+    gate: Optional[MotionGate] = None,
+    tracker: Optional[StreamTracker] = None,
+    detect_every: Optional[int] = None,
+    admitted: Optional[AsyncExitStack] = None
+) -> AsyncIterator[str]:
+    key = _settings_key(device, model_size, options)
+    detect_options, confidence = _tracking_options(options) if tracker is not None else (options, None)
+    try:
+        while True:
+            frames = await run_in_threadpool(reader.read_batch, settings.batch_max_size)
+            if not frames:
+                break
+            
+            # Frames without motion since the last inferred one reuse its result, and tracked frames
+            # between detections are propagated; the rest run as one batch.
+            reused: List[Optional[DetectionResponse]] = [None] * len(frames)
+            thumbnails: List[Optional[np.ndarray]] = [None] * len(frames)
+            scheduled: List[Tuple[int, bool]] = []
+            if tracker is not None:
+                scheduled = [tracker.next_frame(key, detect_every) for _ in frames]
+                for _, due in scheduled:
+                    trackers.count(detected=due)
+                pending = [index for index, (_, due) in enumerate(scheduled) if due]
+            else:
+                if gate is not None:
+                    thumbnails = await run_in_threadpool(lambda: [frame_thumbnail(frame) for _, _, frame in frames])
+                    reused = [gate.reuse(thumbnail, key) for thumbnail in thumbnails]
+                    for response in reused:
+                        motion_gates.count(reused=response is not None)
+                pending = [index for index, response in enumerate(reused) if response is None]
+            
+            error: Optional[Exception] = None
+            detected: Dict[int, DetectionResponse] = {}
+            try:
+                responses = await _detect_frames(
+                    [frames[index][2] for index in pending], device, cpu_threads, model_size, detect_options
+                ) if pending else []
+                detected = dict(zip(pending, responses))
+            except Exception as e:
+                error = e
+                if tracker is not None:
+                    tracker.reschedule()
+            
+            for index, (frame_index, timestamp_ms, _) in enumerate(frames):
+                if index in pending and error is not None:
+                    yield FrameDetection(
+                        frame_index=frame_index,
+                        timestamp_ms=timestamp_ms,
+                        error=str(error)
+                    ).model_dump_json(by_alias=True) + "\n"
+                    continue
+                
+                if tracker is not None:
+                    tracked_frame, due = scheduled[index]
+                    response = (
+                        tracker.update(tracked_frame, detected[index], confidence) if due
+                        else tracker.propagate(tracked_frame, _frame_size(frames[index][2]))
+                    )
+                elif index in detected:
+                    response = detected[index]
+                    if gate is not None:
+                        gate.record(thumbnails[index], response, key)
+                else:
+                    response = reused[index]
+                
+                if stream.should_emit(response):
+                    yield FrameDetection(
+                        frame_index=frame_index,
+                        timestamp_ms=timestamp_ms,
+                        result=response,
+                        reused=reused[index] is not None,
+                        propagated=tracker is not None and not scheduled[index][1]
+                    ).model_dump_json(by_alias=True) + "\n"
+    finally:
+        reader.close()
+        os.unlink(path)
+        if admitted is not None:
+            await admitted.aclose()
+
+
+def _parse_options(
+    regions: Optional[str],
+    imgsz: Optional[int],
+    tile: bool,
+    confidence: Optional[float] = None
+) -> DetectionOptions:
+    try:
+        return DetectionOptions(
+            regions=json.loads(regions) if regions else [],
+            imgsz=imgsz,
+            tile=tile,
+            confidence=confidence
+        )
+    except json.JSONDecodeError as e:
+        raise ValueError(f"regions must be a JSON array: {e}")
+    except ValidationError as e:
+        raise _validation_error(e)
+
+
+def _validation_error(error: ValidationError) -> ValueError:
+    return ValueError("; ".join(
+        f"{'.'.join(str(part) for part in detail['loc']) or 'item'}: {detail['msg']}"
+        for detail in error.errors()
+    ))
+
+
+async def _read_body(request: Request, max_bytes: int) -> bytearray:
+    content_length = request.headers.get("content-length")
+    if content_length is None or not content_length.isdigit():
+        body = bytearray()
+        async for chunk in request.stream():
+            body.extend(chunk)
+            check_size(len(body), max_bytes)
+        return body
+    
+    # Checked before the buffer is allocated, so a huge Content-Length costs nothing.
+    check_size(int(content_length), max_bytes)
+    body = bytearray(int(content_length))
+    view = memoryview(body)
+    offset = 0
+    async for chunk in request.stream():
+        end = offset + len(chunk)
+        if end > len(body):
+            raise ValueError("Request body is larger than Content-Length")
+        view[offset:end] = chunk
+        offset = end
+    if offset != len(body):
+        raise ValueError("Request body is shorter than Content-Length")
+    return body
+
+
+def _overloaded(error: InferencePoolFullError) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail=str(error),
+        headers={"Retry-After": str(error.retry_after)}
+    )
+
+
+def _too_large(error: ImageTooLargeError) -> HTTPException:
+    return HTTPException(status_code=413, detail=str(error))
+
+
+def _rejected(error: AdmissionError) -> HTTPException:
+    return HTTPException(
+        status_code=error.status_code,
+        detail=str(error),
+        headers={"Retry-After": str(error.retry_after)} if error.retry_after is not None else None
+    )
+
+
 @app.post("/detect", response_model=DetectionResponse)
-async def detect_humans_json(request: DetectionRequest) -> DetectionResponse:
+async def detect_humans_json(
+    request: DetectionRequest,
+    timer: StageTimer = Depends(get_stage_timer),
+    response_format: ResponseFormat = Depends(get_response_format),
+    ticket: AdmissionTicket = Depends(get_admission_ticket)
+) -> DetectionResponse:
     """
     Detect humans in an image using YOLO11 (JSON API).
     
     - **image_data**: Base64-encoded image data
-    - **device**: Device to use for inference ('cpu' or 'gpu'). Defaults to 'gpu'
+    - **device**: Device to use for inference ('cpu', 'gpu', or 'auto' for the least loaded). Defaults to 'gpu'
     - **cpu_threads**: Number of CPU threads (optional, uses server default if not specified)
-    - Returns bounding boxes for all detected humans with confidence scores
+    - **model_size**: YOLO11 model, 'yolo11n.pt' to 'yolo11x.pt' (optional, uses server default if not specified)
+    - **regions**: Rectangles `{x1, y1, x2, y2}` or polygons `{polygon: [[x, y], ...]}` to look in (optional)
+    - **imgsz**: Inference resolution, a multiple of 32 (optional, defaults to 640)
+    - **tile**: Split large images/regions into imgsz tiles instead of downscaling them
+    - **confidence**: Minimum box confidence (optional, defaults to the server threshold)
+    - **stream_id**: Camera or stream the frame belongs to, for motion gating or tracking (optional)
+    - **track**: Track people across the stream's frames; boxes get a stable `trackId` (requires stream_id)
+    - **detect_every**: With track, run the detector on every Nth frame (optional, uses server default if not specified)
+    - Returns bounding boxes for all detected humans with confidence scores, in original image coordinates
+    
+    With a stream id, a frame that barely differs from the one the stream's last
+    inference ran on reuses that result; the `X-Motion-Gate` response header says
+    whether it was `reused` or `inferred`. Inference is still forced periodically.
+    
+    With track, frames between detections are answered by moving the stream's
+    tracks along their velocity without decoding the image; the `X-Tracking`
+    response header says whether the frame was `detected` or `propagated`.
+    
+    Send `Accept: application/vnd.human-detector.compact+json` or `application/msgpack`
+    to get boxes as one flat array instead of an object per box (all detection endpoints).
+    
+    Admission control (all detection endpoints except WebSocket streams): requests
+    are rate limited per configured `X-API-Key` header (per client address for an
+    unknown key or none), at the priority the key is configured with or a lower one
+    asked for with `X-Priority: bulk`.
+    Queued interactive requests run before bulk ones. Send `X-Deadline-Ms` with the
+    milliseconds you will wait for an answer, and a request still queued by then is
+    dropped with 504 instead of being run. Returns 429 with a Retry-After header when
+    the client is over its rate limit, and 503 with a Retry-After header when the
+    queue is full.
+    
+    Images are checked from their header before admission: one over the byte or
+    pixel limit is rejected with 413, and one that is not a supported image with
+    400, without being decoded. A base64 payload too long for the byte limit is
+    rejected with 422 before it is decoded.
     """
     try:
-        return detection_service.detect_humans(
-            request.image_data,
-            request.device,
-            request.cpu_threads
-        )
+        detection_service.inspect_image(request.image_data)
+        async with _admitted(ticket, timer):
+            response, headers = await _detect_stream(
+                request.image_data,
+                request.device,
+                request.cpu_threads,
+                timer,
+                request.model_size,
+                request.detection_options(),
+                request.stream_id,
+                request.track,
+                request.detect_every
+            )
+        return _respond(response, timer, response_format, headers)
+    except InferencePoolFullError as e:
+        raise _overloaded(e)
+    except ImageTooLargeError as e:
+        raise _too_large(e)
+    except AdmissionError as e:
+        raise _rejected(e)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -45,33 +988,617 @@ async def detect_humans_json(request: DetectionRequest) -> DetectionResponse:
 async def detect_humans_upload(
     image: UploadFile = File(...),
     device: str = Form("cpu"),
-    cpu_threads: Optional[int] = Form(None)
+    cpu_threads: Optional[int] = Form(None),
+    model_size: Optional[YoloModelSize] = Form(None),
+    regions: Optional[str] = Form(None, description="JSON array of regions of interest"),
+    imgsz: Optional[int] = Form(None),
+    tile: bool = Form(False),
+    confidence: Optional[float] = Form(None, ge=0.0, le=1.0),
+    stream_id: Optional[str] = Form(None, max_length=STREAM_ID_MAX_LENGTH),
+    track: bool = Form(False),
+    detect_every: Optional[int] = Form(None, ge=1),
+    timer: StageTimer = Depends(get_stage_timer),
+    response_format: ResponseFormat = Depends(get_response_format),
+    ticket: AdmissionTicket = Depends(get_admission_ticket)
 ) -> DetectionResponse:
     """
     Detect humans in an image using YOLO11 (file upload API).
     
     - **image**: Image file (JPEG, PNG, GIF, WebP, BMP, TIFF)
-    - **device**: Device to use for inference ('cpu' or 'gpu'). Defaults to 'cpu'
+    - **device**: Device to use for inference ('cpu', 'gpu', or 'auto' for the least loaded). Defaults to 'cpu'
     - **cpu_threads**: Number of CPU threads (optional, uses server default if not specified)
+    - **model_size**: YOLO11 model, 'yolo11n.pt' to 'yolo11x.pt' (optional, uses server default if not specified)
+    - **regions**, **imgsz**, **tile**, **confidence**: Region-of-interest, resolution and threshold options, as for `/detect` (regions as JSON)
+    - **stream_id**, **track**, **detect_every**: Motion gating and tracking, as for `/detect` (optional)
     - Returns bounding boxes for all detected humans with confidence scores
     
-    Unsupported formats (HEIC, AVIF, RAW) will return a 400 error.
+    Unsupported formats (HEIC, AVIF, RAW) will return a 400 error, and images over
+    the byte or pixel limit a 413 error.
+    Returns 503 with a Retry-After header when the inference queue is full, and
+    429 or 504 from admission control as for `/detect`.
     """
     try:
-        image_bytes = await image.read()
-        image_base64 = base64.b64encode(image_bytes).decode('utf-8')
+        with timer.stage("read"):
+            if image.size is not None:
+                check_size(image.size, settings.image_max_bytes)
+            image_bytes = await image.read()
+        detection_service.inspect_image(image_bytes)
         
-        device_type = DeviceType.GPU if device.lower() == "gpu" else DeviceType.CPU
+        device_type = _form_device(device)
+        options = _parse_options(regions, imgsz, tile, confidence)
         
-        return detection_service.detect_humans(
-            image_base64,
-            device_type,
-            cpu_threads
+        async with _admitted(ticket, timer):
+            response, headers = await _detect_stream(
+                image_bytes,
+                device_type,
+                cpu_threads,
+                timer,
+                model_size,
+                options,
+                stream_id,
+                track,
+                detect_every
+            )
+        return _respond(response, timer, response_format, headers)
+    except InferencePoolFullError as e:
+        raise _overloaded(e)
+    except ImageTooLargeError as e:
+        raise _too_large(e)
+    except AdmissionError as e:
+        raise _rejected(e)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post(
+    "/detect/raw",
+    response_model=DetectionResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/octet-stream": {"schema": {"type": "string", "format": "binary"}}}
+        }
+    }
+)
+async def detect_humans_raw(
+    request: Request,
+    device: DeviceType = Query(DeviceType.CPU),
+    cpu_threads: Optional[int] = Query(None, ge=CPU_THREADS_MIN, le=CPU_THREADS_MAX),
+    model_size: Optional[YoloModelSize] = Query(None),
+    regions: Optional[str] = Query(None, description="JSON array of regions of interest"),
+    imgsz: Optional[int] = Query(None),
+    tile: bool = Query(False),
+    confidence: Optional[float] = Query(None, ge=0.0, le=1.0),
+    stream_id: Optional[str] = Query(None, max_length=STREAM_ID_MAX_LENGTH),
+    track: bool = Query(False),
+    detect_every: Optional[int] = Query(None, ge=1),
+    timer: StageTimer = Depends(get_stage_timer),
+    response_format: ResponseFormat = Depends(get_response_format),
+    ticket: AdmissionTicket = Depends(get_admission_ticket)
+) -> DetectionResponse:
+    """
+    Detect humans in an image using YOLO11 (raw body API).
+    
+    - **body**: Encoded image bytes sent as `application/octet-stream`
+    - **device**: Device to use for inference ('cpu', 'cuda', or 'auto' for the least loaded). Defaults to 'cpu'
+    - **cpu_threads**: Number of CPU threads (optional, uses server default if not specified)
+    - **model_size**: YOLO11 model, 'yolo11n.pt' to 'yolo11x.pt' (optional, uses server default if not specified)
+    - **regions**, **imgsz**, **tile**, **confidence**: Region-of-interest, resolution and threshold options, as for `/detect` (regions as JSON)
+    - **stream_id**, **track**, **detect_every**: Motion gating and tracking, as for `/detect` (optional)
+    - Returns bounding boxes for all detected humans with confidence scores
+    
+    The body is read into a single buffer and decoded in place, without the
+    base64 or multipart overhead of the other endpoints. A body over the byte limit
+    is refused with 413 from its Content-Length, before it is read.
+    Returns 503 with a Retry-After header when the inference queue is full, and
+    429 or 504 from admission control as for `/detect`.
+    """
+    try:
+        with timer.stage("read"):
+            image_bytes = await _read_body(request, settings.image_max_bytes)
+        detection_service.inspect_image(image_bytes)
+        options = _parse_options(regions, imgsz, tile, confidence)
+        
+        async with _admitted(ticket, timer):
+            response, headers = await _detect_stream(
+                image_bytes,
+                device,
+                cpu_threads,
+                timer,
+                model_size,
+                options,
+                stream_id,
+                track,
+                detect_every
+            )
+        return _respond(response, timer, response_format, headers)
+    except InferencePoolFullError as e:
+        raise _overloaded(e)
+    except ImageTooLargeError as e:
+        raise _too_large(e)
+    except AdmissionError as e:
+        raise _rejected(e)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/detect/batch", response_model=BatchDetectionResponse)
+async def detect_humans_batch_json(
+    items: List[Dict[str, Any]] = Body(..., description="Array of detection requests (same shape as /detect)"),
+    timer: StageTimer = Depends(get_stage_timer),
+    response_format: ResponseFormat = Depends(get_response_format),
+    ticket: AdmissionTicket = Depends(get_admission_ticket)
+) -> BatchDetectionResponse:
+    """
+    Detect humans in many images with one request (JSON API).
+    
+    - **body**: JSON array of `/detect` request objects (imageData, device, cpuThreads, modelSize)
+    - Returns one entry per image, in request order, holding either a `result` or an `error`
+    
+    Images are decoded in parallel and run through the model as batches. An invalid
+    item only fails its own entry. Every image counts against the client's rate
+    limit. Returns 503 with a Retry-After header when the inference queue is full,
+    and 429 or 504 from admission control as for `/detect`.
+    """
+    entries: List[Union[DetectionTask, Exception]] = []
+    for item in items:
+        try:
+            request = DetectionRequest.model_validate(item)
+            entries.append((
+                request.image_data,
+                request.device,
+                request.cpu_threads,
+                request.model_size,
+                request.detection_options()
+            ))
+        except ValidationError as e:
+            entries.append(_validation_error(e))
+    
+    try:
+        async with _admitted(ticket, timer, len(entries)):
+            response = await _detect_many(entries, timer)
+        return _respond(response, timer, response_format)
+    except InferencePoolFullError as e:
+        raise _overloaded(e)
+    except AdmissionError as e:
+        raise _rejected(e)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/detect/batch/upload", response_model=BatchDetectionResponse)
+async def detect_humans_batch_upload(
+    images: List[UploadFile] = File(...),
+    device: str = Form("cpu"),
+    cpu_threads: Optional[int] = Form(None),
+    model_size: Optional[YoloModelSize] = Form(None),
+    regions: Optional[str] = Form(None, description="JSON array of regions of interest"),
+    imgsz: Optional[int] = Form(None),
+    tile: bool = Form(False),
+    confidence: Optional[float] = Form(None, ge=0.0, le=1.0),
+    timer: StageTimer = Depends(get_stage_timer),
+    response_format: ResponseFormat = Depends(get_response_format),
+    ticket: AdmissionTicket = Depends(get_admission_ticket)
+) -> BatchDetectionResponse:
+    """
+    Detect humans in many images with one request (file upload API).
+    
+    - **images**: Image files (JPEG, PNG, GIF, WebP, BMP, TIFF)
+    - **device**: Device to use for inference ('cpu', 'gpu', or 'auto' for the least loaded). Defaults to 'cpu'
+    - **cpu_threads**: Number of CPU threads (optional, uses server default if not specified)
+    - **model_size**: YOLO11 model, 'yolo11n.pt' to 'yolo11x.pt' (optional, uses server default if not specified)
+    - **regions**, **imgsz**, **tile**, **confidence**: Region-of-interest, resolution and threshold options, as for `/detect` (regions as JSON)
+    - Returns one entry per image, in upload order, holding either a `result` or an `error`
+    
+    More files than `BATCH_REQUEST_MAX_ITEMS` are rejected with 422 before any is read.
+    Returns 503 with a Retry-After header when the inference queue is full, and
+    429 or 504 from admission control as for `/detect`.
+    """
+    # Checked before any file is read, so an oversized batch is never buffered.
+    if len(images) > settings.batch_request_max_items:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Batch contains {len(images)} images, maximum is {settings.batch_request_max_items}"
+        )
+    try:
+        device_type = _form_device(device)
+        options = _parse_options(regions, imgsz, tile, confidence)
+        entries: List[Union[DetectionTask, Exception]] = []
+        for image in images:
+            try:
+                # An oversized file is reported in its own entry without being read.
+                check_size(image.size or 0, settings.image_max_bytes)
+                entries.append((await image.read(), device_type, cpu_threads, model_size, options))
+            except ImageTooLargeError as e:
+                entries.append(e)
+        
+        async with _admitted(ticket, timer, len(entries)):
+            response = await _detect_many(entries, timer)
+        return _respond(response, timer, response_format)
+    except InferencePoolFullError as e:
+        raise _overloaded(e)
+    except AdmissionError as e:
+        raise _rejected(e)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/detect/video")
+async def detect_humans_video(
+    video: UploadFile = File(...),
+    device: str = Form("cpu"),
+    cpu_threads: Optional[int] = Form(None),
+    model_size: Optional[YoloModelSize] = Form(None),
+    regions: Optional[str] = Form(None, description="JSON array of regions of interest"),
+    imgsz: Optional[int] = Form(None),
+    tile: bool = Form(False),
+    confidence: Optional[float] = Form(None, ge=0.0, le=1.0),
+    frame_stride: int = Form(1, ge=1),
+    only_on_change: bool = Form(False),
+    motion_gate: bool = Form(False),
+    track: bool = Form(False),
+    detect_every: Optional[int] = Form(None, ge=1),
+    ticket: AdmissionTicket = Depends(get_admission_ticket)
+) -> StreamingResponse:
+    """
+    Detect humans in every frame of a video file (streamed NDJSON response).
+    
+    - **video**: Video file in any container/codec OpenCV can read (MP4, AVI, MKV, ...)
+    - **device**: Device to use for inference ('cpu', 'gpu', or 'auto' for the least loaded). Defaults to 'cpu'
+    - **cpu_threads**: Number of CPU threads (optional, uses server default if not specified)
+    - **model_size**: YOLO11 model, 'yolo11n.pt' to 'yolo11x.pt' (optional, uses server default if not specified)
+    - **regions**, **imgsz**, **tile**, **confidence**: Region-of-interest, resolution and threshold options, as for `/detect` (regions as JSON)
+    - **frame_stride**: Only analyse every Nth frame; skipped frames are not decoded
+    - **only_on_change**: Only emit a frame when the result differs from the last emitted one
+    - **motion_gate**: Reuse the previous result for frames without motion instead of running the model
+    - **track**: Track people across frames, running the model on every detect_every-th analysed frame (replaces motion_gate)
+    - Streams one JSON object per analysed frame: frameIndex, timestampMs and result (`reused` when motion-gated, `propagated` between tracked detections)
+    
+    Videos over `VIDEO_MAX_BYTES` are rejected with 413. The request goes through
+    admission control as for `/detect` and holds its slot until the stream ends.
+    """
+    device_type = _form_device(device)
+    try:
+        options = _parse_options(regions, imgsz, tile, confidence)
+        if video.size is not None and video.size > settings.video_max_bytes:
+            raise VideoTooLargeError(f"Video is over the limit of {settings.video_max_bytes} bytes")
+    except VideoTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # The slot is held by the streamed response and released when it finishes.
+    admitted = AsyncExitStack()
+    try:
+        await admitted.enter_async_context(admission.admit(ticket))
+    except AdmissionError as e:
+        raise _rejected(e)
+    try:
+        path = await run_in_threadpool(
+            _spool_to_disk, video.file, Path(video.filename or "").suffix, settings.video_max_bytes
         )
+    except VideoTooLargeError as e:
+        await admitted.aclose()
+        raise HTTPException(status_code=413, detail=str(e))
+    except BaseException:
+        await admitted.aclose()
+        raise
+    try:
+        reader = await run_in_threadpool(VideoFrameReader, path, frame_stride)
     except Exception as e:
+        os.unlink(path)
+        await admitted.aclose()
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return StreamingResponse(
+        _stream_video(
+            reader,
+            path,
+            device_type,
+            cpu_threads,
+            model_size,
+            options,
+            FrameStream(frame_stride, only_on_change),
+            _new_motion_gate() if motion_gate and not track else None,
+            _new_tracker() if track else None,
+            detect_every,
+            admitted
+        ),
+        media_type="application/x-ndjson"
+    )
+
+
+@app.websocket("/detect/stream")
+async def detect_humans_stream(
+    websocket: WebSocket,
+    device: DeviceType = Query(DeviceType.CPU),
+    cpu_threads: Optional[int] = Query(None, ge=CPU_THREADS_MIN, le=CPU_THREADS_MAX),
+    model_size: Optional[YoloModelSize] = Query(None),
+    regions: Optional[str] = Query(None, description="JSON array of regions of interest"),
+    imgsz: Optional[int] = Query(None),
+    tile: bool = Query(False),
+    confidence: Optional[float] = Query(None, ge=0.0, le=1.0),
+    frame_stride: int = Query(1, ge=1),
+    only_on_change: bool = Query(False),
+    motion_gate: bool = Query(False),
+    stream_id: Optional[str] = Query(None, max_length=STREAM_ID_MAX_LENGTH),
+    track: bool = Query(False),
+    detect_every: Optional[int] = Query(None, ge=1)
+):
+    """
+    Detect humans in a continuous frame stream over a WebSocket.
+    
+    Each binary message is one encoded frame (JPEG, PNG, ...). Every processed
+    frame is answered with a JSON object: frameIndex and result, or error.
+    Frames that arrive while the inference queue is full are answered with an
+    error instead of being queued. Query parameters match `/detect/raw`, plus
+    frame_stride and only_on_change.
+    
+    With motion_gate, frames without motion reuse the previous result and are
+    answered with `reused: true`. Passing a stream_id also enables it and keeps
+    the motion state across reconnects of the same camera.
+    
+    With track, boxes carry stable track ids and frames between detections are
+    answered with `propagated: true`; a stream_id keeps the tracks across
+    reconnects. Tracking replaces motion gating.
+    """
+    await websocket.accept()
+    try:
+        options = _parse_options(regions, imgsz, tile, confidence)
+    except ValueError as e:
+        await websocket.close(code=1008, reason=str(e)[:120])
+        return
+    stream = FrameStream(frame_stride, only_on_change)
+    gate = _new_motion_gate() if motion_gate else None
+    tracker = _new_tracker() if track else None
+    frame_index = 0
+    try:
+        while True:
+            frame = await websocket.receive_bytes()
+            current_index = frame_index
+            frame_index += 1
+            if not stream.should_process(current_index):
+                continue
+            
+            reused = propagated = False
+            try:
+                # A stream id's state is looked up per frame so the registry sees the stream as active.
+                if tracker is not None:
+                    response, detected = await _detect_tracked(
+                        frame,
+                        device,
+                        cpu_threads,
+                        None,
+                        model_size,
+                        options,
+                        _stream_tracker(stream_id, True) if stream_id else tracker,
+                        detect_every
+                    )
+                    propagated = not detected
+                else:
+                    response, reused = await _detect_gated(
+                        frame, device, cpu_threads, None, model_size, options, _stream_gate(stream_id) or gate
+                    )
+            except Exception as e:
+                await websocket.send_text(
+                    FrameDetection(frame_index=current_index, error=str(e)).model_dump_json(by_alias=True)
+                )
+                continue
+            
+            if stream.should_emit(response):
+                await websocket.send_text(
+                    FrameDetection(
+                        frame_index=current_index, result=response, reused=reused, propagated=propagated
+                    ).model_dump_json(by_alias=True)
+                )
+    except WebSocketDisconnect:
+        pass
+
+
+def _job_manager() -> JobManager:
+    if not settings.jobs_enabled:
+        raise HTTPException(status_code=404, detail="Jobs are disabled")
+    return job_manager
+
+
+@app.post("/jobs", response_model=JobStatus, status_code=202)
+async def submit_job(request: JobRequest) -> JobStatus:
+    """
+    Submit a bulk detection job over images already on the server.
+    
+    - **paths**: Image files or directories (scanned recursively), inside one of the server's `JOB_INPUT_DIRS`
+    - **device**, **cpu_threads**, **model_size**: As for `/detect`
+    - **regions**, **imgsz**, **tile**, **confidence**: Region-of-interest, resolution and threshold options, as for `/detect`
+    - Returns the job's status; poll `GET /jobs/{id}` and fetch `GET /jobs/{id}/results`
+    """
+    manager = _job_manager()
+    try:
+        return await run_in_threadpool(manager.submit_manifest, request)
+    except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@app.post("/jobs/upload", response_model=JobStatus, status_code=202)
+async def submit_job_upload(
+    archive: UploadFile = File(...),
+    device: str = Form("cpu"),
+    cpu_threads: Optional[int] = Form(None, ge=CPU_THREADS_MIN, le=CPU_THREADS_MAX),
+    model_size: Optional[YoloModelSize] = Form(None),
+    regions: Optional[str] = Form(None, description="JSON array of regions of interest"),
+    imgsz: Optional[int] = Form(None),
+    tile: bool = Form(False),
+    confidence: Optional[float] = Form(None, ge=0.0, le=1.0)
+) -> JobStatus:
+    """
+    Submit a bulk detection job over an uploaded zip or tar (optionally gzip, bzip2 or xz compressed).
+    
+    - **archive**: Archive of images; members are processed in archive order and non-images are skipped
+    - **device**, **cpu_threads**, **model_size**: As for `/detect/upload`
+    - **regions**, **imgsz**, **tile**, **confidence**: Region-of-interest, resolution and threshold options, as for `/detect` (regions as JSON)
+    - Returns the job's status; poll `GET /jobs/{id}` and fetch `GET /jobs/{id}/results`
+    
+    Archives over `JOB_ARCHIVE_MAX_BYTES` are rejected with 413.
+    """
+    manager = _job_manager()
+    try:
+        if archive.size is not None and archive.size > settings.job_archive_max_bytes:
+            raise ArchiveTooLargeError(f"Archive is over the limit of {settings.job_archive_max_bytes} bytes")
+        options = _parse_options(regions, imgsz, tile, confidence)
+        spec = JobSpec(
+            **options.model_dump(),
+            device=_form_device(device),
+            cpu_threads=cpu_threads,
+            model_size=model_size
+        )
+        return await run_in_threadpool(manager.submit_archive, archive.file, archive.filename or "", spec)
+    except ArchiveTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/jobs/{job_id}", response_model=JobStatus)
+async def job_status(job_id: str) -> JobStatus:
+    """
+    Progress of a job: state, total and processed image counts and errors.
+    
+    `processed` advances at each checkpoint, after that chunk's results were
+    written, so it always matches what `GET /jobs/{id}/results` returns.
+    """
+    try:
+        return _job_manager().get(job_id)
+    except JobNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@app.get("/jobs/{job_id}/results")
+async def job_results(job_id: str) -> StreamingResponse:
+    """
+    Results of a job as JSON lines: index, path and result or error per image,
+    in input order. Available while the job runs, up to its last checkpoint.
+    """
+    try:
+        blocks = _job_manager().results(job_id)
+    except JobNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return StreamingResponse(iterate_in_threadpool(blocks), media_type="application/x-ndjson")
+
+
+@app.delete("/jobs/{job_id}", response_model=JobStatus)
+async def delete_job(job_id: str) -> JobStatus:
+    """
+    Cancel a queued or running job, keeping the results written so far. Deleting
+    a finished job removes it and its results from the server.
+    """
+    try:
+        return await run_in_threadpool(_job_manager().cancel, job_id)
+    except JobNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@app.get("/stats/batching", response_model=BatchingStats)
+async def batching_stats() -> BatchingStats:
+    """
+    Micro-batching statistics for tuning latency against throughput.
+    
+    - **queueDepth**: Requests waiting for a batch, per device
+    - **batchSizeHistogram**: Number of model calls per batch size
+    
+    In shared mode these are the inference server's statistics, covering the
+    batches of every worker it serves.
+    """
+    if shared_client is not None:
+        try:
+            return await run_in_threadpool(shared_client.stats)
+        except ConnectionError as e:
+            raise HTTPException(status_code=503, detail=str(e))
+    return batch_scheduler.get_stats()
+
+
+@app.get("/stats/cache", response_model=Optional[CacheStats])
+async def cache_stats() -> Optional[CacheStats]:
+    """
+    Result cache statistics (hits, misses, evictions, memory use).
+    
+    Returns null when the cache is disabled. In process executor mode each
+    worker keeps its own cache, so only a shared Redis cache is reflected here.
+    """
+    if detection_service.result_cache is None:
+        return None
+    return detection_service.result_cache.get_stats()
+
+
+@app.get("/stats/models", response_model=ModelStats)
+async def model_stats() -> ModelStats:
+    """
+    Models currently held in memory and load/eviction counts.
+    
+    Models are loaded on first request for their size and device and the least
+    recently used one is evicted beyond `MAX_LOADED_MODELS`. In process executor
+    mode this reflects the API process only.
+    """
+    return detection_service.models.get_stats()
+
+
+@app.get("/stats/routing", response_model=RoutingStats)
+async def routing_stats() -> RoutingStats:
+    """
+    Device load as seen by `auto` routing: images in flight and the moving
+    average of seconds per image on each device, images routed to each, and
+    how many spilled to the CPU because the accelerator was saturated.
+    """
+    return device_router.get_stats()
+
+
+@app.get("/stats/admission", response_model=AdmissionStats)
+async def admission_stats() -> AdmissionStats:
+    """
+    Admission control: detection requests running and queued per priority, and
+    how many were admitted, rate limited, shed because the queue was full, or
+    dropped because their deadline passed while they waited.
+    """
+    return admission.get_stats()
+
+
+@app.get("/stats/motion", response_model=MotionStats)
+async def motion_stats() -> MotionStats:
+    """
+    Motion gating statistics: streams with motion state held, and how many gated
+    frames ran through the model or reused their stream's previous result.
+    """
+    return motion_gates.get_stats()
+
+
+@app.get("/stats/tracking", response_model=TrackingStats)
+async def tracking_stats() -> TrackingStats:
+    """
+    Tracking statistics: streams with tracks held, and how many tracked frames
+    ran through the model or were answered by propagating the tracks.
+    """
+    return trackers.get_stats()
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/ready", response_model=StartupStatus)
+async def readiness_check() -> Response:
+    """
+    Whether models are loaded and warmed up, with the startup time breakdown.
+    
+    Returns 503 until warm-up has finished, so load balancers and rolling updates
+    only send traffic to warm replicas. Use `/health` for liveness.
+    """
+    status = startup.get_status()
+    return Response(
+        content=status.model_dump_json(by_alias=True),
+        media_type="application/json",
+        status_code=200 if status.ready else 503
+    )
@@ -0,0 +1,118 @@
+"""
+Run the models for every HTTP worker on the host in one process.
+
+    python -m src.backend.cli.inference_server
+    HUMAN_DETECTOR_INFERENCE_EXECUTOR=shared uvicorn src.backend.api.main:app --workers 8
+
+The HTTP workers decode requests and pass the frames through shared memory; this
+process holds the only copy of each model and batches frames from all workers
+together. On a multi-socket host, run one server per NUMA node, each pinned to
+its node's cores and listening on its own socket, and list every socket in
+``HUMAN_DETECTOR_INFERENCE_SERVER_SOCKETS`` to spread the workers across them:
+
+    python -m src.backend.cli.inference_server --numa-node 0 --socket /tmp/human-detector-0.sock
+    python -m src.backend.cli.inference_server --numa-node 1 --socket /tmp/human-detector-1.sock
+"""
+import argparse
+import logging
+import os
+import signal
+import sys
+import torch
+from typing import List, Optional
+from src.backend.config import settings, CPU_THREADS_MAX
+from src.backend.services.batch_scheduler import BatchScheduler
+from src.backend.services.cpu_affinity import available_cpus, effective_cpu_count, numa_node_cpus
+from src.backend.services.human_detection_service import HumanDetectionService
+from src.backend.services.shared_inference import InferenceServer
+from src.backend.services.startup import StartupTracker, warm_up, warmup_plan
+
+
+logger = logging.getLogger(__name__)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve the detection models to HTTP workers over shared memory")
+    parser.add_argument(
+        "--socket",
+        default=settings.inference_server_sockets[0],
+        help=f"Unix socket to listen on (default: {settings.inference_server_sockets[0]})"
+    )
+    parser.add_argument("--numa-node", type=int, default=None, help="Run on this NUMA node's cores only")
+    parser.add_argument(
+        "--cpu-threads",
+        type=int,
+        default=None,
+        help="Threads per model call (default: every core available, within the cgroup CPU quota)"
+    )
+    parser.add_argument("--workers", type=int, default=64, help="Requests in flight at once across all clients")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    
+    if args.numa_node is not None:
+        try:
+            os.sched_setaffinity(0, numa_node_cpus(args.numa_node))
+        except (OSError, AttributeError) as e:
+            parser.error(f"Cannot run on NUMA node {args.numa_node}: {e}")
+    cpu_threads = args.cpu_threads or min(CPU_THREADS_MAX, effective_cpu_count(available_cpus()))
+    torch.set_num_threads(cpu_threads)
+    
+    startup = StartupTracker()
+    with startup.phase("service"):
+        service = HumanDetectionService(
+            model_size=settings.model_size,
+            confidence_threshold=settings.confidence_threshold,
+            supported_devices=settings.supported_devices,
+            backend=settings.inference_backend,
+            int8=settings.inference_int8,
+            model_dir=settings.model_dir,
+            int8_data=settings.int8_calibration_data,
+            max_loaded_models=settings.max_loaded_models,
+            allowed_model_sizes=settings.allowed_model_sizes,
+            reduced_decode=settings.reduced_decode,
+            precision=settings.inference_precision,
+            channels_last=settings.inference_channels_last,
+            compile_model=settings.inference_compile,
+            preload=False
+        )
+    scheduler = BatchScheduler(
+        service,
+        max_batch_size=settings.batch_max_size,
+        max_wait_ms=settings.batch_max_wait_ms,
+        default_cpu_threads=cpu_threads,
+        cpu_worker_threads=settings.cpu_worker_threads,
+        pin_cpus=settings.cpu_pinning
+    )
+    # Clients poll the status until warm-up finishes, so the socket opens first.
+    server = InferenceServer(
+        args.socket,
+        scheduler.detect_batch,
+        lambda: (startup.get_status(), list(service.available_devices)),
+        max_workers=args.workers,
+        stats=scheduler.get_stats
+    )
+    server.start()
+    signal.signal(signal.SIGTERM, lambda *_: server.close())
+    
+    try:
+        if settings.warmup_enabled:
+            warm_up(service, startup, *warmup_plan(settings, cpu_threads), scheduler.detect_batch)
+            if not service.available_devices:
+                raise RuntimeError("No model could be loaded on any supported device")
+        startup.mark_ready()
+    except Exception as e:
+        logger.exception("Warm-up failed")
+        startup.mark_ready(error=str(e))
+    
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        scheduler.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
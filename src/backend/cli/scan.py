@@ -0,0 +1,354 @@
+"""
+Scan a directory tree or a zip/tar of images for people without going through HTTP.
+
+    python -m src.backend.cli.scan /data/camera-archive frames.tar --output results.jsonl
+    python -m src.backend.cli.scan /data/camera-archive --output results.csv --resume
+
+Files and uncompressed tar members are memory-mapped rather than read. A pool of
+loader threads decodes the next batches while the current one runs through the
+model, and results are written in input order as JSON lines or CSV, flushed after
+every batch. ``--resume`` continues a run whose output file already holds results
+for the first images.
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import time
+from collections import deque
+from itertools import islice
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Deque, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+import numpy as np
+from src.backend.config import settings
+from src.backend.models.detection_options import DetectionOptions
+from src.backend.models.detection_response import DetectionResponse
+from src.backend.models.device_type import DeviceType
+from src.backend.models.job_result import JobResult
+from src.backend.models.yolo_model_size import YoloModelSize
+from src.backend.services.human_detection_service import HumanDetectionService
+from src.backend.services.cpu_affinity import set_process_threads
+from src.backend.services.image_decoding import Scale
+from src.backend.services.image_sources import (
+    archive_suffix,
+    count_archive_images,
+    expand_paths,
+    iter_archive,
+    map_file
+)
+from src.backend.services.response_encoding import COMPACT_JSON_DECIMALS
+
+
+# An archive member over the byte limit arrives as the error instead of its contents.
+ScanInput = Union[Path, memoryview, bytes, Exception]
+Outcome = Union[DetectionResponse, Exception]
+CSV_FIELDS = ["index", "path", "human_detected", "max_confidence", "boxes", "error"]
+
+
+def iter_inputs(
+    sources: Iterable[str],
+    start: int = 0,
+    max_bytes: Optional[int] = None
+) -> Iterator[Tuple[str, ScanInput]]:
+    """
+    Every image under ``sources`` in a stable order from the ``start``-th one:
+    directories recursively in sorted order, archives in member order (named
+    ``archive:member``) and files as given. Skipped archive members are never
+    read, and skipped directory entries are only listed.
+    """
+    for source in sources:
+        if os.path.isfile(source) and archive_suffix(source) is not None:
+            if start:
+                count = count_archive_images(source)
+                if start >= count:
+                    start -= count
+                    continue
+            for name, data in iter_archive(source, start, max_bytes):
+                yield f"{source}:{name}", data
+            start = 0
+        else:
+            paths = expand_paths([source])
+            if start:
+                start -= sum(1 for _ in islice(paths, start))
+                if start:
+                    continue
+            for path in paths:
+                yield path, Path(path)
+
+
+class Scanner:
+    """
+    Pipelines decoding and inference. Up to ``prefetch`` batches are decoded by
+    ``workers`` loader threads while the calling thread runs the current batch
+    through the model.
+    """
+    
+    def __init__(
+        self,
+        service: HumanDetectionService,
+        device: DeviceType = DeviceType.CPU,
+        cpu_threads: Optional[int] = None,
+        model_size: Optional[YoloModelSize] = None,
+        options: Optional[DetectionOptions] = None,
+        batch_size: int = 8,
+        workers: Optional[int] = None,
+        prefetch: int = 4
+    ):
+        self.service = service
+        self.device = device
+        self.cpu_threads = cpu_threads
+        self.model_size = model_size
+        self.options = options
+        self.batch_size = batch_size
+        self.workers = workers or os.cpu_count() or 1
+        self.prefetch = prefetch
+    
+    def _decode(self, data: ScanInput) -> Tuple[np.ndarray, Scale]:
+        if isinstance(data, Exception):
+            raise data
+        if isinstance(data, Path):
+            data = map_file(str(data))
+        return self.service.decode_for_detection(data, None, self.options)
+    
+    def _detect(self, decoded: List[Tuple[np.ndarray, Scale]]) -> List[Outcome]:
+        try:
+            return self.service.detect_decoded(
+                [image for image, _ in decoded],
+                self.device,
+                self.cpu_threads,
+                None,
+                None,
+                self.model_size,
+                self.options,
+                [scale for _, scale in decoded]
+            )
+        except Exception as e:
+            return [e] * len(decoded)
+    
+    def run(self, inputs: Iterable[Tuple[str, ScanInput]]) -> Iterator[Tuple[str, Outcome]]:
+        """Name and detection result or error of every input, in input order."""
+        remaining = iter(inputs)
+        pending: Deque[Tuple[str, "Future[Tuple[np.ndarray, Scale]]"]] = deque()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="scan-decode") as pool:
+            def fill() -> None:
+                while len(pending) < self.batch_size * self.prefetch:
+                    item = next(remaining, None)
+                    if item is None:
+                        return
+                    pending.append((item[0], pool.submit(self._decode, item[1])))
+            
+            fill()
+            while pending:
+                batch = [pending.popleft() for _ in range(min(self.batch_size, len(pending)))]
+                fill()
+                
+                outcomes: List[Optional[Outcome]] = [None] * len(batch)
+                decoded: List[Tuple[np.ndarray, Scale]] = []
+                indices: List[int] = []
+                for index, (_, future) in enumerate(batch):
+                    try:
+                        decoded.append(future.result())
+                        indices.append(index)
+                    except Exception as e:
+                        outcomes[index] = e
+                if decoded:
+                    for index, outcome in zip(indices, self._detect(decoded)):
+                        outcomes[index] = outcome
+                
+                for (name, _), outcome in zip(batch, outcomes):
+                    yield name, outcome
+
+
+def _record_indices(records: bytes, output_format: str) -> Optional[List[int]]:
+    """Indices of the complete output records in ``records``, or None if they do not parse as records."""
+    try:
+        text = records.decode("utf-8")
+        if output_format != "csv":
+            indices = [json.loads(line)["index"] for line in text.splitlines()]
+        else:
+            rows = list(csv.reader(io.StringIO(text, newline=""), strict=True))
+            if any(len(row) != len(CSV_FIELDS) or not row[0].isdigit() for row in rows):
+                return None
+            indices = [int(row[0]) for row in rows]
+    except (UnicodeDecodeError, ValueError, KeyError, TypeError, csv.Error):
+        return None
+    return indices if all(isinstance(index, int) for index in indices) else None
+
+
+def _last_record(tail: bytes, at_start: bool, output_format: str) -> Optional[Tuple[int, int]]:
+    """Index and end offset of the last complete record in ``tail``, the end of a file."""
+    ends = [position + 1 for position in range(len(tail)) if tail[position] == 0x0A]
+    # A record starts after a newline, or at the start of the file.
+    starts = ([0] if at_start else []) + ends
+    for end in reversed(ends):
+        for start in reversed([start for start in starts if start < end]):
+            indices = _record_indices(tail[start:end], output_format)
+            if indices is not None and len(indices) == 1:
+                return indices[0], end
+            # Only a CSV record can span lines, inside quotes; once two records
+            # parse, the later one alone would already have been found.
+            if output_format != "csv" or indices is not None:
+                break
+    return None
+
+
+def completed_records(path: Path, output_format: str, block_size: int = 64 * 1024) -> int:
+    """
+    Index after the last complete record of an earlier run's output, found by
+    reading back from the end of the file, so resuming costs the same for any
+    output size. Anything after that record, such as a partly written one, is
+    cut off so appending continues cleanly.
+    """
+    if not path.exists():
+        return 0
+    with open(path, "r+b") as output:
+        size = output.seek(0, os.SEEK_END)
+        length = min(size, block_size)
+        while True:
+            output.seek(size - length)
+            tail = output.read(length)
+            found = _last_record(tail, length == size, output_format)
+            if found is not None or length == size:
+                break
+            length = min(size, length * 2)
+        if found is not None:
+            output.truncate(size - length + found[1])
+            return found[0] + 1
+        # No complete record: keep only a CSV header line.
+        output.seek(0)
+        header = output.readline() if output_format == "csv" else b""
+        output.truncate(len(header) if header.endswith(b"\n") else 0)
+    return 0
+
+
+class ResultWriter:
+    def __init__(self, stream: TextIO, output_format: str, header: bool, sync: bool = True):
+        self.stream = stream
+        self.sync = sync
+        self._csv = csv.writer(stream, lineterminator="\n") if output_format == "csv" else None
+        if self._csv is not None and header:
+            self._csv.writerow(CSV_FIELDS)
+    
+    def write(self, index: int, name: str, outcome: Outcome) -> None:
+        if self._csv is None:
+            entry = JobResult(index=index, path=name)
+            if isinstance(outcome, Exception):
+                entry.error = str(outcome)
+            else:
+                entry.result = outcome
+            self.stream.write(entry.model_dump_json(by_alias=True) + "\n")
+        elif isinstance(outcome, Exception):
+            self._csv.writerow([index, name, "", "", "", str(outcome)])
+        else:
+            boxes = outcome.box_array().astype(float).round(COMPACT_JSON_DECIMALS).tolist()
+            confidence = round(outcome.max_confidence, COMPACT_JSON_DECIMALS)
+            self._csv.writerow([index, name, outcome.human_detected, confidence, json.dumps(boxes), ""])
+    
+    def flush(self) -> None:
+        self.stream.flush()
+        if self.sync:
+            os.fsync(self.stream.fileno())
+
+
+def _options(args: argparse.Namespace) -> Optional[DetectionOptions]:
+    options = DetectionOptions(
+        regions=json.loads(args.regions) if args.regions else [],
+        imgsz=args.imgsz,
+        tile=args.tile,
+        confidence=args.confidence
+    )
+    return None if options.is_default() else options
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Detect people in a directory tree or zip/tar of images")
+    parser.add_argument("sources", nargs="+", help="Image files, directories, or .zip/.tar[.gz|.bz2|.xz] archives")
+    parser.add_argument("--output", "-o", type=Path, required=True, help="Results file, or - for stdout")
+    parser.add_argument("--format", choices=["jsonl", "csv"], default=None, help="Default: from the output extension")
+    parser.add_argument("--resume", action="store_true", help="Skip the images already in the output file")
+    parser.add_argument("--device", type=DeviceType, default=DeviceType.CPU, help="cpu or cuda")
+    parser.add_argument("--cpu-threads", type=int, default=None, help=f"Default: {settings.cpu_threads}")
+    parser.add_argument("--model-size", type=YoloModelSize, default=None, help=f"Default: {settings.model_size.value}")
+    parser.add_argument("--confidence", type=float, default=None, help=f"Default: {settings.confidence_threshold}")
+    parser.add_argument("--imgsz", type=int, default=None, help="Inference resolution (default: 640)")
+    parser.add_argument("--tile", action="store_true", help="Tile large images instead of downscaling them")
+    parser.add_argument("--regions", default=None, help="JSON array of regions of interest")
+    parser.add_argument("--batch-size", type=int, default=settings.batch_max_size, help="Images per model call")
+    parser.add_argument("--workers", type=int, default=None, help="Loader threads (default: one per core)")
+    parser.add_argument("--prefetch", type=int, default=4, help="Batches decoded ahead of the model")
+    args = parser.parse_args(argv)
+    
+    to_stdout = str(args.output) == "-"
+    output_format = args.format or ("csv" if args.output.suffix.lower() == ".csv" else "jsonl")
+    if args.resume and to_stdout:
+        parser.error("--resume needs an output file")
+    try:
+        options = _options(args)
+    except ValueError as e:
+        parser.error(str(e))
+    
+    set_process_threads(settings.cpu_threads)
+    service = HumanDetectionService(
+        model_size=args.model_size or settings.model_size,
+        confidence_threshold=settings.confidence_threshold,
+        supported_devices=[args.device],
+        backend=settings.inference_backend,
+        int8=settings.inference_int8,
+        model_dir=settings.model_dir,
+        int8_data=settings.int8_calibration_data,
+        reduced_decode=settings.reduced_decode,
+        max_image_bytes=settings.image_max_bytes,
+        max_image_pixels=settings.image_max_pixels,
+        precision=settings.inference_precision,
+        channels_last=settings.inference_channels_last,
+        compile_model=settings.inference_compile
+    )
+    if args.device not in service.available_devices:
+        parser.error(f"Device {args.device.value} is not available")
+    scanner = Scanner(
+        service,
+        device=args.device,
+        cpu_threads=args.cpu_threads or settings.cpu_threads,
+        model_size=args.model_size,
+        options=options,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        prefetch=args.prefetch
+    )
+    
+    start_index = completed_records(args.output, output_format) if args.resume else 0
+    stream = sys.stdout if to_stdout else open(args.output, "a" if args.resume else "w", encoding="utf-8", newline="")
+    # A resumed CSV already has its header, even when no rows made it in.
+    header = start_index == 0 and not (args.resume and stream.tell() > 0)
+    writer = ResultWriter(stream, output_format, header, sync=not to_stdout)
+    
+    inputs = iter_inputs(args.sources, start_index, settings.image_max_bytes)
+    
+    started = time.perf_counter()
+    processed = errors = 0
+    try:
+        for index, (name, outcome) in enumerate(scanner.run(inputs), start=start_index):
+            writer.write(index, name, outcome)
+            processed += 1
+            errors += isinstance(outcome, Exception)
+            if processed % scanner.batch_size == 0:
+                writer.flush()
+    finally:
+        writer.flush()
+        if not to_stdout:
+            stream.close()
+    
+    elapsed = time.perf_counter() - started
+    print(
+        f"{processed} images ({errors} errors, {start_index} skipped) in {elapsed:.1f}s, "
+        f"{processed / elapsed if elapsed > 0 else 0.0:.1f} images/s",
+        file=sys.stderr
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,33 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from pydantic import field_validator
+from pydantic import field_validator, model_validator
 from src.backend.models.yolo_model_size import YoloModelSize
 from src.backend.models.device_type import DeviceType
-from typing import List, Optional
-import torch
+from src.backend.models.inference_executor import InferenceExecutor
+from src.backend.models.inference_backend import InferenceBackend
+from src.backend.models.inference_precision import InferencePrecision
+from src.backend.services.cpu_affinity import effective_cpu_count
+from typing import List, Optional, Union
 import os
 
 
 CPU_THREADS_MIN = 1
 CPU_THREADS_MAX = 64
-CPU_THREADS_DEFAULT = 32
+# One thread per core this process may use, after affinity and cgroup CPU quotas.
+CPU_THREADS_DEFAULT = min(CPU_THREADS_MAX, effective_cpu_count())
+BATCH_MAX_SIZE_MIN = 1
+BATCH_MAX_SIZE_MAX = 64
+INFERENCE_WORKERS_MIN = 1
+INFERENCE_WORKERS_MAX = 256
+INFERENCE_SERVER_SOCKET_DEFAULT = "/tmp/human-detector-inference.sock"
+BATCH_REQUEST_MAX_ITEMS_MIN = 1
+BATCH_REQUEST_MAX_ITEMS_MAX = 1024
+MAX_LOADED_MODELS_MIN = 1
+MAX_LOADED_MODELS_MAX = 10
+IMGSZ_MIN = 32
+IMGSZ_MAX = 4096
+STREAM_ID_MAX_LENGTH = 128
+JOB_ARCHIVE_MAX_BYTES_MIN = 1024 * 1024
+JOB_ARCHIVE_MAX_BYTES_MAX = 1024 ** 4
 
 
 class Settings(BaseSettings):
@@ -20,10 +38,79 @@ class Settings(BaseSettings):
     )
     
     model_size: YoloModelSize = YoloModelSize.NANO
+    allowed_model_sizes: List[YoloModelSize] = list(YoloModelSize)
+    max_loaded_models: int = 2
     confidence_threshold: float = 0.5
     supported_devices: List[DeviceType] = [DeviceType.CPU, DeviceType.GPU]
     cpu_threads: int = CPU_THREADS_DEFAULT
+    cpu_worker_threads: List[int] = []
+    cpu_pinning: bool = True
     root_path: str = ""
+    inference_backend: InferenceBackend = InferenceBackend.PYTORCH
+    inference_int8: bool = False
+    inference_precision: InferencePrecision = InferencePrecision.FP32
+    inference_channels_last: bool = False
+    inference_compile: bool = False
+    int8_calibration_data: str = "coco8.yaml"
+    model_dir: Optional[str] = None
+    batch_max_size: int = 8
+    batch_max_wait_ms: float = 5.0
+    inference_executor: InferenceExecutor = InferenceExecutor.THREAD
+    inference_workers: int = 8
+    inference_queue_size: int = 32
+    inference_server_sockets: List[str] = [INFERENCE_SERVER_SOCKET_DEFAULT]
+    inference_ring_slots: int = 8
+    inference_ring_slot_bytes: int = 8 * 1024 * 1024
+    inference_retry_after_seconds: int = 1
+    batch_request_max_items: int = 64
+    cache_enabled: bool = True
+    cache_max_bytes: int = 64 * 1024 * 1024
+    cache_ttl_seconds: float = 300.0
+    cache_redis_url: Optional[str] = None
+    reduced_decode: bool = True
+    image_max_bytes: int = 32 * 1024 * 1024
+    image_max_pixels: int = 50_000_000
+    video_max_bytes: int = 2 * 1024 ** 3
+    warmup_enabled: bool = True
+    warmup_model_sizes: List[YoloModelSize] = []
+    warmup_batch_sizes: List[int] = []
+    motion_pixel_threshold: int = 25
+    motion_min_changed_fraction: float = 0.005
+    motion_refresh_frames: int = 30
+    motion_refresh_seconds: float = 10.0
+    motion_max_streams: int = 1024
+    motion_stream_ttl_seconds: float = 300.0
+    tracking_detect_every: int = 5
+    tracking_low_confidence: float = 0.1
+    tracking_max_lost_frames: int = 30
+    tracking_max_streams: int = 1024
+    tracking_stream_ttl_seconds: float = 300.0
+    jobs_enabled: bool = True
+    job_dir: str = "jobs"
+    job_input_dirs: List[str] = []
+    job_max_concurrent: int = 1
+    job_chunk_size: int = 32
+    job_yield_in_flight: int = 1
+    job_max_yield_seconds: float = 1.0
+    job_archive_max_bytes: int = 4 * 1024 ** 3
+    routing_spill_queue_depth: int = 16
+    routing_latency_smoothing: float = 0.2
+    admission_rate_per_second: float = 0.0
+    admission_burst: int = 64
+    admission_bulk_rate_per_second: float = 0.0
+    admission_bulk_burst: int = 256
+    admission_api_keys: List[str] = []
+    admission_bulk_api_keys: List[str] = []
+    admission_max_clients: int = 10000
+    
+    @field_validator('max_loaded_models')
+    @classmethod
+    def validate_max_loaded_models(cls, v: int) -> int:
+        if v < MAX_LOADED_MODELS_MIN or v > MAX_LOADED_MODELS_MAX:
+            raise ValueError(
+                f"max_loaded_models must be between {MAX_LOADED_MODELS_MIN} and {MAX_LOADED_MODELS_MAX}, got {v}"
+            )
+        return v
     
     @field_validator('cpu_threads')
     @classmethod
@@ -33,10 +120,171 @@ class Settings(BaseSettings):
                 f"cpu_threads must be between {CPU_THREADS_MIN} and {CPU_THREADS_MAX}, got {v}"
             )
         return v
+    
+    @field_validator('cpu_worker_threads')
+    @classmethod
+    def validate_cpu_worker_threads(cls, v: List[int]) -> List[int]:
+        for threads in v:
+            if threads < CPU_THREADS_MIN or threads > CPU_THREADS_MAX:
+                raise ValueError(
+                    f"cpu_worker_threads entries must be between {CPU_THREADS_MIN} and {CPU_THREADS_MAX}, got {threads}"
+                )
+        return sorted(set(v))
+    
+    @field_validator('batch_max_size')
+    @classmethod
+    def validate_batch_max_size(cls, v: int) -> int:
+        if v < BATCH_MAX_SIZE_MIN or v > BATCH_MAX_SIZE_MAX:
+            raise ValueError(
+                f"batch_max_size must be between {BATCH_MAX_SIZE_MIN} and {BATCH_MAX_SIZE_MAX}, got {v}"
+            )
+        return v
+    
+    @field_validator('warmup_batch_sizes')
+    @classmethod
+    def validate_warmup_batch_sizes(cls, v: List[int]) -> List[int]:
+        for size in v:
+            if size < BATCH_MAX_SIZE_MIN or size > BATCH_MAX_SIZE_MAX:
+                raise ValueError(
+                    f"warmup_batch_sizes entries must be between {BATCH_MAX_SIZE_MIN} and {BATCH_MAX_SIZE_MAX}, got {size}"
+                )
+        return sorted(set(v))
+    
+    @field_validator('motion_pixel_threshold')
+    @classmethod
+    def validate_motion_pixel_threshold(cls, v: int) -> int:
+        if v < 0 or v > 255:
+            raise ValueError(f"motion_pixel_threshold must be between 0 and 255, got {v}")
+        return v
+    
+    @field_validator('motion_min_changed_fraction')
+    @classmethod
+    def validate_motion_min_changed_fraction(cls, v: float) -> float:
+        if v < 0 or v > 1:
+            raise ValueError(f"motion_min_changed_fraction must be between 0 and 1, got {v}")
+        return v
+    
+    @field_validator('supported_devices')
+    @classmethod
+    def validate_supported_devices(cls, v: List[DeviceType]) -> List[DeviceType]:
+        if DeviceType.AUTO in v:
+            raise ValueError("supported_devices lists real devices; auto is chosen per request among them")
+        return v
+    
+    @field_validator('inference_server_sockets')
+    @classmethod
+    def validate_inference_server_sockets(cls, v: List[str]) -> List[str]:
+        if not v:
+            raise ValueError("inference_server_sockets must list at least one socket")
+        return v
+    
+    @field_validator('routing_latency_smoothing')
+    @classmethod
+    def validate_routing_latency_smoothing(cls, v: float) -> float:
+        if v <= 0 or v > 1:
+            raise ValueError(f"routing_latency_smoothing must be greater than 0 and at most 1, got {v}")
+        return v
+    
+    @field_validator('tracking_low_confidence')
+    @classmethod
+    def validate_tracking_low_confidence(cls, v: float) -> float:
+        if v < 0 or v > 1:
+            raise ValueError(f"tracking_low_confidence must be between 0 and 1, got {v}")
+        return v
+    
+    @field_validator(
+        'motion_refresh_frames',
+        'motion_max_streams',
+        'tracking_detect_every',
+        'tracking_max_streams',
+        'job_max_concurrent',
+        'job_chunk_size',
+        'routing_spill_queue_depth',
+        'inference_ring_slots',
+        'inference_ring_slot_bytes',
+        'admission_burst',
+        'admission_bulk_burst',
+        'admission_max_clients',
+        'image_max_bytes',
+        'image_max_pixels',
+        'video_max_bytes'
+    )
+    @classmethod
+    def validate_positive(cls, v: int, info) -> int:
+        if v < 1:
+            raise ValueError(f"{info.field_name} must be at least 1, got {v}")
+        return v
+    
+    @field_validator('batch_max_wait_ms')
+    @classmethod
+    def validate_batch_max_wait_ms(cls, v: float) -> float:
+        if v < 0:
+            raise ValueError(f"batch_max_wait_ms must be non-negative, got {v}")
+        return v
+    
+    @field_validator('inference_workers')
+    @classmethod
+    def validate_inference_workers(cls, v: int) -> int:
+        if v < INFERENCE_WORKERS_MIN or v > INFERENCE_WORKERS_MAX:
+            raise ValueError(
+                f"inference_workers must be between {INFERENCE_WORKERS_MIN} and {INFERENCE_WORKERS_MAX}, got {v}"
+            )
+        return v
+    
+    @field_validator('batch_request_max_items')
+    @classmethod
+    def validate_batch_request_max_items(cls, v: int) -> int:
+        if v < BATCH_REQUEST_MAX_ITEMS_MIN or v > BATCH_REQUEST_MAX_ITEMS_MAX:
+            raise ValueError(
+                f"batch_request_max_items must be between {BATCH_REQUEST_MAX_ITEMS_MIN} and {BATCH_REQUEST_MAX_ITEMS_MAX}, got {v}"
+            )
+        return v
+    
+    @field_validator('job_archive_max_bytes')
+    @classmethod
+    def validate_job_archive_max_bytes(cls, v: int) -> int:
+        if v < JOB_ARCHIVE_MAX_BYTES_MIN or v > JOB_ARCHIVE_MAX_BYTES_MAX:
+            raise ValueError(
+                f"job_archive_max_bytes must be between {JOB_ARCHIVE_MAX_BYTES_MIN} and {JOB_ARCHIVE_MAX_BYTES_MAX}, got {v}"
+            )
+        return v
+    
+    @field_validator(
+        'inference_queue_size',
+        'inference_retry_after_seconds',
+        'cache_max_bytes',
+        'cache_ttl_seconds',
+        'motion_refresh_seconds',
+        'motion_stream_ttl_seconds',
+        'tracking_max_lost_frames',
+        'tracking_stream_ttl_seconds',
+        'job_yield_in_flight',
+        'job_max_yield_seconds',
+        'admission_rate_per_second',
+        'admission_bulk_rate_per_second'
+    )
+    @classmethod
+    def validate_non_negative(cls, v: Union[int, float], info) -> Union[int, float]:
+        if v < 0:
+            raise ValueError(f"{info.field_name} must be non-negative, got {v}")
+        return v
+    
+    @model_validator(mode='after')
+    def share_cpu_threads_between_workers(self) -> "Settings":
+        # Each uvicorn worker (WEB_CONCURRENCY sets their number) runs its own models unless
+        # they share an inference server, so an unset thread count is split between them.
+        if 'cpu_threads' not in self.model_fields_set and self.inference_executor != InferenceExecutor.SHARED:
+            workers = os.getenv("WEB_CONCURRENCY", "1")
+            try:
+                workers_count = int(workers)
+            except ValueError:
+                raise ValueError(f"WEB_CONCURRENCY must be an integer, got {workers!r}")
+            self.cpu_threads = max(CPU_THREADS_MIN, self.cpu_threads // max(1, workers_count))
+        return self
 
 
 settings = Settings()
 
-torch.set_num_threads(settings.cpu_threads)
+# Also read by worker processes; PyTorch's thread count is set at startup by set_process_threads.
 os.environ['OMP_NUM_THREADS'] = str(settings.cpu_threads)
 os.environ['MKL_NUM_THREADS'] = str(settings.cpu_threads)
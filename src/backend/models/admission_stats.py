@@ -0,0 +1,24 @@
+from pydantic import Field
+from typing import Dict
+from src.backend.models.api_model import APIModel
+
+
+class AdmissionStats(APIModel):
+    running: int = Field(0, description="Detection requests admitted and not yet finished")
+    max_concurrent: int = Field(..., description="Requests admitted at once; the rest wait in priority order")
+    queued: Dict[str, int] = Field(default_factory=dict, description="Requests waiting for admission per priority")
+    max_queued: int = Field(..., description="Requests that may wait before new ones are shed")
+    admitted: Dict[str, int] = Field(default_factory=dict, description="Requests admitted per priority")
+    rate_limited: Dict[str, int] = Field(
+        default_factory=dict,
+        description="Requests rejected with 429 because their client was over its rate limit, per priority"
+    )
+    shed: Dict[str, int] = Field(
+        default_factory=dict,
+        description="Requests rejected with 503 because the queue was full, including bulk requests displaced by interactive ones"
+    )
+    dropped: Dict[str, int] = Field(
+        default_factory=dict,
+        description="Requests whose deadline passed before they could run, per priority"
+    )
+    clients: int = Field(0, description="Clients with rate limit state")
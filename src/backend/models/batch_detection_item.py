@@ -0,0 +1,9 @@
+from pydantic import Field
+from typing import Optional
+from src.backend.models.api_model import APIModel
+from src.backend.models.detection_response import DetectionResponse
+
+
+class BatchDetectionItem(APIModel):
+    result: Optional[DetectionResponse] = Field(default=None, description="Detection result, if the image was processed")
+    error: Optional[str] = Field(default=None, description="Why this image could not be processed")
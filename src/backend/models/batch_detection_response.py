@@ -0,0 +1,8 @@
+from pydantic import Field
+from typing import List
+from src.backend.models.api_model import APIModel
+from src.backend.models.batch_detection_item import BatchDetectionItem
+
+
+class BatchDetectionResponse(APIModel):
+    results: List[BatchDetectionItem] = Field(default_factory=list, description="One entry per input image, in request order")
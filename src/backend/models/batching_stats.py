@@ -0,0 +1,14 @@
+from pydantic import Field
+from typing import Dict, List
+from src.backend.models.api_model import APIModel
+
+
+class BatchingStats(APIModel):
+    max_batch_size: int = Field(..., description="Maximum number of images per model call")
+    max_wait_ms: float = Field(..., description="Maximum time a request waits for a batch to fill")
+    queue_depth: Dict[str, int] = Field(default_factory=dict, description="Pending requests per device")
+    batch_size_histogram: Dict[int, int] = Field(default_factory=dict, description="Number of model calls per batch size")
+    batches_processed: int = Field(0, description="Total number of model calls")
+    images_processed: int = Field(0, description="Total number of images run through the model")
+    expired: int = Field(0, description="Images dropped unrun because their request's deadline passed while queued")
+    cpu_workers: Dict[int, List[int]] = Field(default_factory=dict, description="CPU workers by thread count, with the CPUs each is pinned to")
@@ -1,4 +1,5 @@
-from pydantic import Field
+from pydantic import Field, SerializerFunctionWrapHandler, model_serializer
+from typing import Optional
 from src.backend.models.api_model import APIModel
 
 
@@ -8,3 +9,13 @@ class BoundingBox(APIModel):
     x2: float = Field(..., description="Bottom-right x coordinate")
     y2: float = Field(..., description="Bottom-right y coordinate")
     confidence: float = Field(..., ge=0.0, le=1.0, description="Detection confidence score")
+    track_id: Optional[int] = Field(default=None, description="Stable id of this person across a stream's frames, when tracking")
+    
+    @model_serializer(mode="wrap")
+    def omit_missing_track_id(self, handler: SerializerFunctionWrapHandler):
+        # Only tracked responses carry trackId; untracked boxes keep their original shape.
+        data = handler(self)
+        if self.track_id is None:
+            data.pop("trackId", None)
+            data.pop("track_id", None)
+        return data
@@ -0,0 +1,13 @@
+from pydantic import Field
+from typing import Optional
+from src.backend.models.api_model import APIModel
+
+
+class CacheStats(APIModel):
+    backend: str = Field(..., description="Cache store in use: 'memory' or 'redis'")
+    hits: int = Field(0, description="Requests answered from the cache")
+    misses: int = Field(0, description="Requests that required inference")
+    evictions: int = Field(0, description="Entries evicted to stay within the memory budget")
+    entries: Optional[int] = Field(default=None, description="Entries currently held (memory store only)")
+    size_bytes: Optional[int] = Field(default=None, description="Approximate bytes held (memory store only)")
+    max_bytes: Optional[int] = Field(default=None, description="Memory budget (memory store only)")
@@ -0,0 +1,49 @@
+from pydantic import Field, field_validator
+from typing import List, Optional
+from src.backend.models.api_model import APIModel
+from src.backend.models.region_of_interest import RegionOfInterest
+from src.backend.config import IMGSZ_MIN, IMGSZ_MAX
+import hashlib
+
+
+class DetectionOptions(APIModel):
+    regions: List[RegionOfInterest] = Field(
+        default_factory=list,
+        description="Only look inside these rectangles/polygons (original image pixels). Defaults to the whole image."
+    )
+    imgsz: Optional[int] = Field(
+        default=None,
+        description=f"Inference resolution, a multiple of 32 in {IMGSZ_MIN}-{IMGSZ_MAX}. Defaults to the model's 640."
+    )
+    tile: bool = Field(
+        default=False,
+        description="Split large images or regions into overlapping imgsz tiles instead of downscaling them"
+    )
+    confidence: Optional[float] = Field(
+        default=None,
+        ge=0.0,
+        le=1.0,
+        description="Minimum confidence of returned boxes. Defaults to the server's threshold."
+    )
+    
+    @field_validator('imgsz')
+    @classmethod
+    def validate_imgsz(cls, v: Optional[int]) -> Optional[int]:
+        if v is not None and (v < IMGSZ_MIN or v > IMGSZ_MAX or v % 32 != 0):
+            raise ValueError(
+                f"imgsz must be a multiple of 32 between {IMGSZ_MIN} and {IMGSZ_MAX}, got {v}"
+            )
+        return v
+    
+    def detection_options(self) -> "DetectionOptions":
+        """The options alone, without any other fields of a subclass such as the image data."""
+        return DetectionOptions(regions=self.regions, imgsz=self.imgsz, tile=self.tile, confidence=self.confidence)
+    
+    def is_default(self) -> bool:
+        return not self.regions and self.imgsz is None and not self.tile and self.confidence is None
+    
+    def cache_token(self) -> str:
+        if self.is_default():
+            return ""
+        options = self.detection_options().model_dump_json()
+        return hashlib.blake2b(options.encode(), digest_size=8).hexdigest()
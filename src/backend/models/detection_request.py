@@ -1,33 +1,59 @@
 from pydantic import Field, field_validator
-from src.backend.models.api_model import APIModel
+from src.backend.models.detection_options import DetectionOptions
 from src.backend.models.device_type import DeviceType
-from src.backend.config import CPU_THREADS_MIN, CPU_THREADS_MAX, CPU_THREADS_DEFAULT
-from typing import Optional
+from src.backend.models.yolo_model_size import YoloModelSize
+from src.backend.config import settings, CPU_THREADS_MIN, CPU_THREADS_MAX, CPU_THREADS_DEFAULT, STREAM_ID_MAX_LENGTH
+from typing import Any, Optional
 import base64
+import binascii
 
 
-class DetectionRequest(APIModel):
-    image_data: str = Field(
+class DetectionRequest(DetectionOptions):
+    image_data: bytes = Field(
         ..., 
-        description="Base64-encoded image data. Supported formats: JPEG, PNG, GIF, WebP, BMP, TIFF"
+        description="Base64-encoded image data. Supported formats: JPEG, PNG, GIF, WebP, BMP, TIFF",
+        json_schema_extra={"format": "byte"}
     )
     device: DeviceType = Field(
         default=DeviceType.CPU,
-        description="Device to use for inference: 'cpu' or 'cuda' (GPU)"
+        description="Device to use for inference: 'cpu', 'cuda' (GPU), or 'auto' for the one expected to finish soonest"
     )
     cpu_threads: Optional[int] = Field(
         default=None,
         description=f"Number of CPU threads for inference (only applies to CPU device). Range: {CPU_THREADS_MIN}-{CPU_THREADS_MAX}. Defaults to server setting if not specified."
     )
+    model_size: Optional[YoloModelSize] = Field(
+        default=None,
+        description="YOLO11 model to use: 'yolo11n.pt' (fastest) to 'yolo11x.pt' (most accurate). Defaults to server setting if not specified."
+    )
+    stream_id: Optional[str] = Field(
+        default=None,
+        max_length=STREAM_ID_MAX_LENGTH,
+        description="Camera or stream this frame belongs to. Enables motion gating: a frame without motion reuses the stream's previous result."
+    )
+    track: bool = Field(
+        default=False,
+        description="Track people across the stream's frames (requires stream_id). Boxes get stable track ids and the detector only runs every detect_every frames."
+    )
+    detect_every: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="With track, run the detector on every Nth frame and propagate tracks in between. Defaults to server setting if not specified."
+    )
     
-    @field_validator('image_data')
+    @field_validator('image_data', mode='before')
     @classmethod
-    def validate_base64(cls, v: str) -> str:
+    def validate_base64(cls, v: Any) -> Any:
+        # Decoded here once; the size is checked from the encoded length first, so
+        # an oversized payload is rejected without being decoded at all.
+        if not isinstance(v, str):
+            return v
+        if len(v) // 4 * 3 > settings.image_max_bytes + 2:
+            raise ValueError(f"Image is over the limit of {settings.image_max_bytes} bytes")
         try:
-            base64.b64decode(v, validate=True)
-        except Exception as e:
+            return base64.b64decode(v, validate=True)
+        except (binascii.Error, ValueError) as e:
             raise ValueError(f"Invalid base64 encoding: {str(e)}")
-        return v
     
     @field_validator('cpu_threads')
     @classmethod
@@ -1,10 +1,53 @@
-from pydantic import Field
-from typing import List
+from pydantic import Field, PrivateAttr
+from typing import List, Optional
 from src.backend.models.api_model import APIModel
 from src.backend.models.bounding_box import BoundingBox
+import numpy as np
 
 
 class DetectionResponse(APIModel):
     human_detected: bool = Field(..., description="Whether a human was detected in the image")
     bounding_boxes: List[BoundingBox] = Field(default_factory=list, description="List of detected human bounding boxes")
     max_confidence: float = Field(..., ge=0.0, le=1.0, description="Maximum confidence score across all detected humans")
+    _boxes: Optional[np.ndarray] = PrivateAttr(default=None)
+    
+    @classmethod
+    def from_boxes(cls, boxes: np.ndarray, track_ids: Optional[List[int]] = None) -> "DetectionResponse":
+        """
+        Build a response from an (N, 5) float32 array of x1, y1, x2, y2, confidence rows,
+        with an optional track id per row. Values come straight from the model or
+        tracker, so validation is skipped.
+        """
+        rows = boxes.tolist()
+        track_ids = track_ids if track_ids is not None else [None] * len(rows)
+        response = cls.model_construct(
+            human_detected=len(rows) > 0,
+            bounding_boxes=[
+                BoundingBox.model_construct(x1=x1, y1=y1, x2=x2, y2=y2, confidence=confidence, track_id=track_id)
+                for (x1, y1, x2, y2, confidence), track_id in zip(rows, track_ids)
+            ],
+            max_confidence=float(boxes[:, 4].max()) if len(rows) else 0.0
+        )
+        response._boxes = boxes
+        return response
+    
+    def __eq__(self, other: object) -> bool:
+        # The box array is derived from the fields, so it is left out of comparisons.
+        if not isinstance(other, DetectionResponse):
+            return NotImplemented
+        return self.model_dump() == other.model_dump()
+    
+    def track_ids(self) -> Optional[List[Optional[int]]]:
+        """Track id per box, or None when the boxes are not tracked."""
+        if not any(box.track_id is not None for box in self.bounding_boxes):
+            return None
+        return [box.track_id for box in self.bounding_boxes]
+    
+    def box_array(self) -> np.ndarray:
+        """Boxes as an (N, 5) float32 array of x1, y1, x2, y2, confidence rows."""
+        if self._boxes is None:
+            self._boxes = np.array(
+                [[box.x1, box.y1, box.x2, box.y2, box.confidence] for box in self.bounding_boxes],
+                dtype=np.float32
+            ).reshape(-1, 5)
+        return self._boxes
@@ -0,0 +1,12 @@
+from pydantic import Field
+from typing import Optional
+from src.backend.models.api_model import APIModel
+
+
+class DeviceLoad(APIModel):
+    queue_depth: int = Field(0, description="Images in flight on the device")
+    seconds_per_image: Optional[float] = Field(
+        default=None,
+        description="Moving average of the device's time per image, including batching; null until measured"
+    )
+    routed: int = Field(0, description="Images of auto requests sent to the device")
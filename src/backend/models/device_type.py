@@ -4,3 +4,5 @@ from enum import Enum
 class DeviceType(str, Enum):
     CPU = "cpu"
     GPU = "cuda"
+    # Chosen per request by the device router; never a device a model is loaded on.
+    AUTO = "auto"
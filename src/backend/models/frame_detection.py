@@ -0,0 +1,13 @@
+from pydantic import Field
+from typing import Optional
+from src.backend.models.api_model import APIModel
+from src.backend.models.detection_response import DetectionResponse
+
+
+class FrameDetection(APIModel):
+    frame_index: int = Field(..., ge=0, description="Zero-based index of the frame in the stream")
+    timestamp_ms: Optional[float] = Field(default=None, description="Frame position in the video, if known")
+    result: Optional[DetectionResponse] = Field(default=None, description="Detection result for this frame")
+    error: Optional[str] = Field(default=None, description="Why this frame could not be processed")
+    reused: bool = Field(default=False, description="The frame had no motion, so the stream's previous result was reused")
+    propagated: bool = Field(default=False, description="The detector was skipped and the tracks were moved along their velocity")
@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class InferenceBackend(str, Enum):
+    PYTORCH = "pytorch"
+    ONNX = "onnx"
+    OPENVINO = "openvino"
@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class InferenceExecutor(str, Enum):
+    THREAD = "thread"
+    PROCESS = "process"
+    SHARED = "shared"
@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class InferencePrecision(str, Enum):
+    FP32 = "fp32"
+    BF16 = "bf16"
+    FP16 = "fp16"
@@ -0,0 +1,11 @@
+from pydantic import Field
+from typing import List
+from src.backend.models.job_spec import JobSpec
+
+
+class JobRequest(JobSpec):
+    paths: List[str] = Field(
+        ...,
+        min_length=1,
+        description="Image files or directories on the server, inside one of its JOB_INPUT_DIRS. Directories are scanned recursively."
+    )
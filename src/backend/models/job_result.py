@@ -0,0 +1,11 @@
+from pydantic import Field
+from typing import Optional
+from src.backend.models.api_model import APIModel
+from src.backend.models.detection_response import DetectionResponse
+
+
+class JobResult(APIModel):
+    index: int = Field(..., ge=0, description="Zero-based position of the image in the job")
+    path: str = Field(..., description="File path or archive member name")
+    result: Optional[DetectionResponse] = Field(default=None, description="Detection result, if the image was processed")
+    error: Optional[str] = Field(default=None, description="Why this image could not be processed")
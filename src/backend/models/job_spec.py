@@ -0,0 +1,23 @@
+from pydantic import Field
+from typing import Optional
+from src.backend.models.detection_options import DetectionOptions
+from src.backend.models.device_type import DeviceType
+from src.backend.models.yolo_model_size import YoloModelSize
+from src.backend.config import CPU_THREADS_MIN, CPU_THREADS_MAX
+
+
+class JobSpec(DetectionOptions):
+    device: DeviceType = Field(
+        default=DeviceType.CPU,
+        description="Device to use for inference: 'cpu', 'cuda' (GPU), or 'auto' for the one expected to finish soonest"
+    )
+    cpu_threads: Optional[int] = Field(
+        default=None,
+        ge=CPU_THREADS_MIN,
+        le=CPU_THREADS_MAX,
+        description="Number of CPU threads for inference (only applies to CPU device). Defaults to server setting if not specified."
+    )
+    model_size: Optional[YoloModelSize] = Field(
+        default=None,
+        description="YOLO11 model to use. Defaults to server setting if not specified."
+    )
@@ -0,0 +1,16 @@
+from pydantic import Field
+from typing import Optional
+from src.backend.models.api_model import APIModel
+from src.backend.models.job_state import JobState
+
+
+class JobStatus(APIModel):
+    id: str = Field(..., description="Job id")
+    state: JobState = Field(default=JobState.QUEUED, description="queued, running, completed, failed or cancelled")
+    total: int = Field(0, description="Number of images in the job")
+    processed: int = Field(0, description="Images processed so far, as of the last checkpoint")
+    errors: int = Field(0, description="Processed images that could not be read or decoded")
+    created_at: float = Field(..., description="Unix time the job was submitted")
+    started_at: Optional[float] = Field(default=None, description="Unix time the job first started running")
+    finished_at: Optional[float] = Field(default=None, description="Unix time the job finished")
+    error: Optional[str] = Field(default=None, description="Why the job failed, if it did")
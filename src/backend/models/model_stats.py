@@ -0,0 +1,10 @@
+from pydantic import Field
+from typing import List
+from src.backend.models.api_model import APIModel
+
+
+class ModelStats(APIModel):
+    loaded: List[str] = Field(default_factory=list, description="Models in memory as size@device, least recently used first")
+    max_loaded: int = Field(..., description="Maximum number of models kept in memory")
+    loads: int = Field(0, description="Models loaded since startup")
+    evictions: int = Field(0, description="Models evicted to stay within max_loaded")
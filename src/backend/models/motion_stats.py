@@ -0,0 +1,9 @@
+from pydantic import Field
+from src.backend.models.api_model import APIModel
+
+
+class MotionStats(APIModel):
+    streams: int = Field(0, description="Streams with motion state currently held")
+    max_streams: int = Field(..., description="Maximum number of streams kept; least recently used are dropped")
+    frames_inferred: int = Field(0, description="Motion-gated frames that ran through the model")
+    frames_reused: int = Field(0, description="Motion-gated frames answered with the stream's previous result")
@@ -0,0 +1,35 @@
+from pydantic import Field, model_validator
+from typing import List, Optional, Tuple
+from src.backend.models.api_model import APIModel
+
+
+class RegionOfInterest(APIModel):
+    x1: Optional[float] = Field(default=None, description="Rectangle top-left x coordinate")
+    y1: Optional[float] = Field(default=None, description="Rectangle top-left y coordinate")
+    x2: Optional[float] = Field(default=None, description="Rectangle bottom-right x coordinate")
+    y2: Optional[float] = Field(default=None, description="Rectangle bottom-right y coordinate")
+    polygon: Optional[List[Tuple[float, float]]] = Field(
+        default=None,
+        description="Polygon vertices as [[x, y], ...]; use instead of a rectangle"
+    )
+    
+    @model_validator(mode="after")
+    def validate_shape(self) -> "RegionOfInterest":
+        corners = [self.x1, self.y1, self.x2, self.y2]
+        if self.polygon is not None:
+            if any(value is not None for value in corners):
+                raise ValueError("A region is either a rectangle (x1, y1, x2, y2) or a polygon, not both")
+            if len(self.polygon) < 3:
+                raise ValueError(f"A polygon needs at least 3 vertices, got {len(self.polygon)}")
+        elif any(value is None for value in corners):
+            raise ValueError("A rectangle region needs x1, y1, x2 and y2")
+        elif self.x2 <= self.x1 or self.y2 <= self.y1:
+            raise ValueError("A rectangle region needs x2 > x1 and y2 > y1")
+        return self
+    
+    def bounds(self) -> Tuple[float, float, float, float]:
+        if self.polygon is None:
+            return self.x1, self.y1, self.x2, self.y2
+        xs = [x for x, _ in self.polygon]
+        ys = [y for _, y in self.polygon]
+        return min(xs), min(ys), max(xs), max(ys)
@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class RequestPriority(str, Enum):
+    # Queued interactive requests are always admitted before queued bulk ones.
+    INTERACTIVE = "interactive"
+    BULK = "bulk"
@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class ResponseFormat(str, Enum):
+    JSON = "application/json"
+    COMPACT_JSON = "application/vnd.human-detector.compact+json"
+    MSGPACK = "application/msgpack"
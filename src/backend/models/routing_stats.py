@@ -0,0 +1,10 @@
+from pydantic import Field
+from typing import Dict
+from src.backend.models.api_model import APIModel
+from src.backend.models.device_load import DeviceLoad
+
+
+class RoutingStats(APIModel):
+    devices: Dict[str, DeviceLoad] = Field(default_factory=dict, description="Load per device")
+    spill_queue_depth: int = Field(..., description="Accelerator queue depth beyond which auto requests go to the CPU")
+    spilled: int = Field(0, description="Images of auto requests sent to the CPU because the accelerator was saturated")
@@ -0,0 +1,13 @@
+from pydantic import Field
+from typing import Dict, Optional
+from src.backend.models.api_model import APIModel
+
+
+class StartupStatus(APIModel):
+    ready: bool = Field(..., description="Whether models are loaded and warmed up")
+    phases: Dict[str, float] = Field(default_factory=dict, description="Seconds spent in each startup phase, in order")
+    seconds_to_ready: Optional[float] = Field(
+        default=None,
+        description="Seconds from process start until ready, once ready"
+    )
+    error: Optional[str] = Field(default=None, description="Why warm-up failed, if it did")
@@ -0,0 +1,9 @@
+from pydantic import Field
+from src.backend.models.api_model import APIModel
+
+
+class TrackingStats(APIModel):
+    streams: int = Field(0, description="Streams with tracking state currently held")
+    max_streams: int = Field(..., description="Maximum number of streams kept; least recently used are dropped")
+    frames_detected: int = Field(0, description="Tracked frames that ran through the model")
+    frames_propagated: int = Field(0, description="Tracked frames answered by moving the stream's tracks along their velocity")
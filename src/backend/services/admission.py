@@ -0,0 +1,233 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from collections import Counter, OrderedDict
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+from src.backend.models.admission_stats import AdmissionStats
+from src.backend.models.request_priority import RequestPriority
+
+
+# Deadline of the admitted request being served, on the time.monotonic clock, so
+# work it queues further down (the batch scheduler) can drop it once it expires.
+request_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+class AdmissionError(RuntimeError):
+    """A request turned away before inference; ``status_code`` is the HTTP status to answer with."""
+    
+    status_code = 503
+    
+    def __init__(self, message: str, retry_after: Optional[int] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RateLimitedError(AdmissionError):
+    status_code = 429
+
+
+class AdmissionQueueFullError(AdmissionError):
+    status_code = 503
+
+
+class DeadlineExceededError(AdmissionError):
+    status_code = 504
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """Images per second a client may send, with bursts of up to ``burst`` images; a rate of 0 is unlimited."""
+    
+    rate: float = 0.0
+    burst: float = 64.0
+
+
+@dataclass(frozen=True)
+class AdmissionTicket:
+    """Who is asking, at which priority, and until when (on the controller's clock) the answer is still wanted."""
+    
+    client: str
+    priority: RequestPriority = RequestPriority.INTERACTIVE
+    deadline: Optional[float] = None
+
+
+class TokenBucket:
+    def __init__(self, limit: RateLimit, now: float):
+        self.limit = limit
+        self.tokens = limit.burst
+        self.updated = now
+    
+    def take(self, cost: float, now: float) -> float:
+        """Takes ``cost`` tokens and returns 0, or returns the seconds until they would be available."""
+        self.tokens = min(self.limit.burst, self.tokens + (now - self.updated) * self.limit.rate)
+        self.updated = now
+        # A request larger than the burst can never fit, so it is let through on a full bucket.
+        cost = min(cost, self.limit.burst)
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.limit.rate
+
+
+class _Waiter:
+    def __init__(self, priority: RequestPriority, future: asyncio.Future):
+        self.priority = priority
+        self.future = future
+
+
+class AdmissionController:
+    """
+    Decides which detection requests run, and when.
+    
+    Each client (API key, or address without one) gets a token bucket per
+    priority, costing one token per image; a client over its rate is turned away
+    with ``RateLimitedError`` rather than queued. Up to ``max_concurrent`` admitted
+    requests run at once and up to ``max_queued`` more wait, interactive ones ahead
+    of bulk ones and each class in arrival order. When the queue is full a new
+    interactive request displaces the newest waiting bulk request; anything else
+    is shed with ``AdmissionQueueFullError``.
+    
+    A request with a deadline is dropped with ``DeadlineExceededError`` as soon as
+    the deadline passes while it waits, so no inference runs for a client that
+    has already given up. Meant to be used from the event loop only.
+    """
+    
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_queued: int,
+        limits: Optional[Dict[RequestPriority, RateLimit]] = None,
+        max_clients: int = 10000,
+        retry_after: int = 1,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.limits = limits or {}
+        self.max_clients = max_clients
+        self.retry_after = retry_after
+        self._clock = clock
+        self._buckets: "OrderedDict[Tuple[str, RequestPriority], TokenBucket]" = OrderedDict()
+        self._running = 0
+        self._waiting: List[Tuple[int, int, _Waiter]] = []
+        self._sequence = itertools.count()
+        self._queued: Counter = Counter()
+        self._admitted: Counter = Counter()
+        self._rate_limited: Counter = Counter()
+        self._shed: Counter = Counter()
+        self._dropped: Counter = Counter()
+    
+    def now(self) -> float:
+        return self._clock()
+    
+    def _check_rate(self, ticket: AdmissionTicket, images: int, now: float) -> None:
+        limit = self.limits.get(ticket.priority)
+        if limit is None or limit.rate <= 0:
+            return
+        key = (ticket.client, ticket.priority)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(limit, now)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        wait = bucket.take(images, now)
+        if wait > 0:
+            self._rate_limited[ticket.priority] += 1
+            raise RateLimitedError(
+                f"Rate limit of {limit.rate:g} images/s exceeded for {ticket.priority.value} requests",
+                retry_after=max(1, math.ceil(wait))
+            )
+    
+    def _queue_full(self) -> AdmissionQueueFullError:
+        return AdmissionQueueFullError(
+            f"Admission queue is full ({self.max_queued} requests waiting)",
+            retry_after=self.retry_after
+        )
+    
+    def _make_room(self, priority: RequestPriority) -> None:
+        if sum(self._queued.values()) < self.max_queued:
+            return
+        if priority == RequestPriority.INTERACTIVE:
+            bulk = [entry for entry in self._waiting if entry[0] > 0 and not entry[2].future.done()]
+            if bulk:
+                displaced = max(bulk)[2]
+                self._shed[displaced.priority] += 1
+                displaced.future.set_exception(self._queue_full())
+                return
+        self._shed[priority] += 1
+        raise self._queue_full()
+    
+    def _expire(self, waiter: _Waiter) -> None:
+        if not waiter.future.done():
+            self._dropped[waiter.priority] += 1
+            waiter.future.set_exception(DeadlineExceededError("Deadline passed while waiting for inference"))
+    
+    async def _wait(self, ticket: AdmissionTicket, now: float) -> None:
+        self._make_room(ticket.priority)
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(ticket.priority, loop.create_future())
+        rank = 0 if ticket.priority == RequestPriority.INTERACTIVE else 1
+        heapq.heappush(self._waiting, (rank, next(self._sequence), waiter))
+        self._queued[ticket.priority] += 1
+        expiry = loop.call_later(ticket.deadline - now, self._expire, waiter) if ticket.deadline is not None else None
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            # The slot may have been handed over just before the caller went away.
+            if waiter.future.done() and not waiter.future.cancelled() and waiter.future.exception() is None:
+                self._release()
+            raise
+        finally:
+            if expiry is not None:
+                expiry.cancel()
+            self._queued[ticket.priority] -= 1
+    
+    def _release(self) -> None:
+        # The slot goes straight to the next live waiter; expired and displaced ones are skipped.
+        while self._waiting:
+            _, _, waiter = heapq.heappop(self._waiting)
+            if not waiter.future.done():
+                waiter.future.set_result(None)
+                return
+        self._running -= 1
+    
+    @asynccontextmanager
+    async def admit(self, ticket: AdmissionTicket, images: int = 1) -> AsyncIterator[None]:
+        """Waits for the request's turn and holds its slot while the block runs."""
+        now = self._clock()
+        if ticket.deadline is not None and ticket.deadline <= now:
+            self._dropped[ticket.priority] += 1
+            raise DeadlineExceededError("Deadline passed before the request was admitted")
+        self._check_rate(ticket, images, now)
+        if self._running < self.max_concurrent and not any(self._queued.values()):
+            self._running += 1
+        else:
+            await self._wait(ticket, now)
+        self._admitted[ticket.priority] += 1
+        try:
+            yield
+        finally:
+            self._release()
+    
+    def get_stats(self) -> AdmissionStats:
+        def by_priority(counts: Counter) -> Dict[str, int]:
+            return {priority.value: counts[priority] for priority in RequestPriority}
+        
+        return AdmissionStats(
+            running=self._running,
+            max_concurrent=self.max_concurrent,
+            queued=by_priority(self._queued),
+            max_queued=self.max_queued,
+            admitted=by_priority(self._admitted),
+            rate_limited=by_priority(self._rate_limited),
+            shed=by_priority(self._shed),
+            dropped=by_priority(self._dropped),
+            clients=len({client for client, _ in self._buckets})
+        )
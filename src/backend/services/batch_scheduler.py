@@ -0,0 +1,298 @@
+import logging
+import queue
+import threading
+import time
+import numpy as np
+from collections import Counter
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from src.backend.models.batching_stats import BatchingStats
+from src.backend.models.detection_response import DetectionResponse
+from src.backend.models.device_type import DeviceType
+from src.backend.models.yolo_model_size import YoloModelSize
+from src.backend.services.admission import DeadlineExceededError, request_deadline
+from src.backend.services.human_detection_service import HumanDetectionService
+from src.backend.services.metrics import BATCH_SIZE, StageTimer
+from src.backend.services.cpu_affinity import CpuAllocator, pin_current_thread
+
+
+logger = logging.getLogger(__name__)
+
+
+BatchKey = Tuple[DeviceType, Optional[int]]
+# Per-worker model replicas, keyed by size, with the registry model each was copied from.
+Replicas = Dict[YoloModelSize, Tuple[Any, Any]]
+
+
+class _PendingImage:
+    def __init__(
+        self,
+        image: np.ndarray,
+        model_size: YoloModelSize,
+        imgsz: Optional[int] = None,
+        confidence: Optional[float] = None,
+        timer: Optional[StageTimer] = None
+    ):
+        self.image = image
+        self.model_size = model_size
+        self.imgsz = imgsz
+        self.confidence = confidence
+        self.timer = timer
+        self.deadline = request_deadline.get()
+        self.enqueued_at = time.perf_counter()
+        self.future: Future = Future()
+
+
+class BatchScheduler:
+    """
+    Collects concurrent detection requests into micro-batches.
+
+    Requests are grouped by device and CPU thread count. Each group has one worker
+    thread that waits for up to ``max_wait_ms`` after the first request arrives, or
+    until ``max_batch_size`` requests are queued, and then runs one model call per
+    model size, inference resolution and confidence threshold in the batch.
+
+    CPU workers are pinned once at start-up: each fixes its own torch thread count,
+    optionally binds to a dedicated CPU set, and runs its own replicas of the loaded
+    models (sharing their weights), so requests with different ``cpu_threads`` never
+    change each other's settings.
+    With ``cpu_worker_threads`` configured, requests are routed to the smallest
+    worker that has at least the requested thread count.
+
+    Images submitted for a request with a deadline (see ``request_deadline``) that
+    has passed by the time their batch is taken off the queue fail with
+    ``DeadlineExceededError`` instead of being run.
+    """
+
+    def __init__(
+        self,
+        detection_service: HumanDetectionService,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 5.0,
+        default_cpu_threads: Optional[int] = None,
+        cpu_worker_threads: Optional[List[int]] = None,
+        pin_cpus: bool = False,
+        cpu_allocator: Optional[CpuAllocator] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.detection_service = detection_service
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.default_cpu_threads = default_cpu_threads
+        self.cpu_worker_threads = sorted(set(cpu_worker_threads or []))
+        self.pin_cpus = pin_cpus
+        self._cpu_allocator = cpu_allocator or CpuAllocator()
+        self._worker_cpus: Dict[int, List[int]] = {}
+        self._queues: Dict[BatchKey, "queue.Queue[Optional[_PendingImage]]"] = {}
+        self._workers: Dict[BatchKey, threading.Thread] = {}
+        self._lock = threading.Lock()
+        self._batch_sizes: Counter = Counter()
+        self._expired = 0
+        self._clock = clock
+        self._closed = False
+
+    def submit(
+        self,
+        image: np.ndarray,
+        device: DeviceType = DeviceType.GPU,
+        cpu_threads: Optional[int] = None,
+        timer: Optional[StageTimer] = None,
+        model_size: Optional[YoloModelSize] = None,
+        imgsz: Optional[int] = None,
+        confidence: Optional[float] = None
+    ) -> "Future[DetectionResponse]":
+        cpu_threads = self.route_cpu_threads(cpu_threads) if device == DeviceType.CPU else None
+        pending = _PendingImage(image, model_size or self.detection_service.model_size, imgsz, confidence, timer)
+        self._get_queue((device, cpu_threads)).put(pending)
+        return pending.future
+
+    def detect(
+        self,
+        image: np.ndarray,
+        device: DeviceType = DeviceType.GPU,
+        cpu_threads: Optional[int] = None,
+        model_size: Optional[YoloModelSize] = None
+    ) -> DetectionResponse:
+        return self.submit(image, device, cpu_threads, model_size=model_size).result()
+
+    def detect_batch(
+        self,
+        images: List[np.ndarray],
+        device: DeviceType = DeviceType.GPU,
+        cpu_threads: Optional[int] = None,
+        timers: Optional[List[Optional[StageTimer]]] = None,
+        model_size: Optional[YoloModelSize] = None,
+        imgsz: Optional[int] = None,
+        confidence: Optional[float] = None
+    ) -> List[DetectionResponse]:
+        timers = timers or [None] * len(images)
+        futures = [
+            self.submit(image, device, cpu_threads, timer, model_size, imgsz, confidence)
+            for image, timer in zip(images, timers)
+        ]
+        return [future.result() for future in futures]
+
+    def route_cpu_threads(self, cpu_threads: Optional[int]) -> Optional[int]:
+        requested = cpu_threads if cpu_threads is not None else self.default_cpu_threads
+        if requested is None or not self.cpu_worker_threads:
+            return requested
+        candidates = [threads for threads in self.cpu_worker_threads if threads >= requested]
+        return candidates[0] if candidates else self.cpu_worker_threads[-1]
+
+    def queue_depth(self) -> Dict[str, int]:
+        depth: Dict[str, int] = {}
+        with self._lock:
+            for (device, _), pending in self._queues.items():
+                depth[device.value] = depth.get(device.value, 0) + pending.qsize()
+        return depth
+
+    def get_stats(self) -> BatchingStats:
+        with self._lock:
+            histogram = dict(sorted(self._batch_sizes.items()))
+            expired = self._expired
+            cpu_workers = dict(sorted(self._worker_cpus.items()))
+        return BatchingStats(
+            max_batch_size=self.max_batch_size,
+            max_wait_ms=self.max_wait_ms,
+            queue_depth=self.queue_depth(),
+            batch_size_histogram=histogram,
+            batches_processed=sum(histogram.values()),
+            images_processed=sum(size * count for size, count in histogram.items()),
+            expired=expired,
+            cpu_workers=cpu_workers
+        )
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._closed = True
+            workers = list(self._workers.values())
+            for pending in self._queues.values():
+                pending.put(None)
+        for worker in workers:
+            worker.join()
+
+    def _get_queue(self, key: BatchKey) -> "queue.Queue[Optional[_PendingImage]]":
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Batch scheduler is shut down")
+            pending = self._queues.get(key)
+            if pending is None:
+                pending = queue.Queue()
+                worker = threading.Thread(
+                    target=self._run,
+                    args=(key, pending),
+                    name=f"batch-{key[0].value}-{key[1]}",
+                    daemon=True
+                )
+                self._queues[key] = pending
+                self._workers[key] = worker
+                worker.start()
+            return pending
+
+    def _prepare_worker(self, key: BatchKey) -> Optional[Replicas]:
+        device, cpu_threads = key
+        if device != DeviceType.CPU or cpu_threads is None:
+            return None
+
+        cpus = self._cpu_allocator.allocate(cpu_threads) if self.pin_cpus else None
+        try:
+            pin_current_thread(cpu_threads, cpus)
+        except Exception as e:
+            logger.warning("CPU worker for %s threads falls back to the shared models: %s", cpu_threads, e)
+            return None
+        with self._lock:
+            self._worker_cpus[cpu_threads] = sorted(cpus) if cpus else []
+        return {}
+
+    def _replica(self, replicas: Optional[Replicas], device: DeviceType, model_size: YoloModelSize):
+        if replicas is None:
+            return None
+
+        # Drop replicas of models the registry has evicted so they can be freed.
+        registry = self.detection_service.models
+        for size in [size for size, (source, _) in replicas.items() if registry.peek(size, device) is not source]:
+            del replicas[size]
+
+        source = self.detection_service.get_model(device, model_size)
+        if model_size not in replicas or replicas[model_size][0] is not source:
+            replicas[model_size] = (source, self.detection_service.replicate(source))
+        return replicas[model_size][1]
+
+    def _run(self, key: BatchKey, pending: "queue.Queue[Optional[_PendingImage]]") -> None:
+        replicas = self._prepare_worker(key)
+        stopping = False
+        while not stopping:
+            first = pending.get()
+            if first is None:
+                return
+
+            batch = [first]
+            deadline = time.monotonic() + self.max_wait_ms / 1000.0
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = pending.get(timeout=remaining) if remaining > 0 else pending.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            batch = [item for item in batch if item.future.set_running_or_notify_cancel()]
+            batch = self._drop_expired(batch)
+            groups: Dict[Tuple[YoloModelSize, Optional[int], Optional[float]], List[_PendingImage]] = {}
+            for item in batch:
+                groups.setdefault((item.model_size, item.imgsz, item.confidence), []).append(item)
+            for (model_size, imgsz, confidence), items in groups.items():
+                self._process(key, model_size, imgsz, confidence, items, replicas)
+
+    def _drop_expired(self, batch: List[_PendingImage]) -> List[_PendingImage]:
+        now = self._clock()
+        live = []
+        for item in batch:
+            if item.deadline is not None and item.deadline <= now:
+                item.future.set_exception(DeadlineExceededError("Deadline passed while waiting for a batch"))
+            else:
+                live.append(item)
+        if len(live) < len(batch):
+            with self._lock:
+                self._expired += len(batch) - len(live)
+        return live
+
+    def _process(
+        self,
+        key: BatchKey,
+        model_size: YoloModelSize,
+        imgsz: Optional[int],
+        confidence: Optional[float],
+        batch: List[_PendingImage],
+        replicas: Optional[Replicas] = None
+    ) -> None:
+        started_at = time.perf_counter()
+        for item in batch:
+            if item.timer is not None:
+                item.timer.add("queue", started_at - item.enqueued_at)
+
+        device, cpu_threads = key
+        try:
+            responses = self.detection_service.detect_humans_batch(
+                [item.image for item in batch],
+                device,
+                cpu_threads,
+                [item.timer for item in batch],
+                model_size,
+                imgsz,
+                confidence,
+                model=self._replica(replicas, device, model_size)
+            )
+        except Exception as e:
+            for item in batch:
+                item.future.set_exception(e)
+            return
+
+        with self._lock:
+            self._batch_sizes[len(batch)] += 1
+        BATCH_SIZE.labels(device.value).observe(len(batch))
+        for item, response in zip(batch, responses):
+            item.future.set_result(response)
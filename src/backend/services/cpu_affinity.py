@@ -0,0 +1,100 @@
+import math
+import os
+import threading
+from typing import List, Optional, Set
+
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+NUMA_ROOT = "/sys/devices/system/node"
+
+
+def available_cpus() -> List[int]:
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def parse_cpu_list(value: str) -> List[int]:
+    """CPUs in the kernel's list format, such as ``0-3,8,10-11``."""
+    cpus: List[int] = []
+    for part in value.strip().split(","):
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        cpus.extend(range(int(first), int(last or first) + 1))
+    return cpus
+
+
+def numa_node_cpus(node: int, root: str = NUMA_ROOT) -> List[int]:
+    with open(os.path.join(root, f"node{node}", "cpulist")) as cpulist:
+        return parse_cpu_list(cpulist.read())
+
+
+def cgroup_cpu_quota(root: str = CGROUP_ROOT) -> Optional[float]:
+    """CPUs' worth of time the cgroup may use (cgroup v2, then v1), or None without a quota."""
+    try:
+        with open(os.path.join(root, "cpu.max")) as cpu_max:
+            quota, period = cpu_max.read().split()[:2]
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        with open(os.path.join(root, "cpu", "cpu.cfs_quota_us")) as quota_file:
+            quota = int(quota_file.read())
+        with open(os.path.join(root, "cpu", "cpu.cfs_period_us")) as period_file:
+            period = int(period_file.read())
+        return quota / period if quota > 0 and period > 0 else None
+    except (OSError, ValueError):
+        return None
+
+
+def effective_cpu_count(cpus: Optional[List[int]] = None, root: str = CGROUP_ROOT) -> int:
+    """
+    Cores this process can actually keep busy: the CPUs it may run on, capped by
+    the container's CPU quota. A quota of 2.5 CPUs on a 64-core host is 3, not 64.
+    """
+    count = len(cpus if cpus is not None else available_cpus())
+    quota = cgroup_cpu_quota(root)
+    if quota is not None:
+        count = min(count, math.ceil(quota))
+    return max(1, count)
+
+
+class CpuAllocator:
+    """
+    Hands out CPU sets to inference workers. Sets are disjoint until every
+    available core has been handed out, after which allocation wraps around.
+    """
+
+    def __init__(self, cpus: Optional[List[int]] = None):
+        self.cpus = cpus or available_cpus()
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def allocate(self, count: int) -> Set[int]:
+        count = max(1, min(count, len(self.cpus)))
+        with self._lock:
+            allocated = {self.cpus[(self._next + i) % len(self.cpus)] for i in range(count)}
+            self._next = (self._next + count) % len(self.cpus)
+        return allocated
+
+
+def set_process_threads(num_threads: int) -> None:
+    """PyTorch's default intra-op thread count for this process."""
+    # Imported here so that reading the configuration does not import PyTorch.
+    import torch
+
+    torch.set_num_threads(num_threads)
+
+
+def pin_current_thread(num_threads: int, cpus: Optional[Set[int]] = None) -> None:
+    import torch
+
+    # On Linux, pid 0 targets the calling thread; OpenMP threads it spawns inherit the mask.
+    if cpus and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+    torch.set_num_threads(num_threads)
+    # PyTorch copies its process-wide thread count into a thread the first time that thread
+    # enters a parallel region. Force that now so later calls from other workers can't change ours.
+    torch.ones(1 << 16).sum()
+    torch.set_num_threads(num_threads)
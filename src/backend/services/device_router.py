@@ -0,0 +1,112 @@
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+from src.backend.models.device_load import DeviceLoad
+from src.backend.models.device_type import DeviceType
+from src.backend.models.routing_stats import RoutingStats
+
+
+class _Load:
+    def __init__(self):
+        self.queued = 0
+        self.seconds_per_image: Optional[float] = None
+        self.routed = 0
+
+
+class DeviceRouter:
+    """
+    Picks the device for requests that ask for ``auto``.
+    
+    Every request in flight counts towards its device's queue depth, in images.
+    When one finishes, its time divided by the images it queued behind plus its
+    own updates a moving average of the device's seconds per image, as if the
+    device worked through its queue one image at a time. An ``auto`` request goes
+    to the device whose queue would clear soonest with it added; a device not yet
+    measured counts as instant, so each gets tried, and ties go to the accelerator.
+    
+    Once an accelerator has ``spill_queue_depth`` images queued, ``auto`` requests
+    spill over to the CPU instead, however fast the accelerator has been.
+    """
+    
+    def __init__(
+        self,
+        devices: Callable[[], List[DeviceType]],
+        spill_queue_depth: int = 16,
+        smoothing: float = 0.2,
+        clock: Callable[[], float] = time.perf_counter
+    ):
+        if not 0 < smoothing <= 1:
+            raise ValueError(f"smoothing must be in (0, 1], got {smoothing}")
+        self.spill_queue_depth = spill_queue_depth
+        self.smoothing = smoothing
+        self._devices = devices
+        self._clock = clock
+        self._loads: Dict[DeviceType, _Load] = defaultdict(_Load)
+        self._spilled = 0
+        self._lock = threading.Lock()
+    
+    def expected_seconds(self, device: DeviceType, images: int = 1) -> float:
+        load = self._loads[device]
+        return (load.queued + images) * (load.seconds_per_image or 0.0)
+    
+    def _choose(self, images: int) -> DeviceType:
+        candidates = [device for device in self._devices() if device != DeviceType.AUTO]
+        if not candidates:
+            raise ValueError("No device is available")
+        saturated = [
+            device for device in candidates
+            if device != DeviceType.CPU and self._loads[device].queued >= self.spill_queue_depth
+        ]
+        if saturated and DeviceType.CPU in candidates:
+            self._spilled += images
+            return DeviceType.CPU
+        return min(candidates, key=lambda device: (self.expected_seconds(device, images), device == DeviceType.CPU))
+    
+    @contextmanager
+    def route(self, device: DeviceType, images: int = 1) -> Iterator[DeviceType]:
+        """
+        Resolves ``auto`` to a device and counts the request against that device's
+        queue until the block exits. Other devices pass through unchanged but are
+        counted too, so explicit requests are part of the load ``auto`` sees.
+        """
+        with self._lock:
+            if device == DeviceType.AUTO:
+                device = self._choose(images)
+                self._loads[device].routed += images
+            load = self._loads[device]
+            waited = load.queued
+            load.queued += images
+        
+        started = self._clock()
+        succeeded = False
+        try:
+            yield device
+            succeeded = True
+        finally:
+            elapsed = self._clock() - started
+            with self._lock:
+                load.queued -= images
+                # Failed requests often fail fast and would make the device look quicker than it is.
+                if succeeded:
+                    sample = elapsed / (waited + images)
+                    if load.seconds_per_image is None:
+                        load.seconds_per_image = sample
+                    else:
+                        load.seconds_per_image += self.smoothing * (sample - load.seconds_per_image)
+    
+    def get_stats(self) -> RoutingStats:
+        with self._lock:
+            return RoutingStats(
+                devices={
+                    device.value: DeviceLoad(
+                        queue_depth=load.queued,
+                        seconds_per_image=load.seconds_per_image,
+                        routed=load.routed
+                    )
+                    for device, load in self._loads.items()
+                },
+                spill_queue_depth=self.spill_queue_depth,
+                spilled=self._spilled
+            )
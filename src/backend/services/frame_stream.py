@@ -0,0 +1,68 @@
+import cv2
+import numpy as np
+from typing import List, Optional, Tuple
+from src.backend.models.detection_response import DetectionResponse
+
+
+class VideoTooLargeError(ValueError):
+    pass
+
+
+class FrameStream:
+    """
+    Per-stream frame selection: process every ``frame_stride``-th frame and, with
+    ``only_on_change``, emit a result only when it differs from the last one sent.
+
+    A result counts as changed when the human/no-human outcome or the number of
+    bounding boxes differs from the previously emitted result.
+    """
+
+    def __init__(self, frame_stride: int = 1, only_on_change: bool = False):
+        if frame_stride < 1:
+            raise ValueError(f"frame_stride must be at least 1, got {frame_stride}")
+        self.frame_stride = frame_stride
+        self.only_on_change = only_on_change
+        self._last_emitted: Optional[Tuple[bool, int]] = None
+
+    def should_process(self, frame_index: int) -> bool:
+        return frame_index % self.frame_stride == 0
+
+    def should_emit(self, response: DetectionResponse) -> bool:
+        summary = (response.human_detected, len(response.bounding_boxes))
+        if self.only_on_change and summary == self._last_emitted:
+            return False
+        self._last_emitted = summary
+        return True
+
+
+class VideoFrameReader:
+    def __init__(self, path: str, frame_stride: int = 1):
+        self.frame_stride = frame_stride
+        self._capture = cv2.VideoCapture(path)
+        if not self._capture.isOpened():
+            raise ValueError("Failed to open video")
+        fps = self._capture.get(cv2.CAP_PROP_FPS)
+        self.fps = fps if fps and fps > 0 else None
+        self._frame_index = 0
+        self._finished = False
+
+    def read_batch(self, max_frames: int) -> List[Tuple[int, Optional[float], np.ndarray]]:
+        frames: List[Tuple[int, Optional[float], np.ndarray]] = []
+        while not self._finished and len(frames) < max_frames:
+            frame_index = self._frame_index
+            if not self._capture.grab():
+                self._finished = True
+                break
+            self._frame_index += 1
+            if frame_index % self.frame_stride != 0:
+                continue
+            ok, frame = self._capture.retrieve()
+            if not ok:
+                self._finished = True
+                break
+            timestamp_ms = frame_index * 1000.0 / self.fps if self.fps else None
+            frames.append((frame_index, timestamp_ms, frame))
+        return frames
+
+    def close(self) -> None:
+        self._capture.release()
@@ -1,107 +1,459 @@
-from ultralytics import YOLO
 import numpy as np
 import base64
 import cv2
 import torch
-from typing import List, Dict, Optional
-from src.backend.models.bounding_box import BoundingBox
+import os
+import time
+import logging
+import threading
+import copy
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Callable, List, Dict, Optional, Tuple, Union
 from src.backend.models.detection_response import DetectionResponse
 from src.backend.models.yolo_model_size import YoloModelSize
 from src.backend.models.device_type import DeviceType
+from src.backend.models.inference_backend import InferenceBackend
+from src.backend.models.detection_options import DetectionOptions
+from src.backend.models.inference_precision import InferencePrecision
+from src.backend.services.model_exporter import ModelExporter
+from src.backend.services.model_registry import LoadedModel, ModelRegistry
+from src.backend.services.precision import ModelTuning, tune_model
+from src.backend.services.result_cache import ResultCache
+from src.backend.services.metrics import StageTimer, optional_stage
+from src.backend.services.roi import crop, merge_windows, plan_windows
+from src.backend.services.image_decoding import (
+    FULL_SCALE,
+    ImageHeader,
+    Scale,
+    check_image,
+    decode_reduced,
+    reduction_factor,
+    rescale
+)
 from src.backend.config import settings
 
+if TYPE_CHECKING:
+    from ultralytics import YOLO
+
+
+logger = logging.getLogger(__name__)
+
+ImageInput = Union[str, bytes, bytearray, memoryview, np.ndarray]
+DetectionTask = Tuple[ImageInput, DeviceType, Optional[int], Optional[YoloModelSize], Optional[DetectionOptions]]
+BatchRunner = Callable[
+    [
+        List[np.ndarray],
+        DeviceType,
+        Optional[int],
+        Optional[List[Optional[StageTimer]]],
+        Optional[YoloModelSize],
+        Optional[int],
+        Optional[float]
+    ],
+    List[DetectionResponse]
+]
+
 
 class HumanDetectionService:
     def __init__(
         self, 
         model_size: YoloModelSize = YoloModelSize.NANO, 
         confidence_threshold: float = 0.5,
-        supported_devices: List[DeviceType] = None
+        supported_devices: List[DeviceType] = None,
+        backend: InferenceBackend = InferenceBackend.PYTORCH,
+        int8: bool = False,
+        model_dir: Optional[str] = None,
+        int8_data: str = "coco8.yaml",
+        result_cache: Optional[ResultCache] = None,
+        max_loaded_models: int = 2,
+        allowed_model_sizes: Optional[List[YoloModelSize]] = None,
+        reduced_decode: bool = True,
+        preload: bool = True,
+        precision: InferencePrecision = InferencePrecision.FP32,
+        channels_last: bool = False,
+        compile_model: bool = False,
+        max_image_bytes: Optional[int] = None,
+        max_image_pixels: Optional[int] = None
     ):
+        self.model_size = model_size
+        self.reduced_decode = reduced_decode
+        self.max_image_bytes = max_image_bytes
+        self.max_image_pixels = max_image_pixels
+        self.allowed_model_sizes = allowed_model_sizes or list(YoloModelSize)
         self.confidence_threshold = confidence_threshold
+        self.result_cache = result_cache
         self.person_class_id = 0
         self.supported_devices = supported_devices or [DeviceType.CPU, DeviceType.GPU]
-        self.models: Dict[DeviceType, Optional[YOLO]] = {}
+        self.exporter = ModelExporter(backend=backend, model_dir=model_dir, int8=int8, int8_data=int8_data)
+        self.models = ModelRegistry(self._load_model, max_loaded_models)
+        self.available_devices: List[DeviceType] = []
+        # Keyed by (device, model size): a fallback to PyTorch applies to the size that failed to load.
+        self.backends: Dict[Tuple[DeviceType, YoloModelSize], InferenceBackend] = {}
+        # Precision, layout and compilation apply to PyTorch models only; tunings holds what took effect.
+        self.tuning = ModelTuning(precision=precision, channels_last=channels_last, compile=compile_model)
+        self.tunings: Dict[Tuple[DeviceType, YoloModelSize], ModelTuning] = {}
+        self._decode_executor: Optional[ThreadPoolExecutor] = None
+        self._decode_executor_lock = threading.Lock()
         
+        # With preload, the default size is loaded up front to find out which devices
+        # work; otherwise devices are assumed to work until preload_device fails on one.
+        # Other sizes are loaded on first request.
         for device in self.supported_devices:
+            if device == DeviceType.GPU and not torch.cuda.is_available():
+                continue
+            if not preload or self.preload_device(device):
+                self.available_devices.append(device)
+    
+    def preload_device(self, device: DeviceType) -> bool:
+        """Load the default model on a device; a device it fails on is no longer offered."""
+        try:
+            self.models.get(self.model_size, device)
+            return True
+        except Exception as e:
+            logger.warning("Could not load %s on %s: %s", self.model_size.value, device.value, e)
+            if device in self.available_devices:
+                self.available_devices.remove(device)
+            return False
+    
+    def _load_model(self, model_size: YoloModelSize, device: DeviceType) -> "YOLO":
+        # Ultralytics takes seconds to import, so it is only imported once a model is needed.
+        from ultralytics import YOLO
+        
+        # Exported backends are CPU runtimes; CUDA always runs the PyTorch weights.
+        if device == DeviceType.CPU and self.exporter.backend != InferenceBackend.PYTORCH:
             try:
-                if device == DeviceType.GPU and not torch.cuda.is_available():
-                    self.models[device] = None
-                else:
-                    model = YOLO(model_size.value)
-                    model.to(device.value)
-                    self.models[device] = model
-            except Exception:
-                self.models[device] = None
-    
-    def _decode_image(self, base64_image: str) -> np.ndarray:
-        image_bytes = base64.b64decode(base64_image)
-        nparr = np.frombuffer(image_bytes, np.uint8)
-        image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+                model = YOLO(self.exporter.resolve(model_size), task="detect")
+                self.backends[device, model_size] = self.exporter.backend
+                self.tunings[device, model_size] = ModelTuning()
+                return model
+            except Exception as e:
+                logger.warning(
+                    "Could not load %s backend for %s, falling back to PyTorch: %s",
+                    self.exporter.backend.value, model_size.value, e
+                )
+        
+        model = YOLO(str(self.exporter.weights_path(model_size)))
+        model.to(device.value)
+        # Fuse now rather than on first predict, so replicas sharing these weights never race to fuse them.
+        model.fuse()
+        self.tunings[device, model_size] = tune_model(model.model, device, self.tuning)
+        self.backends[device, model_size] = InferenceBackend.PYTORCH
+        return model
+    
+    def to_buffer(self, image_data: ImageInput, timer: Optional[StageTimer] = None) -> np.ndarray:
+        if isinstance(image_data, str):
+            with optional_stage(timer, "base64"):
+                return np.frombuffer(base64.b64decode(image_data), np.uint8)
+        if isinstance(image_data, np.ndarray):
+            return np.ascontiguousarray(image_data).reshape(-1).view(np.uint8)
+        return np.frombuffer(image_data, np.uint8)
+    
+    def inspect_image(self, image_data: ImageInput, timer: Optional[StageTimer] = None) -> ImageHeader:
+        """
+        Format and size from the image's header, checked against the byte and
+        pixel limits without decoding it. Raises ImageTooLargeError or ValueError.
+        """
+        return check_image(self.to_buffer(image_data, timer), self.max_image_bytes, self.max_image_pixels)
+    
+    def decode_image(self, image_data: ImageInput, timer: Optional[StageTimer] = None) -> np.ndarray:
+        nparr = self.to_buffer(image_data, timer)
+        check_image(nparr, self.max_image_bytes, self.max_image_pixels)
+        with optional_stage(timer, "imdecode"):
+            image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
         if image is None:
             raise ValueError("Failed to decode image")
         return image
     
-    def detect_humans(
-        self, 
-        base64_image: str, 
-        device: DeviceType = DeviceType.GPU,
-        cpu_threads: Optional[int] = None
-    ) -> DetectionResponse:
+    def decode_for_detection(
+        self,
+        image_data: ImageInput,
+        timer: Optional[StageTimer] = None,
+        options: Optional[DetectionOptions] = None
+    ) -> Tuple[np.ndarray, Scale]:
+        """
+        Decode an image no larger than detection needs. Large JPEGs are decoded at
+        1/2, 1/4 or 1/8 size when that still covers the inference resolution; the
+        returned scale maps boxes on the decoded image back to the original.
+        Images over the byte or pixel limit are rejected from their header first.
+        """
+        nparr = self.to_buffer(image_data, timer)
+        header = check_image(nparr, self.max_image_bytes, self.max_image_pixels)
+        factor = 1
+        if self.reduced_decode and header.format == "jpeg":
+            factor = reduction_factor(header.width, header.height, options)
+        with optional_stage(timer, "imdecode"):
+            if factor == 1:
+                image, scale = cv2.imdecode(nparr, cv2.IMREAD_COLOR), FULL_SCALE
+            else:
+                image, scale = decode_reduced(nparr, header.width, header.height, factor)
+        if image is None:
+            raise ValueError("Failed to decode image")
+        return image, scale
+    
+    def decode_images(
+        self,
+        images: List[ImageInput],
+        timer: Optional[StageTimer] = None,
+        options: Optional[List[Optional[DetectionOptions]]] = None
+    ) -> List[Union[Tuple[np.ndarray, Scale], Exception]]:
+        def decode(task: Tuple[ImageInput, Optional[DetectionOptions]]) -> Union[Tuple[np.ndarray, Scale], Exception]:
+            try:
+                return self.decode_for_detection(task[0], timer, task[1])
+            except Exception as e:
+                return e
+        
+        tasks = list(zip(images, options or [None] * len(images)))
+        if len(tasks) <= 1:
+            return [decode(task) for task in tasks]
+        return list(self._get_decode_executor().map(decode, tasks))
+    
+    def _get_decode_executor(self) -> ThreadPoolExecutor:
+        with self._decode_executor_lock:
+            if self._decode_executor is None:
+                self._decode_executor = ThreadPoolExecutor(
+                    max_workers=os.cpu_count() or 1,
+                    thread_name_prefix="decode"
+                )
+            return self._decode_executor
+    
+    def get_model(self, device: DeviceType, model_size: Optional[YoloModelSize] = None) -> "YOLO":
+        return self._get_loaded_model(device, model_size).model
+    
+    def _get_loaded_model(self, device: DeviceType, model_size: Optional[YoloModelSize] = None) -> LoadedModel:
+        return self.models.get(self.check_request(device, model_size), device)
+    
+    def check_request(self, device: DeviceType, model_size: Optional[YoloModelSize] = None) -> YoloModelSize:
+        """The model size a request will run with; raises ValueError for a device or size that cannot serve it."""
+        available = [d.value for d in self.available_devices]
         if device not in self.supported_devices:
-            available = [d.value for d in self.supported_devices if self.models.get(d)]
             raise ValueError(
                 f"Device '{device.value}' is not supported. "
                 f"Available devices: {available}"
             )
-        
-        model = self.models.get(device)
-        if model is None:
-            available = [d.value for d in self.supported_devices if self.models.get(d)]
+        if device not in self.available_devices:
             raise ValueError(
                 f"Device '{device.value}' requested but not available in this environment. "
                 f"Available devices: {available}"
             )
         
-        if device == DeviceType.CPU and cpu_threads is not None:
-            original_threads = torch.get_num_threads()
-            torch.set_num_threads(cpu_threads)
+        model_size = model_size or self.model_size
+        if model_size not in self.allowed_model_sizes:
+            raise ValueError(
+                f"Model size '{model_size.value}' is not enabled. "
+                f"Available model sizes: {[size.value for size in self.allowed_model_sizes]}"
+            )
+        return model_size
+    
+    def replicate(self, model: "YOLO") -> "YOLO":
+        # A shallow copy shares the weights but gets its own predictor, so it can run
+        # concurrently with the original without doubling memory.
+        replica = copy.copy(model)
+        replica.predictor = None
+        return replica
+    
+    def cache_key(
+        self,
+        buffer: np.ndarray,
+        device: DeviceType,
+        model_size: Optional[YoloModelSize] = None,
+        options: Optional[DetectionOptions] = None
+    ) -> Optional[str]:
+        if self.result_cache is None:
+            return None
+        params = [model_size or self.model_size, self.confidence_threshold, device]
+        if options is not None and not options.is_default():
+            params.append(options.cache_token())
+        return ResultCache.make_key(buffer, *params)
+    
+    def cached_response(self, key: Optional[str]) -> Optional[DetectionResponse]:
+        if key is None:
+            return None
+        return self.result_cache.get(key)
+    
+    def cache_response(self, key: Optional[str], response: DetectionResponse) -> None:
+        if key is not None:
+            self.result_cache.put(key, response)
+    
+    def detect_humans(
+        self, 
+        image_data: ImageInput, 
+        device: DeviceType = DeviceType.GPU,
+        cpu_threads: Optional[int] = None,
+        run_batch: Optional[BatchRunner] = None,
+        timer: Optional[StageTimer] = None,
+        model_size: Optional[YoloModelSize] = None,
+        options: Optional[DetectionOptions] = None
+    ) -> DetectionResponse:
+        # Checked before decoding, but the model itself is loaded by whatever runs the batch.
+        self.check_request(device, model_size)
+        buffer = self.to_buffer(image_data, timer)
+        with optional_stage(timer, "cache"):
+            key = self.cache_key(buffer, device, model_size, options)
+            cached = self.cached_response(key)
+        if cached is not None:
+            return cached
         
-        image = self._decode_image(base64_image)
+        image, scale = self.decode_for_detection(buffer, timer, options)
+        response = self.detect_decoded(
+            [image], device, cpu_threads, run_batch, timer, model_size, options, [scale]
+        )[0]
+        self.cache_response(key, response)
+        return response
+    
+    def detect_decoded(
+        self,
+        images: List[np.ndarray],
+        device: DeviceType = DeviceType.GPU,
+        cpu_threads: Optional[int] = None,
+        run_batch: Optional[BatchRunner] = None,
+        timer: Optional[StageTimer] = None,
+        model_size: Optional[YoloModelSize] = None,
+        options: Optional[DetectionOptions] = None,
+        scales: Optional[List[Scale]] = None
+    ) -> List[DetectionResponse]:
+        """
+        Detect humans in decoded images that share the same options. Regions and
+        tiles of every image go to the model as one batch, and their boxes are
+        mapped back to the original image. ``scales`` are those returned by
+        decode_for_detection for images decoded at reduced size.
+        """
+        scales = scales or [FULL_SCALE] * len(images)
+        plans = [
+            plan_windows(image.shape[0], image.shape[1], options, scale)
+            for image, scale in zip(images, scales)
+        ]
+        crops: List[np.ndarray] = []
+        owners: List[int] = []
+        for index, (image, windows) in enumerate(zip(images, plans)):
+            if windows is None:
+                crops.append(image)
+                owners.append(index)
+            else:
+                crops.extend(crop(image, window) for window in windows)
+                owners.extend([index] * len(windows))
         
-        results = model(
-            image,
-            conf=self.confidence_threshold,
-            classes=[self.person_class_id],
-            verbose=False
-        )
+        imgsz = options.imgsz if options is not None else None
+        confidence = options.confidence if options is not None else None
+        responses = (run_batch or self.detect_humans_batch)(
+            crops, device, cpu_threads, [timer] * len(crops), model_size, imgsz, confidence
+        ) if crops else []
         
-        if device == DeviceType.CPU and cpu_threads is not None:
-            torch.set_num_threads(original_threads)
+        parts: List[List[DetectionResponse]] = [[] for _ in images]
+        for owner, response in zip(owners, responses):
+            parts[owner].append(response)
+        with optional_stage(timer, "roi") if any(windows is not None for windows in plans) else nullcontext():
+            merged = [
+                parts[index][0] if windows is None else merge_windows(windows, parts[index])
+                for index, windows in enumerate(plans)
+            ]
+        return [rescale(response, scale) for response, scale in zip(merged, scales)]
+    
+    def detect_humans_batch(
+        self,
+        images: List[np.ndarray],
+        device: DeviceType = DeviceType.GPU,
+        cpu_threads: Optional[int] = None,
+        timers: Optional[List[Optional[StageTimer]]] = None,
+        model_size: Optional[YoloModelSize] = None,
+        imgsz: Optional[int] = None,
+        confidence: Optional[float] = None,
+        model: Optional["YOLO"] = None
+    ) -> List[DetectionResponse]:
+        # A model passed in is a replica owned by the calling worker; the shared model is locked.
+        if model is None:
+            loaded = self._get_loaded_model(device, model_size)
+            model, lock = loaded.model, loaded.lock
+        else:
+            lock = nullcontext()
+        unique_timers = list({id(timer): timer for timer in timers or [] if timer is not None}.values())
         
-        bounding_boxes: List[BoundingBox] = []
-        max_confidence = 0.0
+        with lock:
+            # Thread counts apply to the calling thread only (OpenMP); pinned workers already match.
+            if device == DeviceType.CPU and cpu_threads is not None and torch.get_num_threads() != cpu_threads:
+                torch.set_num_threads(cpu_threads)
+            
+            results = model(
+                images,
+                conf=confidence if confidence is not None else self.confidence_threshold,
+                classes=[self.person_class_id],
+                device=device.value,
+                verbose=False,
+                **({"imgsz": imgsz} if imgsz is not None else {})
+            )
         
-        for result in results:
-            boxes = result.boxes
-            for box in boxes:
-                confidence = float(box.conf[0])
-                x1, y1, x2, y2 = box.xyxy[0].tolist()
-                bounding_boxes.append(
-                    BoundingBox(
-                        x1=x1,
-                        y1=y1,
-                        x2=x2,
-                        y2=y2,
-                        confidence=confidence
-                    )
-                )
-                max_confidence = max(max_confidence, confidence)
+        build_start = time.perf_counter()
+        responses = [self._build_response(result) for result in results]
+        build_seconds = time.perf_counter() - build_start
         
-        human_detected = len(bounding_boxes) > 0
+        # Ultralytics reports per-image averages; every request in the batch waited for the whole batch.
+        for stage in ("preprocess", "inference", "postprocess"):
+            seconds = sum(result.speed.get(stage) or 0.0 for result in results) / 1000.0
+            for timer in unique_timers:
+                timer.add(stage, seconds)
+        for timer in unique_timers:
+            timer.add("response", build_seconds)
         
-        return DetectionResponse(
-            human_detected=human_detected,
-            bounding_boxes=bounding_boxes,
-            max_confidence=max_confidence if human_detected else 0.0
-        )
+        return responses
+    
+    def detect_humans_many(
+        self,
+        tasks: List[DetectionTask],
+        run_batch: Optional[BatchRunner] = None,
+        timer: Optional[StageTimer] = None
+    ) -> List[Union[DetectionResponse, Exception]]:
+        outcomes: List[Union[DetectionResponse, Exception, None]] = [None] * len(tasks)
+        keys: List[Optional[str]] = [None] * len(tasks)
+        pending: List[int] = []
+        buffers: List[np.ndarray] = []
+        for index, (image_data, device, _, model_size, options) in enumerate(tasks):
+            try:
+                buffer = self.to_buffer(image_data, timer)
+                with optional_stage(timer, "cache"):
+                    keys[index] = self.cache_key(buffer, device, model_size, options)
+                    outcomes[index] = self.cached_response(keys[index])
+            except Exception as e:
+                outcomes[index] = e
+                continue
+            if outcomes[index] is None:
+                pending.append(index)
+                buffers.append(buffer)
+        
+        # Images sharing device, threads, model and options run through the model together.
+        groups: Dict[Tuple[DeviceType, Optional[int], Optional[YoloModelSize], str], List[int]] = {}
+        decoded = self.decode_images(buffers, timer, [tasks[index][4] for index in pending])
+        scales: Dict[int, Scale] = {}
+        for index, image in zip(pending, decoded):
+            if isinstance(image, Exception):
+                outcomes[index] = image
+            else:
+                outcomes[index], scales[index] = image
+                _, device, cpu_threads, model_size, options = tasks[index]
+                token = options.cache_token() if options is not None else ""
+                groups.setdefault((device, cpu_threads, model_size, token), []).append(index)
+        
+        for (device, cpu_threads, model_size, _), indices in groups.items():
+            try:
+                responses = self.detect_decoded(
+                    [outcomes[i] for i in indices],
+                    device,
+                    cpu_threads,
+                    run_batch,
+                    timer,
+                    model_size,
+                    tasks[indices[0]][4],
+                    [scales[i] for i in indices]
+                )
+            except Exception as e:
+                responses = [e] * len(indices)
+            for index, response in zip(indices, responses):
+                outcomes[index] = response
+                if not isinstance(response, Exception):
+                    self.cache_response(keys[index], response)
+        
+        return outcomes
+    
+    def _build_response(self, result) -> DetectionResponse:
+        # One device-to-host copy for all boxes; rows are x1, y1, x2, y2, confidence, class.
+        data = result.boxes.cpu().numpy().data
+        return DetectionResponse.from_boxes(np.asarray(data[:, :5], dtype=np.float32))
@@ -0,0 +1,232 @@
+import cv2
+import struct
+import numpy as np
+from typing import NamedTuple, Optional, Tuple, Union
+from src.backend.models.detection_options import DetectionOptions
+from src.backend.models.detection_response import DetectionResponse
+from src.backend.services.roi import DEFAULT_IMGSZ
+
+
+# Original pixels per decoded pixel, along x and y.
+Scale = Tuple[float, float]
+FULL_SCALE: Scale = (1.0, 1.0)
+
+# libjpeg scales the inverse DCT, so these decode a fraction of the pixels instead
+# of decoding everything and resizing afterwards.
+REDUCED_MODES = {
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8
+}
+
+_JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+_JPEG_STANDALONE_MARKERS = {0x01, *range(0xD0, 0xD8)}
+
+Buffer = Union[np.ndarray, bytes, bytearray, memoryview]
+
+
+class ImageHeader(NamedTuple):
+    format: str
+    width: int
+    height: int
+
+
+class ImageTooLargeError(ValueError):
+    """An image over the configured byte or pixel limit."""
+
+
+def jpeg_size(buffer: np.ndarray) -> Optional[Tuple[int, int]]:
+    """
+    Width and height from a JPEG's frame header, without decoding it. None when
+    the buffer is not a JPEG or the header is cut short.
+    """
+    data = memoryview(buffer)
+    if len(data) < 4 or data[0] != 0xFF or data[1] != 0xD8:
+        return None
+    
+    position = 2
+    while position + 4 <= len(data):
+        if data[position] != 0xFF:
+            return None
+        marker = data[position + 1]
+        if marker == 0xFF:
+            # Fill byte before a marker.
+            position += 1
+            continue
+        if marker in _JPEG_STANDALONE_MARKERS:
+            position += 2
+            continue
+        if marker in (0xD9, 0xDA):
+            # End of image or start of scan before any frame header.
+            return None
+        length = (data[position + 2] << 8) | data[position + 3]
+        if marker in _JPEG_SOF_MARKERS:
+            if position + 9 > len(data):
+                return None
+            height = (data[position + 5] << 8) | data[position + 6]
+            width = (data[position + 7] << 8) | data[position + 8]
+            return (width, height) if width and height else None
+        position += 2 + length
+    return None
+
+
+def _unpack(layout: str, data: memoryview, offset: int) -> Optional[Tuple[int, ...]]:
+    if offset + struct.calcsize(layout) > len(data):
+        return None
+    return struct.unpack_from(layout, data, offset)
+
+
+def _png_size(data: memoryview) -> Optional[Tuple[int, int]]:
+    # The IHDR chunk always comes first.
+    if data[12:16] != b"IHDR":
+        return None
+    return _unpack(">II", data, 16)
+
+
+def _gif_size(data: memoryview) -> Optional[Tuple[int, int]]:
+    return _unpack("<HH", data, 6)
+
+
+def _bmp_size(data: memoryview) -> Optional[Tuple[int, int]]:
+    header_size = _unpack("<I", data, 14)
+    if header_size is None:
+        return None
+    if header_size[0] == 12:
+        return _unpack("<HH", data, 18)
+    size = _unpack("<ii", data, 18)
+    # A negative height stores rows top-down.
+    return (abs(size[0]), abs(size[1])) if size is not None else None
+
+
+def _webp_size(data: memoryview) -> Optional[Tuple[int, int]]:
+    chunk = bytes(data[12:16])
+    if chunk == b"VP8 ":
+        if data[23:26] != b"\x9d\x01\x2a":
+            return None
+        size = _unpack("<HH", data, 26)
+        return (size[0] & 0x3FFF, size[1] & 0x3FFF) if size is not None else None
+    if chunk == b"VP8L":
+        bits = _unpack("<I", data, 21)
+        if data[20:21] != b"\x2f" or bits is None:
+            return None
+        return (bits[0] & 0x3FFF) + 1, ((bits[0] >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X":
+        size = _unpack("<HBHB", data, 24)
+        if size is None:
+            return None
+        return (size[0] | size[1] << 16) + 1, (size[2] | size[3] << 16) + 1
+    return None
+
+
+def _tiff_size(data: memoryview) -> Optional[Tuple[int, int]]:
+    order = "<" if data[:2] == b"II" else ">"
+    offset = _unpack(order + "I", data, 4)
+    count = _unpack(order + "H", data, offset[0]) if offset is not None else None
+    if count is None:
+        return None
+    values = {}
+    for entry in range(count[0]):
+        field = _unpack(order + "HHI", data, offset[0] + 2 + 12 * entry)
+        if field is None:
+            return None
+        tag, kind, _ = field
+        if tag in (256, 257):
+            # ImageWidth and ImageLength are SHORT or LONG values stored inline.
+            value = _unpack(order + ("H" if kind == 3 else "I"), data, offset[0] + 10 + 12 * entry)
+            if value is None:
+                return None
+            values[tag] = value[0]
+    return (values[256], values[257]) if 256 in values and 257 in values else None
+
+
+def image_header(buffer: Buffer) -> Optional[ImageHeader]:
+    """
+    Format, width and height from an encoded image's header, reading a few bytes
+    (and for JPEG and TIFF walking a few segments) instead of decoding it. None
+    for formats other than JPEG, PNG, GIF, BMP, WebP and TIFF, or a broken header.
+    """
+    data = memoryview(buffer).cast("B")
+    size: Optional[Tuple[int, int]]
+    if data[:2] == b"\xff\xd8":
+        image_format, size = "jpeg", jpeg_size(buffer)
+    elif data[:8] == b"\x89PNG\r\n\x1a\n":
+        image_format, size = "png", _png_size(data)
+    elif data[:6] in (b"GIF87a", b"GIF89a"):
+        image_format, size = "gif", _gif_size(data)
+    elif data[:2] == b"BM":
+        image_format, size = "bmp", _bmp_size(data)
+    elif data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        image_format, size = "webp", _webp_size(data)
+    elif data[:4] in (b"II*\x00", b"MM\x00*"):
+        image_format, size = "tiff", _tiff_size(data)
+    else:
+        return None
+    if size is None or not size[0] or not size[1]:
+        return None
+    return ImageHeader(image_format, size[0], size[1])
+
+
+def check_size(length: int, max_bytes: Optional[int]) -> None:
+    if max_bytes is not None and length > max_bytes:
+        raise ImageTooLargeError(f"Image is {length} bytes, over the limit of {max_bytes}")
+
+
+def check_image(buffer: Buffer, max_bytes: Optional[int] = None, max_pixels: Optional[int] = None) -> ImageHeader:
+    """
+    The image's header, once it is known to be within ``max_bytes`` and
+    ``max_pixels``. Raises ImageTooLargeError for an image over either limit,
+    and ValueError for one whose header cannot be read, so neither is decoded.
+    """
+    check_size(memoryview(buffer).nbytes, max_bytes)
+    header = image_header(buffer)
+    if header is None:
+        raise ValueError("Failed to decode image")
+    if max_pixels is not None and header.width * header.height > max_pixels:
+        raise ImageTooLargeError(
+            f"Image is {header.width}x{header.height} pixels, over the limit of {max_pixels}"
+        )
+    return header
+
+
+def reduction_factor(width: int, height: int, options: Optional[DetectionOptions] = None) -> int:
+    """
+    The largest of 2, 4 and 8 that still leaves every part of the image the model
+    sees at least as large as the inference size, or 1 to decode at full size.
+    """
+    if options is not None and options.tile:
+        # Tiles exist to keep full resolution.
+        return 1
+    
+    extent = max(width, height)
+    if options is not None and options.regions:
+        # Rotated (EXIF) images may swap axes, so regions are bounded by the long side only.
+        extent = max(
+            min(max(x2 - x1, y2 - y1), extent)
+            for x1, y1, x2, y2 in (region.bounds() for region in options.regions)
+        )
+    target = (options.imgsz if options is not None else None) or DEFAULT_IMGSZ
+    
+    factor = 1
+    for candidate in sorted(REDUCED_MODES):
+        if extent / candidate >= target:
+            factor = candidate
+    return factor
+
+
+def decode_reduced(buffer: np.ndarray, width: int, height: int, factor: int) -> Tuple[Optional[np.ndarray], Scale]:
+    """Decode at 1/factor size; the scale maps decoded pixels back to the original."""
+    image = cv2.imdecode(buffer, REDUCED_MODES[factor])
+    if image is None:
+        return None, FULL_SCALE
+    decoded_height, decoded_width = image.shape[:2]
+    if (decoded_width > decoded_height) != (width > height) and width != height:
+        # Decoding applied an EXIF rotation.
+        width, height = height, width
+    return image, (width / decoded_width, height / decoded_height)
+
+
+def rescale(response: DetectionResponse, scale: Scale) -> DetectionResponse:
+    if scale == FULL_SCALE or not response.bounding_boxes:
+        return response
+    factors = np.array([scale[0], scale[1], scale[0], scale[1], 1.0], dtype=np.float32)
+    return DetectionResponse.from_boxes(response.box_array() * factors)
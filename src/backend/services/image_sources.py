@@ -0,0 +1,138 @@
+import mmap
+import os
+import tarfile
+import zipfile
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+from src.backend.services.image_decoding import ImageTooLargeError, check_size
+
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp", ".bmp", ".tif", ".tiff"}
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+
+
+def is_image_name(name: str) -> bool:
+    return os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS
+
+
+def archive_suffix(name: str) -> Optional[str]:
+    """The archive suffix of a file name, such as ``.tar.gz``, or None if it names no archive."""
+    matches = [suffix for suffix in ARCHIVE_SUFFIXES if name.lower().endswith(suffix)]
+    return max(matches, key=len) if matches else None
+
+
+def is_within(path: str, roots: Sequence[str]) -> bool:
+    """Whether ``path`` resolves to somewhere inside one of ``roots``."""
+    real = os.path.realpath(path)
+    for root in roots:
+        root = os.path.realpath(root)
+        if real == root or real.startswith(root.rstrip(os.sep) + os.sep):
+            return True
+    return False
+
+
+def expand_paths(paths: Iterable[str]) -> Iterator[str]:
+    """
+    Image files listed in ``paths``, with directories replaced by the images under
+    them in sorted order, so the same input always yields the same sequence.
+    """
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for directory, subdirectories, files in os.walk(path):
+            subdirectories.sort()
+            for name in sorted(files):
+                if is_image_name(name):
+                    yield os.path.join(directory, name)
+
+
+def map_file(path: str) -> Union[memoryview, bytes]:
+    """
+    A read-only memory map of a file. Pages are read on first access, without a
+    copy into Python memory; the mapping is released with the last view of it.
+    """
+    with open(path, "rb") as source:
+        if os.fstat(source.fileno()).st_size == 0:
+            return b""
+        return memoryview(mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+def _open_archive(path: str):
+    if zipfile.is_zipfile(path):
+        return zipfile.ZipFile(path)
+    if tarfile.is_tarfile(path):
+        # Stream mode reads compressed tars front to back without seeking.
+        return tarfile.open(path, "r|*")
+    raise ValueError("Unsupported archive, expected zip or tar")
+
+
+def _plain_tar_members(path: str) -> Optional[List[tarfile.TarInfo]]:
+    """Image members of an uncompressed tar, whose data can be mapped in place; None for other archives."""
+    if zipfile.is_zipfile(path):
+        return None
+    try:
+        with tarfile.open(path, "r:") as archive:
+            return [member for member in archive.getmembers() if member.isfile() and is_image_name(member.name)]
+    except tarfile.ReadError:
+        return None
+
+
+def count_archive_images(path: str) -> int:
+    members = _plain_tar_members(path)
+    if members is not None:
+        return len(members)
+    archive = _open_archive(path)
+    with archive:
+        if isinstance(archive, zipfile.ZipFile):
+            return sum(1 for info in archive.infolist() if not info.is_dir() and is_image_name(info.filename))
+        return sum(1 for member in archive if member.isfile() and is_image_name(member.name))
+
+
+def _size_error(size: int, max_bytes: Optional[int]) -> Optional[ImageTooLargeError]:
+    try:
+        check_size(size, max_bytes)
+    except ImageTooLargeError as e:
+        return e
+    return None
+
+
+def iter_archive(
+    path: str,
+    start: int = 0,
+    max_bytes: Optional[int] = None
+) -> Iterator[Tuple[str, Union[memoryview, bytes, ImageTooLargeError]]]:
+    """
+    Name and contents of each image in a zip or tar, in archive order, from the
+    ``start``-th one. Members of an uncompressed tar are views into a memory map
+    of the archive; compressed members are read into memory one at a time.
+    A member over ``max_bytes`` uncompressed comes with an ImageTooLargeError
+    instead of its contents and is never read.
+    """
+    members = _plain_tar_members(path)
+    if members is not None:
+        mapped = map_file(path)
+        for member in members[start:]:
+            error = _size_error(member.size, max_bytes)
+            yield member.name, error or mapped[member.offset_data:member.offset_data + member.size]
+        return
+    
+    archive = _open_archive(path)
+    with archive:
+        if isinstance(archive, zipfile.ZipFile):
+            infos = [info for info in archive.infolist() if not info.is_dir() and is_image_name(info.filename)]
+            for info in infos[start:]:
+                error = _size_error(info.file_size, max_bytes)
+                yield info.filename, error or archive.read(info)
+            return
+        members = (member for member in archive if member.isfile() and is_image_name(member.name))
+        for member in islice(members, start, None):
+            error = _size_error(member.size, max_bytes)
+            yield member.name, error or archive.extractfile(member).read()
+
+
+def iter_manifest(path: str, start: int = 0) -> Iterator[str]:
+    """Paths in a manifest file with one path per line, from the ``start``-th one."""
+    with open(path, encoding="utf-8") as manifest:
+        for line in islice(manifest, start, None):
+            yield line.rstrip("\n")
@@ -0,0 +1,175 @@
+import asyncio
+import contextvars
+import multiprocessing
+import os
+import threading
+import numpy as np
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from src.backend.models.detection_response import DetectionResponse
+from src.backend.models.device_type import DeviceType
+from src.backend.models.inference_executor import InferenceExecutor
+from src.backend.models.yolo_model_size import YoloModelSize
+from src.backend.models.detection_options import DetectionOptions
+from src.backend.services.metrics import StageTimer
+from src.backend.services.cpu_affinity import set_process_threads
+
+
+class InferencePoolFullError(RuntimeError):
+    def __init__(self, capacity: int, retry_after: int):
+        super().__init__(f"Inference queue is full ({capacity} requests in flight)")
+        self.capacity = capacity
+        self.retry_after = retry_after
+
+
+class InferencePool:
+    """
+    Runs blocking inference work off the event loop with bounded admission.
+
+    At most ``max_workers`` calls run at once and up to ``max_queue_size`` more may
+    wait for a worker. Anything beyond that is rejected immediately with
+    ``InferencePoolFullError`` instead of queueing without bound.
+    """
+
+    def __init__(
+        self,
+        kind: InferenceExecutor = InferenceExecutor.THREAD,
+        max_workers: int = 8,
+        max_queue_size: int = 32,
+        retry_after: int = 1,
+        initializer: Optional[Callable[..., None]] = None,
+        initargs: Tuple[Any, ...] = ()
+    ):
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self.retry_after = retry_after
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._executor: Executor
+        if kind == InferenceExecutor.PROCESS:
+            self._executor = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=initializer,
+                initargs=initargs
+            )
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=max_workers,
+                thread_name_prefix="inference",
+                initializer=initializer,
+                initargs=initargs
+            )
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue_size
+
+    @property
+    def in_flight(self) -> int:
+        with self._lock:
+            return self._in_flight
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                raise InferencePoolFullError(self.capacity, self.retry_after)
+            self._in_flight += 1
+        try:
+            if self.kind == InferenceExecutor.PROCESS:
+                future = self._executor.submit(fn, *args)
+            else:
+                # Threads see the request's context variables, such as its deadline.
+                future = self._executor.submit(contextvars.copy_context().run, fn, *args)
+        except Exception:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def _release(self, _: Optional[Future]) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+
+_process_detection_service = None
+_process_warmed_up = False
+
+
+def _get_process_service():
+    if _process_detection_service is None:
+        raise RuntimeError("Process worker was not initialized")
+    return _process_detection_service
+
+
+def init_process_worker(service_options: Dict[str, Any]) -> None:
+    global _process_detection_service
+    from src.backend.config import settings
+    from src.backend.services.human_detection_service import HumanDetectionService
+    from src.backend.services.result_cache import create_result_cache
+    set_process_threads(settings.cpu_threads)
+    _process_detection_service = HumanDetectionService(
+        **service_options,
+        result_cache=create_result_cache(settings)
+    )
+
+
+def warm_up_process_worker(
+    model_sizes: List[YoloModelSize],
+    batch_sizes: List[int],
+    cpu_threads: List[Optional[int]]
+) -> Tuple[int, Dict[str, float]]:
+    """Warm up this worker's models once; returns the worker's pid and startup phases."""
+    global _process_warmed_up
+    from src.backend.services.startup import StartupTracker, warm_up
+    if _process_warmed_up:
+        return os.getpid(), {}
+    tracker = StartupTracker()
+    warm_up(_get_process_service(), tracker, model_sizes, batch_sizes, cpu_threads)
+    _process_warmed_up = True
+    return os.getpid(), tracker.phases()
+
+
+def detect_in_process_worker(
+    image_data: Union[str, bytes, bytearray],
+    device: DeviceType,
+    cpu_threads: Optional[int],
+    model_size: Optional[YoloModelSize] = None,
+    options: Optional[DetectionOptions] = None
+) -> Tuple[DetectionResponse, Dict[str, float]]:
+    timer = StageTimer()
+    response = _get_process_service().detect_humans(
+        image_data, device, cpu_threads, timer=timer, model_size=model_size, options=options
+    )
+    return response, timer.stages
+
+
+def detect_batch_in_process_worker(
+    images: List[np.ndarray],
+    device: DeviceType,
+    cpu_threads: Optional[int],
+    model_size: Optional[YoloModelSize] = None,
+    options: Optional[DetectionOptions] = None
+) -> Tuple[List[DetectionResponse], Dict[str, float]]:
+    timer = StageTimer()
+    responses = _get_process_service().detect_decoded(
+        images, device, cpu_threads, timer=timer, model_size=model_size, options=options
+    )
+    return responses, timer.stages
+
+
+def detect_many_in_process_worker(
+    tasks: List[Tuple[
+        Union[str, bytes, bytearray], DeviceType, Optional[int], Optional[YoloModelSize], Optional[DetectionOptions]
+    ]]
+) -> Tuple[List[Union[DetectionResponse, Exception]], Dict[str, float]]:
+    timer = StageTimer()
+    outcomes = _get_process_service().detect_humans_many(tasks, timer=timer)
+    return outcomes, timer.stages
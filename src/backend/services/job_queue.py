@@ -0,0 +1,388 @@
+import json
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+from src.backend.models.detection_response import DetectionResponse
+from src.backend.models.job_request import JobRequest
+from src.backend.models.job_result import JobResult
+from src.backend.models.job_spec import JobSpec
+from src.backend.models.job_state import JobState
+from src.backend.models.job_status import JobStatus
+from src.backend.services.human_detection_service import DetectionTask
+from src.backend.services.image_sources import (
+    archive_suffix,
+    count_archive_images,
+    expand_paths,
+    is_within,
+    iter_archive,
+    iter_manifest,
+    map_file
+)
+
+
+logger = logging.getLogger(__name__)
+
+ChunkRunner = Callable[[List[DetectionTask]], List[Union[DetectionResponse, Exception]]]
+
+_JOB_FILE = "job.json"
+_MANIFEST_FILE = "manifest.txt"
+_RESULTS_FILE = "results.jsonl"
+_ARCHIVE_PREFIX = "input"
+_FINISHED = (JobState.COMPLETED, JobState.FAILED, JobState.CANCELLED)
+
+
+class ArchiveTooLargeError(ValueError):
+    pass
+
+
+class JobNotFoundError(LookupError):
+    def __init__(self, job_id: str):
+        super().__init__(f"Job {job_id} not found")
+        self.job_id = job_id
+
+
+@dataclass
+class _Job:
+    status: JobStatus
+    spec: JobSpec
+    directory: str
+    source: str
+    # Length of results.jsonl at the last checkpoint; anything after it is rewritten on resume.
+    results_bytes: int = 0
+    cancelled: bool = False
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+def _read_prefix(path: str, length: int, block_size: int) -> Iterator[bytes]:
+    if length == 0 or not os.path.exists(path):
+        return
+    with open(path, "rb") as source:
+        while length > 0:
+            block = source.read(min(block_size, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+
+
+class JobManager:
+    """
+    Runs bulk detection jobs in background worker threads.
+    
+    A job is a manifest of server-side paths or an uploaded zip/tar archive. Its
+    images are run in chunks of ``chunk_size`` through ``run_chunk``, which batches
+    them through the model, and each chunk's results are appended to the job's
+    results.jsonl before the progress checkpoint in job.json is advanced. Jobs
+    left queued or running by a previous process resume from their checkpoint.
+    
+    At most ``max_concurrent_jobs`` jobs run at once. Before each chunk a job
+    waits, for up to ``max_yield_seconds``, while ``interactive_load`` reports at
+    least ``yield_in_flight`` interactive requests, so bulk work fills idle
+    capacity instead of competing with latency-sensitive requests.
+    """
+    
+    def __init__(
+        self,
+        root: str,
+        run_chunk: ChunkRunner,
+        max_concurrent_jobs: int = 1,
+        chunk_size: int = 32,
+        input_dirs: Sequence[str] = (),
+        interactive_load: Callable[[], int] = lambda: 0,
+        yield_in_flight: int = 1,
+        max_yield_seconds: float = 1.0,
+        max_image_bytes: Optional[int] = None,
+        max_archive_bytes: Optional[int] = None
+    ):
+        self.root = root
+        self.max_concurrent_jobs = max_concurrent_jobs
+        self.chunk_size = chunk_size
+        self.input_dirs = list(input_dirs)
+        self.yield_in_flight = yield_in_flight
+        self.max_yield_seconds = max_yield_seconds
+        self.max_image_bytes = max_image_bytes
+        self.max_archive_bytes = max_archive_bytes
+        self._run_chunk = run_chunk
+        self._interactive_load = interactive_load
+        self._jobs: Dict[str, _Job] = {}
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._stopping = threading.Event()
+        self._workers: List[threading.Thread] = []
+        self._chunks_in_flight = 0
+    
+    @property
+    def chunks_in_flight(self) -> int:
+        with self._lock:
+            return self._chunks_in_flight
+    
+    def start(self) -> None:
+        """Load jobs from disk, requeue unfinished ones and start the workers."""
+        os.makedirs(self.root, exist_ok=True)
+        resumed = []
+        for job_id in os.listdir(self.root):
+            try:
+                job = self._load(job_id)
+            except (OSError, ValueError) as e:
+                logger.warning("Skipping unreadable job %s: %s", job_id, e)
+                continue
+            self._jobs[job_id] = job
+            if job.status.state not in _FINISHED:
+                job.status.state = JobState.QUEUED
+                resumed.append(job)
+        for job in sorted(resumed, key=lambda job: job.status.created_at):
+            logger.info("Resuming job %s at %d/%d", job.status.id, job.status.processed, job.status.total)
+            self._queue.put(job.status.id)
+        
+        for index in range(self.max_concurrent_jobs):
+            worker = threading.Thread(target=self._work, name=f"job-worker-{index}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+    
+    def shutdown(self) -> None:
+        """Stop after each running job's current chunk; they resume on the next start."""
+        self._stopping.set()
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join()
+        self._workers = []
+    
+    def submit_manifest(self, request: JobRequest) -> JobStatus:
+        if not self.input_dirs:
+            raise ValueError("Path manifests are disabled; set JOB_INPUT_DIRS to allow them")
+        for path in request.paths:
+            if not is_within(path, self.input_dirs):
+                raise ValueError(f"{path} is outside the allowed job input directories")
+        
+        job_id, directory = self._new_directory()
+        try:
+            total = 0
+            with open(os.path.join(directory, _MANIFEST_FILE), "w", encoding="utf-8") as manifest:
+                for path in expand_paths(request.paths):
+                    # Files found under a directory may be symlinks pointing out of it.
+                    if not is_within(path, self.input_dirs):
+                        logger.warning("Skipping %s, which resolves outside the job input directories", path)
+                        continue
+                    manifest.write(path + "\n")
+                    total += 1
+            return self._enqueue(job_id, directory, JobSpec.model_validate(request.model_dump()), _MANIFEST_FILE, total)
+        except Exception:
+            shutil.rmtree(directory, ignore_errors=True)
+            raise
+    
+    def submit_archive(self, source: BinaryIO, filename: str, spec: JobSpec) -> JobStatus:
+        suffix = archive_suffix(filename)
+        if suffix is None:
+            raise ValueError("Unsupported archive, expected zip or tar")
+        
+        job_id, directory = self._new_directory()
+        try:
+            name = _ARCHIVE_PREFIX + suffix
+            with open(os.path.join(directory, name), "wb") as target:
+                copied = 0
+                while True:
+                    block = source.read(1024 * 1024)
+                    if not block:
+                        break
+                    copied += len(block)
+                    if self.max_archive_bytes is not None and copied > self.max_archive_bytes:
+                        raise ArchiveTooLargeError(f"Archive is over the limit of {self.max_archive_bytes} bytes")
+                    target.write(block)
+            total = count_archive_images(os.path.join(directory, name))
+            return self._enqueue(job_id, directory, spec, name, total)
+        except Exception:
+            shutil.rmtree(directory, ignore_errors=True)
+            raise
+    
+    def get(self, job_id: str) -> JobStatus:
+        job = self._job(job_id)
+        with job.lock:
+            return job.status.model_copy()
+    
+    def results(self, job_id: str, block_size: int = 1024 * 1024) -> Iterator[bytes]:
+        """The job's results.jsonl up to its last checkpoint."""
+        job = self._job(job_id)
+        with job.lock:
+            length = job.results_bytes
+        return _read_prefix(os.path.join(job.directory, _RESULTS_FILE), length, block_size)
+    
+    def cancel(self, job_id: str) -> JobStatus:
+        """Cancel a queued or running job; a finished job's files are deleted instead."""
+        job = self._job(job_id)
+        with job.lock:
+            finished = job.status.state in _FINISHED
+            if not finished:
+                job.cancelled = True
+                if job.status.state == JobState.QUEUED:
+                    self._finish(job, JobState.CANCELLED)
+            status = job.status.model_copy()
+        if finished:
+            with self._lock:
+                self._jobs.pop(job_id, None)
+            shutil.rmtree(job.directory, ignore_errors=True)
+        return status
+    
+    def _job(self, job_id: str) -> _Job:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise JobNotFoundError(job_id)
+        return job
+    
+    def _new_directory(self) -> Tuple[str, str]:
+        job_id = uuid.uuid4().hex
+        directory = os.path.join(self.root, job_id)
+        os.makedirs(directory)
+        return job_id, directory
+    
+    def _enqueue(self, job_id: str, directory: str, spec: JobSpec, source: str, total: int) -> JobStatus:
+        job = _Job(
+            status=JobStatus(id=job_id, total=total, created_at=time.time()),
+            spec=spec,
+            directory=directory,
+            source=source
+        )
+        self._save(job)
+        with self._lock:
+            self._jobs[job_id] = job
+        self._queue.put(job_id)
+        return job.status.model_copy()
+    
+    def _load(self, job_id: str) -> _Job:
+        directory = os.path.join(self.root, job_id)
+        with open(os.path.join(directory, _JOB_FILE), encoding="utf-8") as record:
+            data = json.load(record)
+        return _Job(
+            status=JobStatus.model_validate(data["status"]),
+            spec=JobSpec.model_validate(data["spec"]),
+            directory=directory,
+            source=data["source"],
+            results_bytes=data["resultsBytes"]
+        )
+    
+    def _save(self, job: _Job) -> None:
+        record = {
+            "status": job.status.model_dump(mode="json", by_alias=True),
+            "spec": job.spec.model_dump(mode="json", by_alias=True),
+            "source": job.source,
+            "resultsBytes": job.results_bytes
+        }
+        # Written to a temporary file and renamed, so a crash never leaves a torn checkpoint.
+        path = os.path.join(job.directory, _JOB_FILE)
+        with open(path + ".tmp", "w", encoding="utf-8") as target:
+            json.dump(record, target)
+            target.flush()
+            os.fsync(target.fileno())
+        os.replace(path + ".tmp", path)
+    
+    def _finish(self, job: _Job, state: JobState, error: Optional[str] = None) -> None:
+        job.status.state = state
+        job.status.error = error
+        job.status.finished_at = time.time()
+        self._save(job)
+    
+    def _work(self) -> None:
+        while True:
+            job_id = self._queue.get()
+            if job_id is None or self._stopping.is_set():
+                return
+            with self._lock:
+                job = self._jobs.get(job_id)
+            if job is None:
+                continue
+            with job.lock:
+                if job.status.state != JobState.QUEUED:
+                    continue
+                job.status.state = JobState.RUNNING
+                job.status.started_at = job.status.started_at or time.time()
+                self._save(job)
+            try:
+                self._run(job)
+            except Exception as e:
+                logger.exception("Job %s failed", job_id)
+                with job.lock:
+                    self._finish(job, JobState.FAILED, str(e))
+    
+    def _inputs(self, job: _Job, start: int) -> Iterator[Tuple[str, Union[memoryview, bytes, Exception]]]:
+        if job.source == _MANIFEST_FILE:
+            for path in iter_manifest(os.path.join(job.directory, _MANIFEST_FILE), start):
+                # Checked again as it is read, in case a link was changed after submission.
+                if not is_within(path, self.input_dirs):
+                    yield path, ValueError(f"{path} is outside the allowed job input directories")
+                    continue
+                try:
+                    yield path, map_file(path)
+                except OSError as e:
+                    yield path, e
+        else:
+            yield from iter_archive(os.path.join(job.directory, job.source), start, self.max_image_bytes)
+    
+    def _yield_to_interactive(self) -> None:
+        if self.yield_in_flight <= 0:
+            return
+        deadline = time.monotonic() + self.max_yield_seconds
+        while self._interactive_load() >= self.yield_in_flight and time.monotonic() < deadline:
+            if self._stopping.wait(0.01):
+                return
+    
+    def _run(self, job: _Job) -> None:
+        spec = job.spec
+        options = spec.detection_options()
+        inputs = self._inputs(job, job.status.processed)
+        path = os.path.join(job.directory, _RESULTS_FILE)
+        with open(path, "r+b" if os.path.exists(path) else "wb") as results:
+            results.truncate(job.results_bytes)
+            results.seek(job.results_bytes)
+            while True:
+                chunk = list(islice(inputs, self.chunk_size))
+                if not chunk:
+                    break
+                if self._stopping.is_set() or job.cancelled:
+                    # Left running when stopping, so the next start resumes it.
+                    break
+                
+                self._yield_to_interactive()
+                readable = [index for index, (_, data) in enumerate(chunk) if not isinstance(data, Exception)]
+                tasks: List[DetectionTask] = [
+                    (chunk[index][1], spec.device, spec.cpu_threads, spec.model_size, options) for index in readable
+                ]
+                with self._lock:
+                    self._chunks_in_flight += 1
+                try:
+                    outcomes = dict(zip(readable, self._run_chunk(tasks) if tasks else []))
+                finally:
+                    with self._lock:
+                        self._chunks_in_flight -= 1
+                
+                errors = 0
+                for offset, (name, data) in enumerate(chunk):
+                    outcome = outcomes.get(offset, data)
+                    entry = JobResult(index=job.status.processed + offset, path=name)
+                    if isinstance(outcome, Exception):
+                        entry.error = str(outcome)
+                        errors += 1
+                    else:
+                        entry.result = outcome
+                    results.write(entry.model_dump_json(by_alias=True).encode() + b"\n")
+                results.flush()
+                os.fsync(results.fileno())
+                
+                with job.lock:
+                    job.results_bytes = results.tell()
+                    job.status.processed += len(chunk)
+                    job.status.errors += errors
+                    self._save(job)
+        
+        with job.lock:
+            if job.cancelled:
+                self._finish(job, JobState.CANCELLED)
+            elif not self._stopping.is_set():
+                self._finish(job, JobState.COMPLETED)
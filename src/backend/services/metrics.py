@@ -0,0 +1,137 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, REGISTRY
+
+
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0
+)
+
+REQUEST_DURATION = Histogram(
+    "human_detector_request_duration_seconds",
+    "End-to-end request latency",
+    ["endpoint", "device", "model_size"],
+    buckets=LATENCY_BUCKETS
+)
+STAGE_DURATION = Histogram(
+    "human_detector_stage_duration_seconds",
+    "Time spent in each request stage",
+    ["stage", "device", "model_size"],
+    buckets=LATENCY_BUCKETS
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "human_detector_requests_in_flight",
+    "Requests currently being handled",
+    ["endpoint"]
+)
+REQUEST_ERRORS = Counter(
+    "human_detector_request_errors_total",
+    "Requests that finished with an error status",
+    ["endpoint", "status_code"]
+)
+BATCH_SIZE = Histogram(
+    "human_detector_batch_size",
+    "Images per model call",
+    ["device"],
+    buckets=(1, 2, 4, 8, 16, 32, 64)
+)
+
+
+class StageTimer:
+    """
+    Accumulates per-stage wall time for one request. Safe to share between the
+    request handler and the worker threads doing its decode and inference.
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self.labels: Dict[str, str] = {"device": "", "model_size": ""}
+        self.started_at = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        return {"stages": self.stages, "labels": self.labels, "started_at": self.started_at}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def merge(self, stages: Dict[str, float]) -> None:
+        for name, seconds in stages.items():
+            self.add(name, seconds)
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    def server_timing(self) -> str:
+        with self._lock:
+            entries = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.stages.items()]
+        entries.append(f"total;dur={self.elapsed() * 1000:.2f}")
+        return ", ".join(entries)
+
+    def observe(self, endpoint: str) -> None:
+        device = self.labels["device"]
+        model_size = self.labels["model_size"]
+        with self._lock:
+            stages = dict(self.stages)
+        for name, seconds in stages.items():
+            STAGE_DURATION.labels(name, device, model_size).observe(seconds)
+        REQUEST_DURATION.labels(endpoint, device, model_size).observe(self.elapsed())
+
+
+@contextmanager
+def optional_stage(timer: Optional[StageTimer], name: str) -> Iterator[None]:
+    if timer is None:
+        yield
+    else:
+        with timer.stage(name):
+            yield
+
+
+class CallbackCollector:
+    """Exports values read from live objects (queues, caches) at scrape time."""
+
+    def __init__(self, collect: Callable[[], Iterator]):
+        self._collect = collect
+
+    def collect(self):
+        return self._collect()
+
+
+def register_collector(collect: Callable[[], Iterator]) -> CallbackCollector:
+    collector = CallbackCollector(collect)
+    REGISTRY.register(collector)
+    return collector
+
+
+def gauge_family(name: str, documentation: str, values: Dict[str, float], label: str) -> GaugeMetricFamily:
+    family = GaugeMetricFamily(name, documentation, labels=[label])
+    for key, value in values.items():
+        family.add_metric([key], value)
+    return family
+
+
+def counter_family(name: str, documentation: str, value: float) -> CounterMetricFamily:
+    return CounterMetricFamily(name, documentation, value=value)
+
+
+def labeled_counter_family(name: str, documentation: str, values: Dict[str, float], label: str) -> CounterMetricFamily:
+    family = CounterMetricFamily(name, documentation, labels=[label])
+    for key, value in values.items():
+        family.add_metric([key], value)
+    return family
@@ -0,0 +1,68 @@
+from pathlib import Path
+from typing import Optional
+from src.backend.models.inference_backend import InferenceBackend
+from src.backend.models.yolo_model_size import YoloModelSize
+
+
+class ModelExporter:
+    """
+    Resolves the weights to load for a backend, exporting and caching converted
+    models next to the PyTorch weights on first use.
+
+    ONNX models are exported with dynamic shapes so micro-batches can be run;
+    INT8 ONNX models are produced with ONNX Runtime dynamic quantization and
+    INT8 OpenVINO models with Ultralytics' NNCF calibration on ``int8_data``.
+    """
+
+    def __init__(
+        self,
+        backend: InferenceBackend = InferenceBackend.PYTORCH,
+        model_dir: Optional[str] = None,
+        int8: bool = False,
+        int8_data: str = "coco8.yaml"
+    ):
+        self.backend = backend
+        self.model_dir = Path(model_dir) if model_dir else None
+        self.int8 = int8
+        self.int8_data = int8_data
+
+    def weights_path(self, model_size: YoloModelSize) -> Path:
+        if self.model_dir is None:
+            return Path(model_size.value)
+        self.model_dir.mkdir(parents=True, exist_ok=True)
+        return self.model_dir / model_size.value
+
+    def resolve(self, model_size: YoloModelSize) -> str:
+        weights = self.weights_path(model_size)
+        if self.backend == InferenceBackend.ONNX:
+            return str(self._export_onnx(weights))
+        if self.backend == InferenceBackend.OPENVINO:
+            return str(self._export_openvino(weights))
+        return str(weights)
+
+    def _export_onnx(self, weights: Path) -> Path:
+        onnx_path = weights.with_suffix(".onnx")
+        if not onnx_path.exists():
+            from ultralytics import YOLO
+            exported = YOLO(str(weights)).export(format="onnx", dynamic=True, verbose=False)
+            onnx_path = Path(exported)
+        if not self.int8:
+            return onnx_path
+        
+        int8_path = onnx_path.with_name(f"{onnx_path.stem}_int8.onnx")
+        if not int8_path.exists():
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+            quantize_dynamic(str(onnx_path), str(int8_path), weight_type=QuantType.QUInt8)
+        return int8_path
+
+    def _export_openvino(self, weights: Path) -> Path:
+        suffix = "_int8_openvino_model" if self.int8 else "_openvino_model"
+        model_path = weights.with_name(f"{weights.stem}{suffix}")
+        if model_path.exists():
+            return model_path
+        
+        from ultralytics import YOLO
+        options = {"format": "openvino", "dynamic": True, "verbose": False}
+        if self.int8:
+            options.update(int8=True, data=self.int8_data)
+        return Path(YOLO(str(weights)).export(**options))
@@ -0,0 +1,89 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from src.backend.models.device_type import DeviceType
+from src.backend.models.model_stats import ModelStats
+from src.backend.models.yolo_model_size import YoloModelSize
+
+
+ModelKey = Tuple[YoloModelSize, DeviceType]
+
+
+class LoadedModel:
+    def __init__(self, model: Any):
+        self.model = model
+        # Guards the model's predictor, which Ultralytics does not make thread-safe.
+        self.lock = threading.Lock()
+
+
+class ModelRegistry:
+    """
+    Loads models on first use and keeps at most ``max_loaded`` of them in memory,
+    evicting the least recently used one when another has to be loaded.
+
+    Models are keyed by size and device. An evicted model stays alive until the
+    calls already running on it finish, since they hold their own reference.
+    """
+
+    def __init__(self, loader: Callable[[YoloModelSize, DeviceType], Any], max_loaded: int = 2):
+        if max_loaded < 1:
+            raise ValueError(f"max_loaded must be at least 1, got {max_loaded}")
+        self.max_loaded = max_loaded
+        self._loader = loader
+        self._models: "OrderedDict[ModelKey, LoadedModel]" = OrderedDict()
+        self._loading: Dict[ModelKey, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._loads = 0
+        self._evictions = 0
+
+    def get(self, model_size: YoloModelSize, device: DeviceType) -> LoadedModel:
+        key = (model_size, device)
+        with self._lock:
+            entry = self._touch(key)
+            if entry is not None:
+                return entry
+            loading = self._loading.setdefault(key, threading.Lock())
+
+        # Load outside the registry lock so other sizes stay usable meanwhile;
+        # concurrent first requests for the same key wait for a single load.
+        with loading:
+            with self._lock:
+                entry = self._touch(key)
+                if entry is not None:
+                    return entry
+            entry = LoadedModel(self._loader(model_size, device))
+            with self._lock:
+                self._models[key] = entry
+                self._loads += 1
+                while len(self._models) > self.max_loaded:
+                    self._models.popitem(last=False)
+                    self._evictions += 1
+            return entry
+
+    def peek(self, model_size: YoloModelSize, device: DeviceType) -> Optional[Any]:
+        with self._lock:
+            entry = self._models.get((model_size, device))
+        return entry.model if entry is not None else None
+
+    def is_loaded(self, model_size: YoloModelSize, device: DeviceType) -> bool:
+        return self.peek(model_size, device) is not None
+
+    def loaded(self) -> List[ModelKey]:
+        with self._lock:
+            return list(self._models)
+
+    def get_stats(self) -> ModelStats:
+        with self._lock:
+            loaded = [f"{model_size.value}@{device.value}" for model_size, device in self._models]
+            return ModelStats(
+                loaded=loaded,
+                max_loaded=self.max_loaded,
+                loads=self._loads,
+                evictions=self._evictions
+            )
+
+    def _touch(self, key: ModelKey) -> Optional[LoadedModel]:
+        entry = self._models.get(key)
+        if entry is not None:
+            self._models.move_to_end(key)
+        return entry
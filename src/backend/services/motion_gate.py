@@ -0,0 +1,149 @@
+import threading
+import time
+import cv2
+import numpy as np
+from typing import Callable, Hashable, Optional
+from src.backend.models.detection_response import DetectionResponse
+from src.backend.models.device_type import DeviceType
+from src.backend.models.motion_stats import MotionStats
+from src.backend.services.image_decoding import REDUCED_MODES, jpeg_size
+from src.backend.services.stream_registry import StreamRegistry
+
+
+THUMBNAIL_WIDTH = 160
+_REDUCED_GRAYSCALE_MODES = {
+    2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    8: cv2.IMREAD_REDUCED_GRAYSCALE_8
+}
+
+
+def _shrink(gray: np.ndarray) -> np.ndarray:
+    height, width = gray.shape[:2]
+    size = (THUMBNAIL_WIDTH, max(1, round(height * THUMBNAIL_WIDTH / width)))
+    # Blurring drops sensor noise and JPEG artefacts that would otherwise read as motion.
+    return cv2.GaussianBlur(cv2.resize(gray, size, interpolation=cv2.INTER_AREA), (5, 5), 0)
+
+
+def encoded_thumbnail(buffer: np.ndarray) -> np.ndarray:
+    """
+    A small blurred grayscale copy of an encoded image for motion checks. JPEGs
+    are decoded at reduced size, which costs a fraction of a full decode.
+    """
+    size = jpeg_size(buffer)
+    factor = 1
+    if size is not None:
+        for candidate in sorted(REDUCED_MODES):
+            if size[0] / candidate >= THUMBNAIL_WIDTH:
+                factor = candidate
+    gray = cv2.imdecode(buffer, _REDUCED_GRAYSCALE_MODES.get(factor, cv2.IMREAD_GRAYSCALE))
+    if gray is None:
+        raise ValueError("Failed to decode image")
+    return _shrink(gray)
+
+
+def frame_thumbnail(frame: np.ndarray) -> np.ndarray:
+    """A small blurred grayscale copy of a decoded BGR frame for motion checks."""
+    return _shrink(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame)
+
+
+def changed_fraction(reference: np.ndarray, thumbnail: np.ndarray, pixel_threshold: int) -> float:
+    return float(np.count_nonzero(cv2.absdiff(reference, thumbnail) > pixel_threshold)) / thumbnail.size
+
+
+class MotionGate:
+    """
+    Frame-difference state for one stream. A frame is compared with the one the
+    last inference ran on; while less than ``min_changed_fraction`` of its pixels
+    changed by more than ``pixel_threshold``, the last result is reused.
+    
+    Inference is forced after ``refresh_frames`` reused frames or ``refresh_seconds``,
+    and whenever the detection settings differ from those of the stored result.
+    """
+    
+    def __init__(
+        self,
+        pixel_threshold: int = 25,
+        min_changed_fraction: float = 0.005,
+        refresh_frames: int = 30,
+        refresh_seconds: float = 10.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.pixel_threshold = pixel_threshold
+        self.min_changed_fraction = min_changed_fraction
+        self.refresh_frames = refresh_frames
+        self.refresh_seconds = refresh_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._reference: Optional[np.ndarray] = None
+        self._response: Optional[DetectionResponse] = None
+        self._key: Hashable = None
+        self._device: Optional[DeviceType] = None
+        self._reused = 0
+        self._inferred_at = 0.0
+    
+    def reuse(self, thumbnail: np.ndarray, key: Hashable = None) -> Optional[DetectionResponse]:
+        """The stored result if this frame can skip inference, otherwise None."""
+        with self._lock:
+            now = self._clock()
+            if self._response is None or key != self._key or thumbnail.shape != self._reference.shape:
+                return None
+            if self._reused >= self.refresh_frames or now - self._inferred_at >= self.refresh_seconds:
+                return None
+            if changed_fraction(self._reference, thumbnail, self.pixel_threshold) > self.min_changed_fraction:
+                return None
+            self._reused += 1
+            return self._response
+    
+    @property
+    def device(self) -> Optional[DeviceType]:
+        """The device the stored result was inferred on, if it was recorded."""
+        with self._lock:
+            return self._device
+    
+    def record(
+        self,
+        thumbnail: np.ndarray,
+        response: DetectionResponse,
+        key: Hashable = None,
+        device: Optional[DeviceType] = None
+    ) -> None:
+        with self._lock:
+            self._reference = thumbnail
+            self._response = response
+            self._key = key
+            self._device = device
+            self._reused = 0
+            self._inferred_at = self._clock()
+
+
+class MotionGateRegistry(StreamRegistry[MotionGate]):
+    """Motion gates keyed by stream id, with counts of inferred and reused frames."""
+    
+    def __init__(
+        self,
+        gate_factory: Callable[[], MotionGate],
+        max_streams: int = 1024,
+        ttl_seconds: float = 300.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        super().__init__(gate_factory, max_streams, ttl_seconds, clock)
+        self._counts_lock = threading.Lock()
+        self._inferred = 0
+        self._reused = 0
+    
+    def count(self, reused: bool) -> None:
+        with self._counts_lock:
+            if reused:
+                self._reused += 1
+            else:
+                self._inferred += 1
+    
+    def get_stats(self) -> MotionStats:
+        with self._counts_lock:
+            return MotionStats(
+                streams=len(self),
+                max_streams=self.max_streams,
+                frames_inferred=self._inferred,
+                frames_reused=self._reused
+            )
@@ -0,0 +1,123 @@
+"""
+Numeric precision, memory layout and compilation options for PyTorch models.
+
+The network's forward is wrapped rather than its weights converted: autocast runs
+convolutions in bf16 or fp16 where the hardware supports it and keeps precision-
+sensitive ops in fp32, and outputs are cast back to fp32 so NMS and box decoding
+see the same dtype as before.
+"""
+import logging
+from contextlib import nullcontext
+from dataclasses import dataclass, replace
+from typing import Any, Callable, List
+import torch
+from src.backend.models.device_type import DeviceType
+from src.backend.models.inference_precision import InferencePrecision
+
+
+logger = logging.getLogger(__name__)
+
+# Small enough to be cheap, large enough for every stride of the network.
+PROBE_SHAPE = (1, 3, 64, 64)
+AUTOCAST_DTYPES = {InferencePrecision.BF16: "bfloat16", InferencePrecision.FP16: "float16"}
+MKLDNN_CHECKS = {
+    InferencePrecision.BF16: "_is_mkldnn_bf16_supported",
+    InferencePrecision.FP16: "_is_mkldnn_fp16_supported"
+}
+
+
+@dataclass(frozen=True)
+class ModelTuning:
+    precision: InferencePrecision = InferencePrecision.FP32
+    channels_last: bool = False
+    compile: bool = False
+    
+    def is_default(self) -> bool:
+        return self == ModelTuning()
+    
+    def describe(self) -> str:
+        flags = [self.precision.value]
+        if self.channels_last:
+            flags.append("channels-last")
+        if self.compile:
+            flags.append("compiled")
+        return "+".join(flags)
+
+
+def precision_supported(precision: InferencePrecision, device: DeviceType) -> bool:
+    """Whether the hardware runs ``precision`` natively; emulated bf16/fp16 on CPU is slower than fp32."""
+    if precision == InferencePrecision.FP32:
+        return True
+    try:
+        if device == DeviceType.GPU:
+            return precision == InferencePrecision.FP16 or bool(torch.cuda.is_bf16_supported())
+        return bool(getattr(torch.ops.mkldnn, MKLDNN_CHECKS[precision])())
+    except (AttributeError, RuntimeError):
+        return False
+
+
+def fallbacks(tuning: ModelTuning) -> List[ModelTuning]:
+    """Configurations to try in order, dropping the options most likely to fail first."""
+    candidates = [
+        tuning,
+        replace(tuning, compile=False),
+        ModelTuning(channels_last=tuning.channels_last),
+        ModelTuning()
+    ]
+    return list(dict.fromkeys(candidates))
+
+
+def _to_float(output: Any) -> Any:
+    if isinstance(output, torch.Tensor):
+        return output.float() if output.is_floating_point() else output
+    if isinstance(output, (list, tuple)):
+        return type(output)(_to_float(item) for item in output)
+    return output
+
+
+def _tuned_forward(forward: Callable, device: DeviceType, tuning: ModelTuning) -> Callable:
+    dtype = getattr(torch, AUTOCAST_DTYPES[tuning.precision]) if tuning.precision in AUTOCAST_DTYPES else None
+    
+    def tuned(x, *args, **kwargs):
+        if tuning.channels_last and x.dim() == 4:
+            x = x.contiguous(memory_format=torch.channels_last)
+        with torch.autocast(device.value, dtype=dtype) if dtype is not None else nullcontext():
+            output = forward(x, *args, **kwargs)
+        return _to_float(output) if dtype is not None else output
+    
+    # Dynamic shapes, so batch sizes and resolutions other than the first don't each recompile.
+    return torch.compile(tuned, dynamic=True) if tuning.compile else tuned
+
+
+def _apply(network: torch.nn.Module, device: DeviceType, tuning: ModelTuning) -> None:
+    network.__dict__.pop("forward", None)
+    network.to(memory_format=torch.channels_last if tuning.channels_last else torch.contiguous_format)
+    if not tuning.is_default():
+        network.forward = _tuned_forward(network.forward, device, tuning)
+
+
+def tune_model(network: torch.nn.Module, device: DeviceType, tuning: ModelTuning) -> ModelTuning:
+    """
+    Applies ``tuning`` to ``network`` in place and returns the configuration that
+    took effect. A precision the device lacks is replaced by fp32; otherwise each
+    configuration from ``fallbacks`` is tried on a probe image until one runs.
+    """
+    if not precision_supported(tuning.precision, device):
+        logger.warning("%s is not supported on %s, using fp32", tuning.precision.value, device.value)
+        tuning = replace(tuning, precision=InferencePrecision.FP32)
+    if tuning.is_default():
+        return tuning
+    
+    parameter = next(network.parameters())
+    probe = torch.zeros(PROBE_SHAPE, device=parameter.device, dtype=parameter.dtype)
+    for candidate in fallbacks(tuning):
+        _apply(network, device, candidate)
+        if candidate.is_default():
+            return candidate
+        try:
+            with torch.inference_mode():
+                network(probe)
+            return candidate
+        except Exception as e:
+            logger.warning("Could not run %s on %s, falling back: %s", candidate.describe(), device.value, e)
+    return ModelTuning()
@@ -0,0 +1,93 @@
+import json
+from typing import Any, Dict, Optional
+from pydantic import BaseModel
+from src.backend.models.batch_detection_response import BatchDetectionResponse
+from src.backend.models.detection_response import DetectionResponse
+from src.backend.models.response_format import ResponseFormat
+
+
+BOX_FIELDS = ["x1", "y1", "x2", "y2", "confidence"]
+COMPACT_JSON_DECIMALS = 4
+
+_MEDIA_TYPES = {
+    ResponseFormat.JSON.value: ResponseFormat.JSON,
+    ResponseFormat.COMPACT_JSON.value: ResponseFormat.COMPACT_JSON,
+    ResponseFormat.MSGPACK.value: ResponseFormat.MSGPACK,
+    "application/x-msgpack": ResponseFormat.MSGPACK,
+    "application/vnd.msgpack": ResponseFormat.MSGPACK
+}
+
+
+def negotiate_format(accept: Optional[str]) -> ResponseFormat:
+    """
+    Pick the response format from an Accept header, honouring q-values.
+    Anything without a supported media type gets the regular JSON response.
+    """
+    candidates = []
+    for position, entry in enumerate((accept or "").split(",")):
+        media_type, *params = [part.strip() for part in entry.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        response_format = _MEDIA_TYPES.get(media_type.lower())
+        if response_format is not None and quality > 0:
+            candidates.append((-quality, position, response_format))
+    return min(candidates)[2] if candidates else ResponseFormat.JSON
+
+
+def _compact_detection(response: DetectionResponse, binary: bool) -> Dict[str, Any]:
+    boxes = response.box_array()
+    document = {
+        "humanDetected": response.human_detected,
+        "maxConfidence": response.max_confidence,
+        "boxes": (
+            boxes.astype("<f4").tobytes() if binary
+            else boxes.astype(float).round(COMPACT_JSON_DECIMALS).ravel().tolist()
+        )
+    }
+    track_ids = response.track_ids()
+    if track_ids is not None:
+        document["trackIds"] = track_ids
+    return document
+
+
+def _compact(model: BaseModel, binary: bool) -> Dict[str, Any]:
+    if isinstance(model, DetectionResponse):
+        document = _compact_detection(model, binary)
+    elif isinstance(model, BatchDetectionResponse):
+        document = {
+            "results": [
+                {
+                    "result": _compact_detection(item.result, binary) if item.result is not None else None,
+                    "error": item.error
+                }
+                for item in model.results
+            ]
+        }
+    else:
+        raise TypeError(f"No compact encoding for {type(model).__name__}")
+    document["boxFields"] = BOX_FIELDS
+    return document
+
+
+def encode_response(model: BaseModel, response_format: ResponseFormat) -> bytes:
+    """
+    Serialize a detection or batch response.
+
+    The compact formats carry boxes as one flat array per image instead of an
+    object per box: a list of floats in compact JSON (rounded to
+    ``COMPACT_JSON_DECIMALS`` places), and little-endian float32 bytes in
+    msgpack, readable with ``np.frombuffer(boxes, "<f4").reshape(-1, 5)``.
+    """
+    if response_format == ResponseFormat.JSON:
+        return model.model_dump_json(by_alias=True).encode()
+    if response_format == ResponseFormat.COMPACT_JSON:
+        return json.dumps(_compact(model, binary=False), separators=(",", ":")).encode()
+    
+    import msgpack
+    return msgpack.packb(_compact(model, binary=True), use_bin_type=True)
@@ -0,0 +1,135 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+from src.backend.models.cache_stats import CacheStats
+from src.backend.models.detection_response import DetectionResponse
+from src.backend.config import Settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class InMemoryCacheStore:
+    name = "memory"
+
+    def __init__(self, max_bytes: int, ttl_seconds: float):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.size_bytes = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes) -> None:
+        entry_size = len(key) + len(value)
+        if entry_size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self.size_bytes += entry_size
+            while self.size_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        _, value = self._entries.pop(key)
+        self.size_bytes -= len(key) + len(value)
+
+
+class RedisCacheStore:
+    name = "redis"
+
+    def __init__(self, url: str, ttl_seconds: float, prefix: str = "human-detector:"):
+        import redis
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+        self.evictions = 0
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes) -> None:
+        self._client.set(self.prefix + key, value, px=max(int(self.ttl_seconds * 1000), 1))
+
+
+class ResultCache:
+    """
+    Detection results keyed by a hash of the encoded image bytes plus every
+    parameter that changes the result. Store failures are logged and treated
+    as misses so the cache can never fail a request.
+    """
+
+    def __init__(self, store: Any):
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(image_bytes: Any, *params: Any) -> str:
+        digest = hashlib.blake2b(image_bytes, digest_size=16).hexdigest()
+        return ":".join([digest, *(str(getattr(p, "value", p)) for p in params)])
+
+    def get(self, key: str) -> Optional[DetectionResponse]:
+        try:
+            value = self.store.get(key)
+        except Exception as e:
+            logger.warning("Result cache lookup failed: %s", e)
+            value = None
+        
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return DetectionResponse.model_validate_json(value) if value is not None else None
+
+    def put(self, key: str, response: DetectionResponse) -> None:
+        try:
+            self.store.set(key, response.model_dump_json().encode("utf-8"))
+        except Exception as e:
+            logger.warning("Result cache store failed: %s", e)
+
+    def get_stats(self) -> CacheStats:
+        with self._lock:
+            stats = CacheStats(
+                backend=self.store.name,
+                hits=self.hits,
+                misses=self.misses,
+                evictions=self.store.evictions
+            )
+        if isinstance(self.store, InMemoryCacheStore):
+            stats.entries = len(self.store)
+            stats.size_bytes = self.store.size_bytes
+            stats.max_bytes = self.store.max_bytes
+        return stats
+
+
+def create_result_cache(settings: Settings) -> Optional[ResultCache]:
+    if not settings.cache_enabled:
+        return None
+    if settings.cache_redis_url:
+        return ResultCache(RedisCacheStore(settings.cache_redis_url, settings.cache_ttl_seconds))
+    return ResultCache(InMemoryCacheStore(settings.cache_max_bytes, settings.cache_ttl_seconds))
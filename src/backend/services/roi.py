@@ -0,0 +1,133 @@
+import math
+import numpy as np
+from typing import List, NamedTuple, Optional, Tuple
+from src.backend.models.detection_options import DetectionOptions
+from src.backend.models.detection_response import DetectionResponse
+
+
+DEFAULT_IMGSZ = 640
+TILE_OVERLAP = 0.2
+# Boxes from different windows overlapping by more than this (intersection over the
+# smaller box) are the same person seen twice, e.g. cut in half at a tile edge.
+DUPLICATE_OVERLAP = 0.6
+
+
+class Window(NamedTuple):
+    x1: int
+    y1: int
+    x2: int
+    y2: int
+    polygon: Optional[np.ndarray] = None
+
+
+def _tile_starts(length: int, tile: int) -> List[int]:
+    if length <= tile:
+        return [0]
+    stride = tile * (1 - TILE_OVERLAP)
+    count = math.ceil((length - tile) / stride) + 1
+    return [int(round(start)) for start in np.linspace(0, length - tile, count)]
+
+
+def plan_windows(
+    height: int,
+    width: int,
+    options: Optional[DetectionOptions],
+    scale: Tuple[float, float] = (1.0, 1.0)
+) -> Optional[List[Window]]:
+    """
+    Split an image into the crops to run through the model, or None to run it whole.
+    
+    Regions are given in original-image pixels; ``scale`` is the original size over
+    the size the image was decoded at, and windows are in decoded pixels.
+
+    Each region becomes a crop of its bounding rectangle. With ``tile``, crops
+    larger than imgsz are further split into overlapping imgsz tiles so small
+    people keep their full resolution instead of being downscaled.
+    """
+    if options is None or (not options.regions and not options.tile):
+        return None
+    
+    windows: List[Window] = []
+    if options.regions:
+        for region in options.regions:
+            x1, y1, x2, y2 = region.bounds()
+            x1, y1, x2, y2 = x1 / scale[0], y1 / scale[1], x2 / scale[0], y2 / scale[1]
+            x1, y1 = max(0, math.floor(x1)), max(0, math.floor(y1))
+            x2, y2 = min(width, math.ceil(x2)), min(height, math.ceil(y2))
+            if x2 > x1 and y2 > y1:
+                polygon = None
+                if region.polygon:
+                    polygon = np.array(region.polygon, dtype=np.float32) / np.array(scale, dtype=np.float32)
+                windows.append(Window(x1, y1, x2, y2, polygon))
+    else:
+        windows.append(Window(0, 0, width, height))
+    
+    if not options.tile:
+        return windows
+    
+    tile = options.imgsz or DEFAULT_IMGSZ
+    tiles: List[Window] = []
+    for window in windows:
+        for y in _tile_starts(window.y2 - window.y1, tile):
+            for x in _tile_starts(window.x2 - window.x1, tile):
+                tiles.append(Window(
+                    window.x1 + x,
+                    window.y1 + y,
+                    min(window.x2, window.x1 + x + tile),
+                    min(window.y2, window.y1 + y + tile),
+                    window.polygon
+                ))
+    return tiles
+
+
+def crop(image: np.ndarray, window: Window) -> np.ndarray:
+    # A view into the decoded image; nothing is copied.
+    return image[window.y1:window.y2, window.x1:window.x2]
+
+
+def points_in_polygon(points: np.ndarray, polygon: np.ndarray) -> np.ndarray:
+    """Even-odd test of (N, 2) points against an (M, 2) polygon."""
+    x, y = points[:, 0:1], points[:, 1:2]
+    x1, y1 = polygon[:, 0], polygon[:, 1]
+    x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+    spans = (y1 > y) != (y2 > y)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        crossing_x = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+    return (np.count_nonzero(spans & (x < crossing_x), axis=1) % 2) == 1
+
+
+def _suppress_duplicates(boxes: np.ndarray, sources: np.ndarray) -> np.ndarray:
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    order = np.argsort(-boxes[:, 4], kind="stable")
+    keep: List[int] = []
+    while order.size:
+        best, rest = order[0], order[1:]
+        keep.append(best)
+        width = np.clip(np.minimum(boxes[best, 2], boxes[rest, 2]) - np.maximum(boxes[best, 0], boxes[rest, 0]), 0, None)
+        height = np.clip(np.minimum(boxes[best, 3], boxes[rest, 3]) - np.maximum(boxes[best, 1], boxes[rest, 1]), 0, None)
+        smaller = np.maximum(np.minimum(areas[best], areas[rest]), 1e-6)
+        duplicate = (width * height / smaller > DUPLICATE_OVERLAP) & (sources[rest] != sources[best])
+        order = rest[~duplicate]
+    return np.sort(np.array(keep, dtype=np.intp))
+
+
+def merge_windows(windows: List[Window], responses: List[DetectionResponse]) -> DetectionResponse:
+    """
+    Map per-crop boxes back to decoded-image coordinates, drop boxes whose centre
+    is outside their polygon region, and remove duplicates from overlapping crops.
+    The caller rescales the result to original-image coordinates.
+    """
+    merged: List[np.ndarray] = []
+    sources: List[np.ndarray] = []
+    for index, (window, response) in enumerate(zip(windows, responses)):
+        boxes = response.box_array() + np.array([window.x1, window.y1, window.x1, window.y1, 0], dtype=np.float32)
+        if window.polygon is not None and len(boxes):
+            centres = (boxes[:, 0:2] + boxes[:, 2:4]) / 2
+            boxes = boxes[points_in_polygon(centres, window.polygon)]
+        merged.append(boxes)
+        sources.append(np.full(len(boxes), index))
+    
+    boxes = np.concatenate(merged) if merged else np.zeros((0, 5), dtype=np.float32)
+    if len(windows) > 1 and len(boxes) > 1:
+        boxes = boxes[_suppress_duplicates(boxes, np.concatenate(sources))]
+    return DetectionResponse.from_boxes(boxes.astype(np.float32, copy=False))
@@ -0,0 +1,354 @@
+"""
+One inference process per host (or per NUMA node), shared by every HTTP worker.
+
+HTTP workers decode images and plan regions and tiles themselves, then hand the
+decoded frames to the inference server through a ring of fixed-size slots in a
+shared memory segment each worker creates. Only slot numbers, shapes and request
+settings cross the Unix socket; the server maps each worker's ring once and runs
+the frames straight from it through its batch scheduler, so requests from all
+workers are batched together against a single copy of the weights.
+"""
+import itertools
+import logging
+import os
+import socket
+import threading
+import time
+import numpy as np
+from concurrent.futures import Future, ThreadPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
+from src.backend.models.detection_response import DetectionResponse
+from src.backend.models.device_type import DeviceType
+from src.backend.models.yolo_model_size import YoloModelSize
+from src.backend.services.human_detection_service import BatchRunner
+from src.backend.services.metrics import StageTimer
+
+
+logger = logging.getLogger(__name__)
+
+# A frame in a ring slot as (slot, shape, dtype), or one too large for a slot sent inline.
+Frame = Union[Tuple[int, Tuple[int, ...], str], np.ndarray]
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before Python 3.13 attaching registers the segment, and this process would unlink it on exit.
+        memory = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(memory._name, "shared_memory")
+        return memory
+
+
+class FrameRing:
+    """Fixed-size frame slots in a shared memory segment, written by one process and read by another."""
+    
+    def __init__(self, memory: shared_memory.SharedMemory, slots: int, slot_bytes: int, owner: bool):
+        self.memory = memory
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.owner = owner
+        self._free = list(range(slots))
+        self._available = threading.Condition()
+    
+    @classmethod
+    def create(cls, slots: int, slot_bytes: int) -> "FrameRing":
+        return cls(shared_memory.SharedMemory(create=True, size=slots * slot_bytes), slots, slot_bytes, owner=True)
+    
+    @classmethod
+    def attach(cls, name: str, slots: int, slot_bytes: int) -> "FrameRing":
+        return cls(_attach(name), slots, slot_bytes, owner=False)
+    
+    @property
+    def name(self) -> str:
+        return self.memory.name
+    
+    def acquire(self, count: int) -> List[int]:
+        """
+        Waits until ``count`` slots (at most all of them) are free and takes them
+        together, so no caller ever holds some slots while waiting for more.
+        """
+        count = min(count, self.slots)
+        with self._available:
+            self._available.wait_for(lambda: len(self._free) >= count)
+            taken, self._free = self._free[:count], self._free[count:]
+        return taken
+    
+    def release(self, slots: List[int]) -> None:
+        if not slots:
+            return
+        with self._available:
+            self._free.extend(slots)
+            self._available.notify_all()
+    
+    def view(self, slot: int, shape: Tuple[int, ...], dtype: str) -> np.ndarray:
+        return np.ndarray(shape, dtype=np.dtype(dtype), buffer=self.memory.buf, offset=slot * self.slot_bytes)
+    
+    def write(self, slot: int, image: np.ndarray) -> Frame:
+        # Crops are strided views of their image; copyto gathers them in one pass.
+        np.copyto(self.view(slot, image.shape, image.dtype.str), image)
+        return slot, image.shape, image.dtype.str
+    
+    def close(self) -> None:
+        try:
+            self.memory.close()
+        except BufferError:
+            # Views still held elsewhere keep the mapping alive; it goes with the process.
+            logger.warning("Frame ring %s still in use at close", self.name)
+        if self.owner:
+            self.memory.unlink()
+
+
+def _portable_error(error: Exception) -> Exception:
+    # Exceptions with extra constructor arguments do not survive pickling, so only the message crosses.
+    return ValueError(str(error)) if isinstance(error, ValueError) else RuntimeError(str(error))
+
+
+class InferenceServer:
+    """
+    Serves ``run_batch`` to SharedInferenceClients over a Unix socket. Each
+    connection gets a reader thread; its requests run on a shared pool, so one
+    worker's slow batch never holds up another's.
+    """
+    
+    def __init__(
+        self,
+        address: str,
+        run_batch: BatchRunner,
+        status: Callable[[], Any],
+        max_workers: int = 64,
+        stats: Optional[Callable[[], Any]] = None
+    ):
+        self.address = address
+        self._run_batch = run_batch
+        self._status = status
+        self._stats = stats
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inference-server")
+        self._listener: Optional[Listener] = None
+        self._connections: Set[Connection] = set()
+        self._closed = threading.Event()
+    
+    def start(self) -> None:
+        if os.path.exists(self.address):
+            os.unlink(self.address)
+        # Frames and results are pickled, so only this user's processes may connect.
+        # The socket is created under a private umask, so it is never open to others,
+        # not even between binding and the chmod.
+        umask = os.umask(0o077)
+        try:
+            self._listener = Listener(self.address, family="AF_UNIX")
+        finally:
+            os.umask(umask)
+        os.chmod(self.address, 0o600)
+        threading.Thread(target=self._accept, name="inference-server-accept", daemon=True).start()
+        logger.info("Inference server listening on %s", self.address)
+    
+    def serve_forever(self) -> None:
+        if self._listener is None:
+            self.start()
+        self._closed.wait()
+    
+    def close(self) -> None:
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        if self._listener is not None:
+            self._listener.close()
+        for connection in list(self._connections):
+            # Wakes the connection's reader so its client sees the server go away.
+            try:
+                with socket.socket(fileno=os.dup(connection.fileno())) as sock:
+                    sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self._executor.shutdown(wait=True)
+    
+    def _accept(self) -> None:
+        while not self._closed.is_set():
+            try:
+                connection = self._listener.accept()
+            except OSError:
+                break
+            threading.Thread(target=self._serve, args=(connection,), name="inference-server-client", daemon=True).start()
+    
+    def _serve(self, connection: Connection) -> None:
+        send_lock = threading.Lock()
+        ring: Optional[FrameRing] = None
+        in_flight: List[Future] = []
+        self._connections.add(connection)
+        
+        def reply(request_id: int, ok: bool, payload: Any) -> None:
+            with send_lock:
+                try:
+                    connection.send((request_id, ok, payload))
+                except OSError:
+                    pass
+        
+        try:
+            while True:
+                kind, request_id, *args = connection.recv()
+                if kind == "hello":
+                    ring = FrameRing.attach(*args)
+                elif kind == "status":
+                    reply(request_id, True, self._status())
+                elif kind == "stats":
+                    reply(request_id, True, self._stats() if self._stats is not None else None)
+                elif kind == "detect":
+                    in_flight = [future for future in in_flight if not future.done()]
+                    try:
+                        in_flight.append(self._executor.submit(self._detect, reply, ring, request_id, *args))
+                    except RuntimeError:
+                        reply(request_id, False, RuntimeError("Inference server is shutting down"))
+                else:
+                    reply(request_id, False, ValueError(f"Unknown request {kind!r}"))
+        except (EOFError, OSError):
+            pass
+        finally:
+            for future in in_flight:
+                future.exception()
+            if ring is not None:
+                ring.close()
+            self._connections.discard(connection)
+            connection.close()
+    
+    def _detect(
+        self,
+        reply: Callable[[int, bool, Any], None],
+        ring: Optional[FrameRing],
+        request_id: int,
+        frames: List[Frame],
+        device: DeviceType,
+        cpu_threads: Optional[int],
+        model_size: Optional[YoloModelSize],
+        imgsz: Optional[int],
+        confidence: Optional[float]
+    ) -> None:
+        try:
+            images = [frame if isinstance(frame, np.ndarray) else ring.view(*frame) for frame in frames]
+            timer = StageTimer()
+            responses = self._run_batch(images, device, cpu_threads, [timer] * len(images), model_size, imgsz, confidence)
+            reply(request_id, True, (responses, timer.stages))
+        except Exception as e:
+            reply(request_id, False, _portable_error(e))
+
+
+class SharedInferenceClient:
+    """
+    Connection from an HTTP worker to the inference server. ``detect_batch`` is a
+    BatchRunner, so the detection service decodes, caches and plans tiles in the
+    worker and only the model call happens in the server. Calls from any number of
+    threads are pipelined over the one connection, which is reopened after the
+    server restarts.
+    """
+    
+    def __init__(self, address: str, slots: int = 8, slot_bytes: int = 8 * 1024 * 1024, connect_timeout: float = 5.0):
+        self.address = address
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.connect_timeout = connect_timeout
+        self._ring: Optional[FrameRing] = None
+        self._connection: Optional[Connection] = None
+        self._pending: Dict[int, Future] = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+    
+    def connect(self, timeout: Optional[float] = None) -> None:
+        with self._lock:
+            self._connect(self.connect_timeout if timeout is None else timeout)
+    
+    def _connect(self, timeout: float) -> None:
+        if self._connection is not None:
+            return
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                connection = Client(self.address, family="AF_UNIX")
+                break
+            except (FileNotFoundError, ConnectionRefusedError):
+                if time.monotonic() >= deadline:
+                    raise ConnectionError(f"Inference server at {self.address} is not running")
+                time.sleep(0.2)
+        if self._ring is None:
+            self._ring = FrameRing.create(self.slots, self.slot_bytes)
+        connection.send(("hello", None, self._ring.name, self.slots, self.slot_bytes))
+        self._connection = connection
+        threading.Thread(target=self._read, args=(connection,), name="inference-client", daemon=True).start()
+    
+    def _read(self, connection: Connection) -> None:
+        try:
+            while True:
+                request_id, ok, payload = connection.recv()
+                future = self._pending.pop(request_id, None)
+                if future is None:
+                    continue
+                if ok:
+                    future.set_result(payload)
+                else:
+                    future.set_exception(payload)
+        except (EOFError, OSError):
+            pass
+        with self._lock:
+            if self._connection is connection:
+                self._connection = None
+            pending, self._pending = self._pending, {}
+        connection.close()
+        for future in pending.values():
+            future.set_exception(ConnectionError("Lost the connection to the inference server"))
+    
+    def _call(self, kind: str, *args: Any) -> Any:
+        future: Future = Future()
+        with self._lock:
+            self._connect(self.connect_timeout)
+            request_id = next(self._ids)
+            self._pending[request_id] = future
+            try:
+                self._connection.send((kind, request_id, *args))
+            except OSError as e:
+                self._pending.pop(request_id, None)
+                raise ConnectionError(f"Could not reach the inference server: {e}")
+        return future.result()
+    
+    def status(self) -> Any:
+        """The server's startup status."""
+        return self._call("status")
+    
+    def stats(self) -> Any:
+        """The server's batching statistics, or None if it does not report any."""
+        return self._call("stats")
+    
+    def detect_batch(
+        self,
+        images: List[np.ndarray],
+        device: DeviceType = DeviceType.GPU,
+        cpu_threads: Optional[int] = None,
+        timers: Optional[List[Optional[StageTimer]]] = None,
+        model_size: Optional[YoloModelSize] = None,
+        imgsz: Optional[int] = None,
+        confidence: Optional[float] = None
+    ) -> List[DetectionResponse]:
+        if self._ring is None:
+            self.connect()
+        fitting = [index for index, image in enumerate(images) if image.nbytes <= self.slot_bytes]
+        slots = self._ring.acquire(len(fitting)) if fitting else []
+        try:
+            # Frames beyond the ring's capacity or a slot's size are pickled with the request instead.
+            frames: List[Frame] = list(images)
+            for index, slot in zip(fitting, slots):
+                frames[index] = self._ring.write(slot, images[index])
+            responses, stages = self._call("detect", frames, device, cpu_threads, model_size, imgsz, confidence)
+        finally:
+            self._ring.release(slots)
+        
+        for timer in {id(timer): timer for timer in timers or [] if timer is not None}.values():
+            timer.merge(stages)
+        return responses
+    
+    def close(self) -> None:
+        with self._lock:
+            connection, self._connection = self._connection, None
+        if connection is not None:
+            connection.close()
+        if self._ring is not None:
+            self._ring.close()
@@ -0,0 +1,149 @@
+import logging
+import os
+import threading
+import time
+import numpy as np
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Dict, Iterator, List, NamedTuple, Optional
+from src.backend.models.device_type import DeviceType
+from src.backend.models.startup_status import StartupStatus
+from src.backend.models.yolo_model_size import YoloModelSize
+from src.backend.services.human_detection_service import BatchRunner, HumanDetectionService
+
+if TYPE_CHECKING:
+    from src.backend.config import Settings
+
+
+logger = logging.getLogger(__name__)
+
+# A gray 4:3 frame; warm-up only has to exercise the shapes real requests will use.
+WARMUP_IMAGE_SHAPE = (480, 640, 3)
+
+
+class WarmupPlan(NamedTuple):
+    model_sizes: List[YoloModelSize]
+    batch_sizes: List[int]
+    cpu_threads: List[Optional[int]]
+
+
+def warmup_plan(settings: "Settings", cpu_threads: Optional[int]) -> WarmupPlan:
+    """
+    What the warm-up runs: the configured model sizes (default: the server's),
+    batch sizes (default: 1 and the largest batch) and CPU workers (default: one
+    with ``cpu_threads``), shared by the HTTP server and the inference server.
+    """
+    # Warming more sizes than fit in memory would only evict the earlier ones.
+    model_sizes = [
+        size for size in settings.warmup_model_sizes or [settings.model_size]
+        if size in settings.allowed_model_sizes
+    ][:settings.max_loaded_models]
+    return WarmupPlan(
+        model_sizes,
+        settings.warmup_batch_sizes or sorted({1, settings.batch_max_size}),
+        settings.cpu_worker_threads or [cpu_threads]
+    )
+
+
+def process_uptime() -> Optional[float]:
+    """Seconds since this process started, from /proc; None where that is unavailable."""
+    try:
+        with open("/proc/self/stat") as stat, open("/proc/uptime") as uptime:
+            # The command name may contain spaces, so fields are counted from its closing parenthesis.
+            started_ticks = int(stat.read().rsplit(")", 1)[1].split()[19])
+            system_uptime = float(uptime.read().split()[0])
+        return max(0.0, system_uptime - started_ticks / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class StartupTracker:
+    """
+    Records how long each startup phase took and whether the service is ready.
+    
+    The time before the tracker was created (interpreter start and imports) is
+    recorded as the ``imports`` phase where the process start time is known.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._phases: Dict[str, float] = {}
+        self._ready = threading.Event()
+        self._seconds_to_ready: Optional[float] = None
+        self._error: Optional[str] = None
+        self._created_at = time.perf_counter()
+        self._uptime_at_creation = process_uptime()
+        if self._uptime_at_creation is not None:
+            self.add("imports", self._uptime_at_creation)
+    
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self._phases[name] = self._phases.get(name, 0.0) + seconds
+    
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+    
+    def mark_ready(self, error: Optional[str] = None) -> None:
+        elapsed = time.perf_counter() - self._created_at
+        with self._lock:
+            self._error = error
+            self._seconds_to_ready = elapsed + (self._uptime_at_creation or 0.0)
+        self._ready.set()
+        logger.info("Ready after %.2fs: %s", self._seconds_to_ready, self.phases())
+    
+    def is_ready(self) -> bool:
+        return self._ready.is_set()
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._ready.wait(timeout)
+    
+    def phases(self) -> Dict[str, float]:
+        with self._lock:
+            return {name: round(seconds, 4) for name, seconds in self._phases.items()}
+    
+    def get_status(self) -> StartupStatus:
+        ready = self.is_ready()
+        with self._lock:
+            seconds_to_ready = round(self._seconds_to_ready, 4) if self._seconds_to_ready is not None else None
+            error = self._error
+        return StartupStatus(ready=ready, phases=self.phases(), seconds_to_ready=seconds_to_ready, error=error)
+
+
+def warm_up(
+    service: HumanDetectionService,
+    tracker: StartupTracker,
+    model_sizes: List[YoloModelSize],
+    batch_sizes: List[int],
+    cpu_threads: List[Optional[int]],
+    run_batch: Optional[BatchRunner] = None
+) -> None:
+    """
+    Load each model on every available device and run dummy batches of each size
+    through it, so the first real requests do not pay for weight loading, predictor
+    setup, thread pool start-up or kernel selection.
+    
+    With a batch scheduler's ``run_batch``, every CPU worker in ``cpu_threads`` is
+    warmed with its own model replica.
+    """
+    run = run_batch or service.detect_humans_batch
+    image = np.full(WARMUP_IMAGE_SHAPE, 114, dtype=np.uint8)
+    for device in list(service.available_devices):
+        with tracker.phase(f"load {service.model_size.value}@{device.value}"):
+            if not service.preload_device(device):
+                continue
+        for model_size in model_sizes:
+            label = f"{model_size.value}@{device.value}"
+            try:
+                with tracker.phase(f"load {label}"):
+                    service.get_model(device, model_size)
+                for threads in cpu_threads if device == DeviceType.CPU else [None]:
+                    for batch_size in batch_sizes:
+                        name = f"warmup {label} batch={batch_size}" + (f" threads={threads}" if threads else "")
+                        with tracker.phase(name):
+                            run([image] * batch_size, device, threads, None, model_size, None, None)
+            except Exception as e:
+                logger.warning("Warm-up of %s failed: %s", label, e)
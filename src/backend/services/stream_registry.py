@@ -0,0 +1,50 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Tuple, TypeVar
+
+
+StreamState = TypeVar("StreamState")
+
+
+class StreamRegistry(Generic[StreamState]):
+    """
+    Per-stream state keyed by client-supplied stream id. At most ``max_streams``
+    are kept; streams idle for ``ttl_seconds`` and then the least recently used
+    ones are dropped first.
+    """
+    
+    def __init__(
+        self,
+        factory: Callable[[], StreamState],
+        max_streams: int = 1024,
+        ttl_seconds: float = 300.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_streams = max_streams
+        self.ttl_seconds = ttl_seconds
+        self._factory = factory
+        self._clock = clock
+        self._streams: "OrderedDict[str, Tuple[StreamState, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, stream_id: str) -> StreamState:
+        with self._lock:
+            now = self._clock()
+            # Entries are kept in access order, so idle ones are always at the front.
+            while self._streams:
+                oldest_id, (_, last_seen) = next(iter(self._streams.items()))
+                if now - last_seen < self.ttl_seconds:
+                    break
+                del self._streams[oldest_id]
+            
+            entry = self._streams.pop(stream_id, None)
+            state = entry[0] if entry is not None else self._factory()
+            self._streams[stream_id] = (state, now)
+            while len(self._streams) > self.max_streams:
+                self._streams.popitem(last=False)
+            return state
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._streams)
@@ -0,0 +1,216 @@
+import threading
+import time
+import numpy as np
+from dataclasses import dataclass
+from typing import Callable, Hashable, List, Optional, Tuple
+from src.backend.models.detection_response import DetectionResponse
+from src.backend.models.tracking_stats import TrackingStats
+from src.backend.services.stream_registry import StreamRegistry
+
+
+def iou_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU of two (N, 4+) and (M, 4+) arrays of x1, y1, x2, y2 boxes."""
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - intersection
+    return np.divide(intersection, union, out=np.zeros_like(intersection, dtype=np.float64), where=union > 0)
+
+
+def greedy_match(iou: np.ndarray, min_iou: float) -> List[Tuple[int, int]]:
+    """
+    Pairs rows with columns by descending IoU, each at most once. For the handful
+    of people in a frame this gives the same pairs as an optimal assignment in
+    all but contrived overlaps.
+    """
+    if iou.size == 0:
+        return []
+    rows, cols = np.nonzero(iou >= min_iou)
+    order = np.argsort(-iou[rows, cols], kind="stable")
+    matches: List[Tuple[int, int]] = []
+    used_rows, used_cols = set(), set()
+    for row, col in zip(rows[order].tolist(), cols[order].tolist()):
+        if row not in used_rows and col not in used_cols:
+            used_rows.add(row)
+            used_cols.add(col)
+            matches.append((row, col))
+    return matches
+
+
+@dataclass
+class _Track:
+    track_id: int
+    box: np.ndarray
+    velocity: np.ndarray
+    confidence: float
+    updated_frame: int
+    
+    def predict(self, frame: int) -> np.ndarray:
+        return self.box + self.velocity * (frame - self.updated_frame)
+
+
+class StreamTracker:
+    """
+    ByteTrack-style tracking state for one stream.
+    
+    The detector runs on every ``detect_every``-th frame at a low confidence.
+    Boxes scoring at least the requested confidence are matched to the tracks'
+    predicted positions first; the remaining tracks then get a second chance
+    against the low-scoring boxes, which keeps people through partial occlusion
+    and motion blur. Only confident boxes start new tracks, and tracks unmatched
+    for ``max_lost_frames`` are dropped.
+    
+    Frames in between are answered by moving each track along its velocity,
+    without decoding the frame or running the model. Detection settings that
+    differ from the previous frame's restart tracking.
+    """
+    
+    def __init__(
+        self,
+        detect_every: int = 5,
+        max_lost_frames: int = 30,
+        min_iou: float = 0.3,
+        velocity_smoothing: float = 0.5
+    ):
+        self.detect_every = detect_every
+        self.max_lost_frames = max_lost_frames
+        self.min_iou = min_iou
+        self.velocity_smoothing = velocity_smoothing
+        self._lock = threading.Lock()
+        self._tracks: List[_Track] = []
+        self._next_id = 1
+        self._frame = -1
+        self._detected_frame: Optional[int] = None
+        self._updated_frame: Optional[int] = None
+        self._key: Hashable = None
+    
+    def next_frame(self, key: Hashable = None, detect_every: Optional[int] = None) -> Tuple[int, bool]:
+        """
+        Advance to the next frame. Returns its index and whether it has to run
+        through the detector; later frames are propagated until that result is
+        passed to ``update``, or ``reschedule`` is called because detection failed.
+        """
+        with self._lock:
+            self._frame += 1
+            if key != self._key:
+                self._key = key
+                self._tracks = []
+                self._detected_frame = self._updated_frame = None
+            interval = detect_every or self.detect_every
+            due = self._detected_frame is None or self._frame - self._detected_frame >= interval
+            if due:
+                self._detected_frame = self._frame
+            return self._frame, due
+    
+    def reschedule(self) -> None:
+        """Run the detector on the next frame, after a detection that was due failed."""
+        with self._lock:
+            self._detected_frame = None
+    
+    def update(self, frame: int, response: DetectionResponse, min_confidence: float) -> DetectionResponse:
+        """Associate a frame's detection result with the tracks and return it with track ids."""
+        boxes = response.box_array()
+        with self._lock:
+            self._updated_frame = frame
+            predicted = np.array([track.predict(frame) for track in self._tracks], dtype=np.float32).reshape(-1, 4)
+            
+            high = np.flatnonzero(boxes[:, 4] >= min_confidence)
+            low = np.flatnonzero(boxes[:, 4] < min_confidence)
+            matched = [
+                (track_index, int(high[box_index]))
+                for track_index, box_index in greedy_match(iou_matrix(predicted, boxes[high]), self.min_iou)
+            ]
+            taken = {track_index for track_index, _ in matched}
+            remaining = [index for index in range(len(self._tracks)) if index not in taken]
+            matched += [
+                (remaining[track_index], int(low[box_index]))
+                for track_index, box_index in greedy_match(iou_matrix(predicted[remaining], boxes[low]), self.min_iou)
+            ]
+            
+            results = []
+            for track_index, box_index in matched:
+                track = self._tracks[track_index]
+                self._correct(track, boxes[box_index], frame)
+                results.append((box_index, track.track_id))
+            used = {box_index for _, box_index in matched}
+            for box_index in high.tolist():
+                if box_index not in used:
+                    self._tracks.append(_Track(
+                        track_id=self._next_id,
+                        box=boxes[box_index, :4].copy(),
+                        velocity=np.zeros(4, dtype=np.float32),
+                        confidence=float(boxes[box_index, 4]),
+                        updated_frame=frame
+                    ))
+                    results.append((box_index, self._next_id))
+                    self._next_id += 1
+            self._tracks = [track for track in self._tracks if frame - track.updated_frame <= self.max_lost_frames]
+            
+            # Low-scoring boxes that continue no track are dropped; the rest keep the detector's order.
+            results.sort()
+            return DetectionResponse.from_boxes(
+                np.ascontiguousarray(boxes[[box_index for box_index, _ in results]]).reshape(-1, 5),
+                [track_id for _, track_id in results]
+            )
+    
+    def propagate(self, frame: int, frame_size: Optional[Tuple[int, int]] = None) -> DetectionResponse:
+        """
+        Tracks seen at the last detection, moved along their velocity to the given
+        frame and clipped to it; ``frame_size`` is its width and height.
+        """
+        upper = None if frame_size is None else np.array(frame_size * 2, dtype=np.float32)
+        with self._lock:
+            current = [track for track in self._tracks if track.updated_frame == self._updated_frame]
+            boxes = np.array(
+                [[*np.clip(track.predict(frame), 0, upper), track.confidence] for track in current],
+                dtype=np.float32
+            ).reshape(-1, 5)
+            return DetectionResponse.from_boxes(boxes, [track.track_id for track in current])
+    
+    def _correct(self, track: _Track, row: np.ndarray, frame: int) -> None:
+        box = row[:4].astype(np.float32)
+        elapsed = frame - track.updated_frame
+        if elapsed > 0:
+            velocity = (box - track.box) / elapsed
+            track.velocity = (
+                self.velocity_smoothing * track.velocity + (1 - self.velocity_smoothing) * velocity
+            ).astype(np.float32)
+        track.box = box
+        track.confidence = float(row[4])
+        track.updated_frame = frame
+
+
+class TrackerRegistry(StreamRegistry[StreamTracker]):
+    """Trackers keyed by stream id, with counts of detected and propagated frames."""
+    
+    def __init__(
+        self,
+        tracker_factory: Callable[[], StreamTracker],
+        max_streams: int = 1024,
+        ttl_seconds: float = 300.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        super().__init__(tracker_factory, max_streams, ttl_seconds, clock)
+        self._counts_lock = threading.Lock()
+        self._detected = 0
+        self._propagated = 0
+    
+    def count(self, detected: bool) -> None:
+        with self._counts_lock:
+            if detected:
+                self._detected += 1
+            else:
+                self._propagated += 1
+    
+    def get_stats(self) -> TrackingStats:
+        with self._counts_lock:
+            return TrackingStats(
+                streams=len(self),
+                max_streams=self.max_streams,
+                frames_detected=self._detected,
+                frames_propagated=self._propagated
+            )
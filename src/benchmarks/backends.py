@@ -0,0 +1,131 @@
+"""
+Compare inference backends on the test fixture images.
+
+    python -m src.benchmarks.backends --backends pytorch onnx openvino --int8 --output backends.json
+
+Each backend is exported (and cached) on first use, warmed up, and then timed
+over every fixture image for a number of rounds on the CPU.
+"""
+import argparse
+import json
+import time
+import numpy as np
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from src.backend.models.device_type import DeviceType
+from src.backend.models.inference_backend import InferenceBackend
+from src.backend.models.yolo_model_size import YoloModelSize
+from src.backend.services.human_detection_service import HumanDetectionService
+
+
+FIXTURES_DIR = Path(__file__).parent.parent / "tests" / "fixtures" / "images"
+
+
+def load_fixture_images(directory: Path = FIXTURES_DIR) -> List[Tuple[str, bytes]]:
+    return [
+        (str(path.relative_to(directory)), path.read_bytes())
+        for path in sorted(directory.rglob("*"))
+        if path.suffix.lower() in {".jpg", ".jpeg", ".png", ".bmp", ".webp", ".tiff"}
+    ]
+
+
+def benchmark_backend(
+    backend: InferenceBackend,
+    images: List[Tuple[str, bytes]],
+    int8: bool = False,
+    model_size: YoloModelSize = YoloModelSize.NANO,
+    rounds: int = 10,
+    warmup: int = 2,
+    cpu_threads: Optional[int] = None,
+    model_dir: Optional[str] = None
+) -> Dict[str, Any]:
+    start = time.perf_counter()
+    service = HumanDetectionService(
+        model_size=model_size,
+        supported_devices=[DeviceType.CPU],
+        backend=backend,
+        int8=int8,
+        model_dir=model_dir
+    )
+    load_seconds = time.perf_counter() - start
+    
+    for _ in range(warmup):
+        for _, image_bytes in images:
+            service.detect_humans(image_bytes, DeviceType.CPU, cpu_threads)
+    
+    latencies: List[float] = []
+    detections: Dict[str, int] = {}
+    for _ in range(rounds):
+        for name, image_bytes in images:
+            start = time.perf_counter()
+            response = service.detect_humans(image_bytes, DeviceType.CPU, cpu_threads)
+            latencies.append(time.perf_counter() - start)
+            detections[name] = len(response.bounding_boxes)
+    
+    latencies_ms = np.array(latencies) * 1000.0
+    return {
+        "backend": backend.value,
+        "int8": int8,
+        "effective_backend": service.backends[DeviceType.CPU, model_size].value,
+        "model_size": model_size.value,
+        "load_seconds": round(load_seconds, 3),
+        "mean_ms": round(float(latencies_ms.mean()), 2),
+        "p50_ms": round(float(np.percentile(latencies_ms, 50)), 2),
+        "p95_ms": round(float(np.percentile(latencies_ms, 95)), 2),
+        "images_per_second": round(len(latencies) / float(sum(latencies)), 2),
+        "detections": detections
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    parser = argparse.ArgumentParser(description="Compare YOLO inference backends on CPU")
+    parser.add_argument("--backends", nargs="+", type=InferenceBackend, default=list(InferenceBackend))
+    parser.add_argument("--int8", action="store_true", help="Also benchmark INT8 variants of exported backends")
+    parser.add_argument("--model-size", type=YoloModelSize, default=YoloModelSize.NANO)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--cpu-threads", type=int, default=None)
+    parser.add_argument("--model-dir", default=None, help="Where weights and exported models are cached")
+    parser.add_argument("--images", type=Path, default=FIXTURES_DIR)
+    parser.add_argument("--output", type=Path, default=None, help="Write results as JSON")
+    args = parser.parse_args(argv)
+    
+    images = load_fixture_images(args.images)
+    if not images:
+        parser.error(f"No images found in {args.images}")
+    
+    variants = [(backend, False) for backend in args.backends]
+    if args.int8:
+        variants += [(backend, True) for backend in args.backends if backend != InferenceBackend.PYTORCH]
+    
+    results = []
+    for backend, int8 in variants:
+        result = benchmark_backend(
+            backend,
+            images,
+            int8=int8,
+            model_size=args.model_size,
+            rounds=args.rounds,
+            warmup=args.warmup,
+            cpu_threads=args.cpu_threads,
+            model_dir=args.model_dir
+        )
+        results.append(result)
+        label = f"{backend.value}{'-int8' if int8 else ''}"
+        print(
+            f"{label:<16} ({result['effective_backend']:<8}) "
+            f"mean {result['mean_ms']:>8.2f}ms  p50 {result['p50_ms']:>8.2f}ms  "
+            f"p95 {result['p95_ms']:>8.2f}ms  {result['images_per_second']:>8.2f} img/s"
+        )
+    
+    reference = results[0]["detections"] if results else {}
+    for result in results:
+        result["matches_reference"] = result["detections"] == reference
+    
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Compare full-size and reduced-size JPEG decoding on enlarged test fixture images.
+
+    python -m src.benchmarks.decode --sizes 1920x1080 4000x3000 8000x6000 --detect --output decode.json
+
+Every fixture is resized to each size and re-encoded as a JPEG, then decoded both
+at full size and the way the service does (1/2, 1/4 or 1/8 size when that still
+covers the inference resolution). With ``--detect`` both decodes also go through
+the model and the boxes are compared, to show that the reduction costs no accuracy.
+"""
+import argparse
+import json
+import time
+import cv2
+import numpy as np
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from src.backend.models.detection_options import DetectionOptions
+from src.backend.models.device_type import DeviceType
+from src.backend.services.image_decoding import decode_reduced, jpeg_size, reduction_factor, rescale
+from src.benchmarks.backends import FIXTURES_DIR, load_fixture_images
+
+
+def parse_size(value: str) -> Tuple[int, int]:
+    width, _, height = value.lower().partition("x")
+    return int(width), int(height)
+
+
+def enlarge(image_bytes: bytes, width: int, height: int, quality: int = 90) -> np.ndarray:
+    image = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+    resized = cv2.resize(image, (width, height), interpolation=cv2.INTER_CUBIC)
+    _, buffer = cv2.imencode(".jpg", resized, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return buffer
+
+
+def box_agreement(expected: np.ndarray, actual: np.ndarray) -> Optional[float]:
+    """Mean IoU of each expected box with its best match, or None when neither found anything."""
+    if not len(expected) and not len(actual):
+        return None
+    if not len(expected) or not len(actual):
+        return 0.0
+    x1 = np.maximum(expected[:, None, 0], actual[None, :, 0])
+    y1 = np.maximum(expected[:, None, 1], actual[None, :, 1])
+    x2 = np.minimum(expected[:, None, 2], actual[None, :, 2])
+    y2 = np.minimum(expected[:, None, 3], actual[None, :, 3])
+    intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    areas_expected = (expected[:, 2] - expected[:, 0]) * (expected[:, 3] - expected[:, 1])
+    areas_actual = (actual[:, 2] - actual[:, 0]) * (actual[:, 3] - actual[:, 1])
+    union = areas_expected[:, None] + areas_actual[None, :] - intersection
+    return float((intersection / np.maximum(union, 1e-6)).max(axis=1).mean())
+
+
+def _time(function, rounds: int) -> Tuple[Any, float]:
+    result = function()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        result = function()
+    return result, (time.perf_counter() - start) / rounds * 1000.0
+
+
+def benchmark_decode(
+    images: List[Tuple[str, bytes]],
+    sizes: List[Tuple[int, int]],
+    rounds: int = 5,
+    options: Optional[DetectionOptions] = None,
+    service: Optional[Any] = None
+) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = []
+    for width, height in sizes:
+        for name, image_bytes in images:
+            buffer = enlarge(image_bytes, width, height)
+            factor = reduction_factor(*jpeg_size(buffer), options)
+            full, full_ms = _time(lambda: cv2.imdecode(buffer, cv2.IMREAD_COLOR), rounds)
+            if factor > 1:
+                (reduced, scale), reduced_ms = _time(lambda: decode_reduced(buffer, width, height, factor), rounds)
+            else:
+                reduced, scale, reduced_ms = full, (1.0, 1.0), full_ms
+            
+            result: Dict[str, Any] = {
+                "image": name,
+                "size": f"{width}x{height}",
+                "jpeg_kb": round(buffer.nbytes / 1024, 1),
+                "factor": factor,
+                "full_ms": round(full_ms, 2),
+                "reduced_ms": round(reduced_ms, 2),
+                "speedup": round(full_ms / reduced_ms, 2) if reduced_ms > 0 else None,
+                "full_mb": round(full.nbytes / (1024 * 1024), 1),
+                "reduced_mb": round(reduced.nbytes / (1024 * 1024), 1)
+            }
+            if service is not None:
+                expected = service.detect_decoded([full], DeviceType.CPU, options=options)[0]
+                actual = rescale(service.detect_decoded([reduced], DeviceType.CPU, options=options)[0], scale)
+                result["full_boxes"] = len(expected.bounding_boxes)
+                result["reduced_boxes"] = len(actual.bounding_boxes)
+                agreement = box_agreement(expected.box_array(), actual.box_array())
+                result["box_iou"] = round(agreement, 3) if agreement is not None else None
+            results.append(result)
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    parser = argparse.ArgumentParser(description="Measure reduced-size JPEG decoding on large images")
+    parser.add_argument("--sizes", nargs="+", type=parse_size, default=[(1920, 1080), (4000, 3000), (8000, 6000)])
+    parser.add_argument("--imgsz", type=int, default=None, help="Inference resolution (default: 640)")
+    parser.add_argument("--rounds", type=int, default=5, help="Timed decodes per image and size")
+    parser.add_argument("--detect", action="store_true", help="Also compare detections on both decodes")
+    parser.add_argument("--images", type=Path, default=FIXTURES_DIR)
+    parser.add_argument("--output", type=Path, default=None, help="Write results as JSON")
+    args = parser.parse_args(argv)
+    
+    images = load_fixture_images(args.images)
+    if not images:
+        parser.error(f"No images found in {args.images}")
+    
+    service = None
+    if args.detect:
+        from src.backend.services.human_detection_service import HumanDetectionService
+        service = HumanDetectionService(supported_devices=[DeviceType.CPU], reduced_decode=False)
+    options = DetectionOptions(imgsz=args.imgsz) if args.imgsz else None
+    
+    results = benchmark_decode(images, args.sizes, args.rounds, options, service)
+    for result in results:
+        line = (
+            f"{result['size']:<10} {result['image']:<32} 1/{result['factor']:<2} "
+            f"{result['full_ms']:>8.2f}ms -> {result['reduced_ms']:>8.2f}ms  x{result['speedup']}  "
+            f"{result['full_mb']}MB -> {result['reduced_mb']}MB"
+        )
+        if "box_iou" in result:
+            line += f"  boxes {result['full_boxes']}/{result['reduced_boxes']} iou {result['box_iou']}"
+        print(line)
+    
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
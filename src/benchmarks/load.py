@@ -0,0 +1,323 @@
+"""
+Load-test the detection service and the API on the test fixture images.
+
+    python -m src.benchmarks.load --target service api --model-sizes yolo11n.pt yolo11s.pt \\
+        --devices cpu --cpu-threads 4 16 --concurrency 1 8 --output load.json
+
+Every combination of target, model size, device, cpu_threads and concurrency runs
+in a fresh process, so peak RSS and model loading are measured per configuration.
+The ``service`` target calls HumanDetectionService through the micro-batcher; the
+``api`` target posts to /detect/raw on the FastAPI app in-process, or on a running
+deployment with ``--url``. The result cache is disabled so every request runs
+the model; disable it on the deployment too when using ``--url``.
+
+With ``--baseline``, results are compared against an earlier run and the command
+exits non-zero if images/sec or p95 latency regressed beyond ``--tolerance``.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from src.backend.models.device_type import DeviceType
+from src.backend.models.yolo_model_size import YoloModelSize
+from src.benchmarks.backends import FIXTURES_DIR, load_fixture_images
+
+
+TARGETS = ("service", "api")
+CONFIG_KEYS = ("target", "model_size", "device", "cpu_threads", "concurrency")
+
+
+def summarize(latencies: List[Optional[float]], wall_seconds: float) -> Dict[str, Any]:
+    succeeded = np.array([latency for latency in latencies if latency is not None]) * 1000.0
+    summary: Dict[str, Any] = {
+        "requests": len(latencies),
+        "errors": len(latencies) - len(succeeded),
+        "wall_seconds": round(wall_seconds, 3),
+        "images_per_second": round(len(succeeded) / wall_seconds, 2) if wall_seconds > 0 else 0.0
+    }
+    for name, percentile in (("p50_ms", 50), ("p95_ms", 95), ("p99_ms", 99)):
+        summary[name] = round(float(np.percentile(succeeded, percentile)), 2) if len(succeeded) else None
+    summary["mean_ms"] = round(float(succeeded.mean()), 2) if len(succeeded) else None
+    return summary
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def _workload(images: List[Tuple[str, bytes]], rounds: int) -> List[bytes]:
+    return [image_bytes for _ in range(rounds) for _, image_bytes in images]
+
+
+def _replay_service(
+    images: List[Tuple[str, bytes]],
+    model_size: YoloModelSize,
+    device: DeviceType,
+    cpu_threads: Optional[int],
+    concurrency: int,
+    rounds: int,
+    warmup: int
+) -> Dict[str, Any]:
+    from src.backend.config import settings
+    from src.backend.services.batch_scheduler import BatchScheduler
+    from src.backend.services.human_detection_service import HumanDetectionService
+    
+    service = HumanDetectionService(
+        model_size=model_size,
+        confidence_threshold=settings.confidence_threshold,
+        supported_devices=[device],
+        backend=settings.inference_backend,
+        int8=settings.inference_int8,
+        model_dir=settings.model_dir,
+        precision=settings.inference_precision,
+        channels_last=settings.inference_channels_last,
+        compile_model=settings.inference_compile
+    )
+    scheduler = BatchScheduler(
+        service,
+        max_batch_size=settings.batch_max_size,
+        max_wait_ms=settings.batch_max_wait_ms,
+        default_cpu_threads=settings.cpu_threads
+    )
+    
+    def detect(image_bytes: bytes) -> Optional[float]:
+        start = time.perf_counter()
+        try:
+            service.detect_humans(image_bytes, device, cpu_threads, run_batch=scheduler.detect_batch)
+        except Exception:
+            return None
+        return time.perf_counter() - start
+    
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(detect, _workload(images, warmup)))
+            start = time.perf_counter()
+            latencies = list(executor.map(detect, _workload(images, rounds)))
+            wall_seconds = time.perf_counter() - start
+    finally:
+        scheduler.shutdown()
+    return summarize(latencies, wall_seconds)
+
+
+async def _replay_api_async(
+    images: List[Tuple[str, bytes]],
+    model_size: YoloModelSize,
+    device: DeviceType,
+    cpu_threads: Optional[int],
+    concurrency: int,
+    rounds: int,
+    warmup: int,
+    url: Optional[str]
+) -> Dict[str, Any]:
+    import httpx
+    
+    if url is None:
+        from src.backend.api.main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark")
+    else:
+        client = httpx.AsyncClient(base_url=url, timeout=60.0)
+    
+    params: Dict[str, Any] = {"device": device.value, "model_size": model_size.value}
+    if cpu_threads is not None:
+        params["cpu_threads"] = cpu_threads
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def detect(image_bytes: bytes) -> Optional[float]:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await client.post(
+                    "/detect/raw",
+                    params=params,
+                    content=image_bytes,
+                    headers={"Content-Type": "application/octet-stream"}
+                )
+            except httpx.HTTPError:
+                return None
+            elapsed = time.perf_counter() - start
+            return elapsed if response.status_code == 200 else None
+    
+    async with client:
+        await asyncio.gather(*(detect(image_bytes) for image_bytes in _workload(images, warmup)))
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*(detect(image_bytes) for image_bytes in _workload(images, rounds)))
+        wall_seconds = time.perf_counter() - start
+    return summarize(list(latencies), wall_seconds)
+
+
+def run_configuration(
+    target: str,
+    images_dir: str,
+    model_size: YoloModelSize,
+    device: DeviceType,
+    cpu_threads: Optional[int],
+    concurrency: int,
+    rounds: int,
+    warmup: int,
+    url: Optional[str] = None
+) -> Dict[str, Any]:
+    images = load_fixture_images(Path(images_dir))
+    if target == "service":
+        summary = _replay_service(images, model_size, device, cpu_threads, concurrency, rounds, warmup)
+    else:
+        summary = asyncio.run(
+            _replay_api_async(images, model_size, device, cpu_threads, concurrency, rounds, warmup, url)
+        )
+    
+    result: Dict[str, Any] = {
+        "target": target,
+        "model_size": model_size.value,
+        "device": device.value,
+        "cpu_threads": cpu_threads,
+        "concurrency": concurrency,
+        **summary
+    }
+    # Against a remote deployment only the client's memory is visible here.
+    result["peak_rss_mb"] = peak_rss_mb() if url is None else None
+    return result
+
+
+def run_isolated(
+    function: Callable[..., Dict[str, Any]],
+    environment: Dict[str, str],
+    *args: Any
+) -> Dict[str, Any]:
+    # Settings are read from the environment when the child first imports them,
+    # so the overrides must be in place before it is spawned.
+    previous = {name: os.environ.get(name) for name in environment}
+    os.environ.update(environment)
+    try:
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+            return executor.submit(function, *args).result()
+    finally:
+        for name, value in previous.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def environment_info() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count()
+    }
+
+
+def _config_key(result: Dict[str, Any]) -> Tuple:
+    return tuple(result.get(key) for key in CONFIG_KEYS)
+
+
+def compare(
+    results: List[Dict[str, Any]],
+    baseline: List[Dict[str, Any]],
+    tolerance: float = 0.1
+) -> List[str]:
+    reference = {_config_key(result): result for result in baseline}
+    regressions: List[str] = []
+    for result in results:
+        previous = reference.get(_config_key(result))
+        if previous is None:
+            continue
+        label = " ".join(f"{key}={result[key]}" for key in CONFIG_KEYS)
+        if result["images_per_second"] < previous["images_per_second"] * (1 - tolerance):
+            regressions.append(
+                f"{label}: images/sec {previous['images_per_second']} -> {result['images_per_second']}"
+            )
+        if previous.get("p95_ms") and result.get("p95_ms") and result["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{label}: p95 {previous['p95_ms']}ms -> {result['p95_ms']}ms")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    parser = argparse.ArgumentParser(description="Measure detection throughput, latency and memory")
+    parser.add_argument("--target", nargs="+", choices=TARGETS, default=list(TARGETS))
+    parser.add_argument("--model-sizes", nargs="+", type=YoloModelSize, default=[YoloModelSize.NANO])
+    parser.add_argument("--devices", nargs="+", type=DeviceType, default=[DeviceType.CPU])
+    parser.add_argument(
+        "--cpu-threads", nargs="+", type=int, default=[None],
+        help="cpu_threads values to test (CPU only; default: server setting)"
+    )
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 8])
+    parser.add_argument("--rounds", type=int, default=5, help="Passes over the image set per configuration")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed passes before measuring")
+    parser.add_argument("--url", default=None, help="Benchmark a running API instead of the in-process app")
+    parser.add_argument("--images", type=Path, default=FIXTURES_DIR)
+    parser.add_argument("--output", type=Path, default=None, help="Write results as JSON")
+    parser.add_argument("--baseline", type=Path, default=None, help="Earlier --output file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Allowed relative regression")
+    args = parser.parse_args(argv)
+    
+    if not load_fixture_images(args.images):
+        parser.error(f"No images found in {args.images}")
+    
+    results = []
+    for target, model_size, device, cpu_threads, concurrency in itertools.product(
+        args.target, args.model_sizes, args.devices, args.cpu_threads, args.concurrency
+    ):
+        if device != DeviceType.CPU and cpu_threads is not None:
+            continue
+        environment = {
+            "HUMAN_DETECTOR_CACHE_ENABLED": "false",
+            "HUMAN_DETECTOR_MODEL_SIZE": model_size.value,
+            "HUMAN_DETECTOR_SUPPORTED_DEVICES": json.dumps([device.value])
+        }
+        result = run_isolated(
+            run_configuration,
+            environment,
+            target,
+            str(args.images),
+            model_size,
+            device,
+            cpu_threads,
+            concurrency,
+            args.rounds,
+            args.warmup,
+            args.url
+        )
+        results.append(result)
+        print(
+            f"{target:<8} {model_size.value:<11} {device.value:<5} threads={str(cpu_threads):<5} "
+            f"conc={concurrency:<3} {result['images_per_second']:>8.2f} img/s  "
+            f"p50 {result['p50_ms']}ms  p95 {result['p95_ms']}ms  p99 {result['p99_ms']}ms  "
+            f"rss {result['peak_rss_mb']}MB  errors {result['errors']}"
+        )
+    
+    if args.output:
+        args.output.write_text(json.dumps({"environment": environment_info(), "results": results}, indent=2))
+    
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        regressions = compare(results, baseline.get("results", []), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+    return results
+
+
+if __name__ == "__main__":
+    main()
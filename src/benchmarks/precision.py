@@ -0,0 +1,157 @@
+"""
+Check that reduced precision, channels-last and compiled models agree with fp32 on
+the test fixture images before enabling them.
+
+    python -m src.benchmarks.precision --tunings bf16 bf16+channels-last fp16+channels-last+compiled --output precision.json
+
+Every configuration is timed over the fixtures and its boxes compared with a plain
+fp32 model's. The command exits non-zero if any configuration finds a different
+number of people in an image or its boxes overlap the fp32 ones less than
+``--min-iou``. A configuration the host does not support falls back the way the
+service would, and is reported with the configuration that took effect.
+"""
+import argparse
+import json
+import sys
+import time
+import numpy as np
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from src.backend.models.device_type import DeviceType
+from src.backend.models.inference_precision import InferencePrecision
+from src.backend.models.yolo_model_size import YoloModelSize
+from src.backend.services.human_detection_service import HumanDetectionService
+from src.backend.services.precision import ModelTuning
+from src.benchmarks.backends import FIXTURES_DIR, load_fixture_images
+from src.benchmarks.decode import box_agreement
+
+
+def parse_tuning(value: str) -> ModelTuning:
+    """A configuration written like ``bf16+channels-last+compiled``, as ``ModelTuning.describe`` prints it."""
+    precision, *flags = value.lower().split("+")
+    unknown = set(flags) - {"channels-last", "compiled"}
+    if unknown:
+        raise argparse.ArgumentTypeError(f"Unknown options: {sorted(unknown)}")
+    return ModelTuning(
+        precision=InferencePrecision(precision),
+        channels_last="channels-last" in flags,
+        compile="compiled" in flags
+    )
+
+
+def _detect_all(
+    service: HumanDetectionService,
+    images: List[Tuple[str, bytes]],
+    device: DeviceType,
+    rounds: int,
+    warmup: int
+) -> Tuple[Dict[str, np.ndarray], List[float]]:
+    for _ in range(warmup):
+        for _, image_bytes in images:
+            service.detect_humans(image_bytes, device)
+    
+    boxes: Dict[str, np.ndarray] = {}
+    latencies: List[float] = []
+    for _ in range(rounds):
+        for name, image_bytes in images:
+            start = time.perf_counter()
+            response = service.detect_humans(image_bytes, device)
+            latencies.append(time.perf_counter() - start)
+            boxes[name] = response.box_array()
+    return boxes, latencies
+
+
+def compare_tunings(
+    images: List[Tuple[str, bytes]],
+    tunings: List[ModelTuning],
+    device: DeviceType = DeviceType.CPU,
+    model_size: YoloModelSize = YoloModelSize.NANO,
+    rounds: int = 3,
+    warmup: int = 1,
+    min_iou: float = 0.9,
+    model_dir: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = []
+    reference: Dict[str, np.ndarray] = {}
+    for tuning in [ModelTuning()] + tunings:
+        service = HumanDetectionService(
+            model_size=model_size,
+            supported_devices=[device],
+            model_dir=model_dir,
+            precision=tuning.precision,
+            channels_last=tuning.channels_last,
+            compile_model=tuning.compile
+        )
+        boxes, latencies = _detect_all(service, images, device, rounds, warmup)
+        if not reference:
+            reference = boxes
+        
+        agreements = [box_agreement(reference[name], boxes[name]) for name in reference]
+        agreements = [agreement for agreement in agreements if agreement is not None]
+        same_counts = all(len(reference[name]) == len(boxes[name]) for name in reference)
+        min_agreement = min(agreements) if agreements else None
+        latencies_ms = np.array(latencies) * 1000.0
+        results.append({
+            "tuning": tuning.describe(),
+            "effective_tuning": service.tunings[device, model_size].describe(),
+            "mean_ms": round(float(latencies_ms.mean()), 2),
+            "p95_ms": round(float(np.percentile(latencies_ms, 95)), 2),
+            "images_per_second": round(len(latencies) / float(sum(latencies)), 2),
+            "same_counts": same_counts,
+            "min_box_iou": round(min_agreement, 3) if min_agreement is not None else None,
+            "mean_box_iou": round(float(np.mean(agreements)), 3) if agreements else None,
+            "accurate": same_counts and (min_agreement is None or min_agreement >= min_iou)
+        })
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    parser = argparse.ArgumentParser(description="Compare reduced-precision model configurations with fp32")
+    parser.add_argument(
+        "--tunings",
+        nargs="+",
+        type=parse_tuning,
+        default=[parse_tuning("bf16"), parse_tuning("fp32+channels-last"), parse_tuning("bf16+channels-last")],
+        help="Configurations such as bf16, fp16+channels-last or fp32+channels-last+compiled"
+    )
+    parser.add_argument("--device", type=DeviceType, default=DeviceType.CPU)
+    parser.add_argument("--model-size", type=YoloModelSize, default=YoloModelSize.NANO)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--min-iou", type=float, default=0.9, help="Lowest acceptable box agreement with fp32")
+    parser.add_argument("--model-dir", default=None, help="Where weights are cached")
+    parser.add_argument("--images", type=Path, default=FIXTURES_DIR)
+    parser.add_argument("--output", type=Path, default=None, help="Write results as JSON")
+    args = parser.parse_args(argv)
+    
+    images = load_fixture_images(args.images)
+    if not images:
+        parser.error(f"No images found in {args.images}")
+    
+    results = compare_tunings(
+        images,
+        args.tunings,
+        device=args.device,
+        model_size=args.model_size,
+        rounds=args.rounds,
+        warmup=args.warmup,
+        min_iou=args.min_iou,
+        model_dir=args.model_dir
+    )
+    for result in results:
+        print(
+            f"{result['tuning']:<32} ({result['effective_tuning']:<32}) "
+            f"mean {result['mean_ms']:>8.2f}ms  p95 {result['p95_ms']:>8.2f}ms  "
+            f"{result['images_per_second']:>8.2f} img/s  min iou {result['min_box_iou']}  "
+            f"{'ok' if result['accurate'] else 'MISMATCH'}"
+        )
+    
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    if not all(result["accurate"] for result in results):
+        sys.exit(1)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,10 @@
 import streamlit as st
 import requests
-import base64
 import os
+import threading
 import time
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 from PIL import Image
 import io
 
@@ -13,26 +14,138 @@ API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000")
 CPU_THREADS_MIN = int(os.getenv("UI_CPU_THREADS_MIN", "1"))
 CPU_THREADS_MAX = int(os.getenv("UI_CPU_THREADS_MAX", "64"))
 CPU_THREADS_DEFAULT = int(os.getenv("UI_CPU_THREADS_DEFAULT", "32"))
+MAX_CONCURRENCY = int(os.getenv("UI_MAX_CONCURRENCY", "32"))
+BATCH_MAX_ITEMS = int(os.getenv("UI_BATCH_MAX_ITEMS", "64"))
+MODEL_INPUT_SIZE = int(os.getenv("UI_MODEL_INPUT_SIZE", "640"))
+IMAGE_TYPES = ["jpg", "jpeg", "png", "bmp", "gif", "webp", "tiff"]
+REQUEST_TIMEOUT_SECONDS = 60
+# Lets the server drop a queued request once this client has stopped waiting for it.
+DEADLINE_HEADERS = {"X-Deadline-Ms": str(REQUEST_TIMEOUT_SECONDS * 1000)}
 
 st.title("👤 Human Detector")
 st.markdown(f"**API Endpoint:** `{API_BASE_URL}`")
 
-def encode_image(image_bytes: bytes) -> str:
-    return base64.b64encode(image_bytes).decode('utf-8')
-
-def call_detection_api(image_base64: str, device: str = "cuda", cpu_threads: int | None = None) -> tuple[dict, float]:
-    start_time = time.time()
-    payload: dict = {"image_data": image_base64, "device": device}
-    if cpu_threads is not None:
-        payload["cpu_threads"] = cpu_threads
-    response = requests.post(
-        f"{API_BASE_URL}/detect",
-        json=payload,
-        timeout=10
-    )
-    response.raise_for_status()
-    elapsed_time = time.time() - start_time
-    return response.json(), elapsed_time
+class ClientPool:
+    """Request threads that each keep their own HTTP session, so connections are reused across runs."""
+    
+    def __init__(self, workers: int):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ui-client")
+        self._local = threading.local()
+    
+    def session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+@st.cache_resource
+def get_client_pool(workers: int) -> ClientPool:
+    return ClientPool(workers)
+
+@dataclass
+class PreparedImage:
+    name: str
+    data: bytes
+    content_type: str
+    # Original pixels per sent pixel, to map boxes back onto the upload.
+    scale: float = 1.0
+
+def prepare_image(name: str, data: bytes, content_type: str, max_side: int | None) -> PreparedImage:
+    """The upload as sent: re-encoded as a JPEG no larger than ``max_side`` when that shrinks it."""
+    if max_side is None:
+        return PreparedImage(name, data, content_type)
+    image = Image.open(io.BytesIO(data))
+    width, height = image.size
+    if max(width, height) <= max_side:
+        return PreparedImage(name, data, content_type)
+    
+    scale = max(width, height) / max_side
+    size = (max(1, round(width / scale)), max(1, round(height / scale)))
+    # JPEGs are decoded at a reduced size directly when that still covers the target.
+    image.draft("RGB", size)
+    image = image.convert("RGB").resize(size, Image.Resampling.BILINEAR)
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=90)
+    return PreparedImage(name, buffer.getvalue(), "image/jpeg", width / size[0])
+
+def scale_result(result: dict, scale: float) -> dict:
+    if scale != 1.0:
+        for box in result.get("boundingBoxes", []):
+            for key in ("x1", "y1", "x2", "y2"):
+                box[key] *= scale
+    return result
+
+def detect_one(pool: ClientPool, upload, params: dict, max_side: int | None) -> list[dict]:
+    item = prepare_image(upload.name, upload.getvalue(), upload.type or "application/octet-stream", max_side)
+    start = time.perf_counter()
+    try:
+        response = pool.session().post(
+            f"{API_BASE_URL}/detect/upload",
+            files={"image": (item.name, item.data, item.content_type)},
+            data=params,
+            headers=DEADLINE_HEADERS,
+            timeout=REQUEST_TIMEOUT_SECONDS
+        )
+        response.raise_for_status()
+        outcome = {"result": scale_result(response.json(), item.scale)}
+    except requests.RequestException as e:
+        outcome = {"error": str(e)}
+    return [{"name": item.name, "bytes_sent": len(item.data), "seconds": time.perf_counter() - start, **outcome}]
+
+def detect_batch(pool: ClientPool, uploads: list, params: dict, max_side: int | None) -> list[dict]:
+    items = [
+        prepare_image(upload.name, upload.getvalue(), upload.type or "application/octet-stream", max_side)
+        for upload in uploads
+    ]
+    start = time.perf_counter()
+    try:
+        response = pool.session().post(
+            f"{API_BASE_URL}/detect/batch/upload",
+            files=[("images", (item.name, item.data, item.content_type)) for item in items],
+            data=params,
+            headers=DEADLINE_HEADERS,
+            timeout=REQUEST_TIMEOUT_SECONDS
+        )
+        response.raise_for_status()
+        outcomes = response.json()["results"]
+    except requests.RequestException as e:
+        outcomes = [{"error": str(e)}] * len(items)
+    # Every image in a batch waits for the whole batch.
+    seconds = time.perf_counter() - start
+    return [
+        {
+            "name": item.name,
+            "bytes_sent": len(item.data),
+            "seconds": seconds,
+            **(
+                {"result": scale_result(outcome["result"], item.scale)} if outcome.get("result") is not None
+                else {"error": outcome.get("error") or "No result"}
+            )
+        }
+        for item, outcome in zip(items, outcomes)
+    ]
+
+def run_detection(uploads: list, params: dict, concurrency: int, batch_size: int, max_side: int | None) -> dict:
+    """Sends every upload with ``concurrency`` requests in flight; batch_size 1 uses /detect/upload."""
+    pool = get_client_pool(concurrency)
+    progress = st.progress(0.0, text="Sending...")
+    records: list[dict] = []
+    start = time.perf_counter()
+    if batch_size == 1:
+        futures = [pool.executor.submit(detect_one, pool, upload, params, max_side) for upload in uploads]
+    else:
+        futures = [
+            pool.executor.submit(detect_batch, pool, uploads[i:i + batch_size], params, max_side)
+            for i in range(0, len(uploads), batch_size)
+        ]
+    for future in as_completed(futures):
+        finished = time.perf_counter() - start
+        for record in future.result():
+            record["finished"] = finished
+            records.append(record)
+        progress.progress(len(records) / len(uploads), text=f"{len(records)}/{len(uploads)} images")
+    progress.empty()
+    return {"records": records, "wall_seconds": time.perf_counter() - start}
 
 def display_result(result: dict, image: Image.Image, elapsed_time: float | None = None):
     col1, col2 = st.columns(2)
@@ -61,13 +174,55 @@ def display_result(result: dict, image: Image.Image, elapsed_time: float | None
                 with st.expander(f"Box {i} - Confidence: {bbox['confidence']:.2%}"):
                     st.json(bbox)
 
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def display_run(run: dict, original_bytes: int):
+    records = sorted(run["records"], key=lambda record: record["finished"])
+    latencies_ms = [record["seconds"] * 1000 for record in records]
+    errors = [record for record in records if "error" in record]
+    
+    columns = st.columns(5)
+    columns[0].metric("Images", len(records))
+    columns[1].metric("Throughput", f"{len(records) / run['wall_seconds']:.1f} img/s")
+    columns[2].metric("p50 Latency", f"{percentile(latencies_ms, 0.5):.0f}ms")
+    columns[3].metric("p95 Latency", f"{percentile(latencies_ms, 0.95):.0f}ms")
+    columns[4].metric("Sent", f"{sum(r['bytes_sent'] for r in records) / 1e6:.1f}MB", f"of {original_bytes / 1e6:.1f}MB")
+    if errors:
+        st.error(f"{len(errors)} of {len(records)} images failed: {errors[0]['error']}")
+    
+    st.subheader("Latency per Image")
+    st.bar_chart({"image": [r["name"] for r in records], "latency (ms)": latencies_ms}, x="image", y="latency (ms)")
+    st.subheader("Completed Images over Time")
+    st.line_chart(
+        {"seconds": [r["finished"] for r in records], "images": list(range(1, len(records) + 1))},
+        x="seconds",
+        y="images"
+    )
+    
+    st.subheader("Results")
+    st.dataframe(
+        [
+            {
+                "image": r["name"],
+                "humans": len(r["result"]["boundingBoxes"]) if "result" in r else None,
+                "max confidence": r["result"]["maxConfidence"] if "result" in r else None,
+                "latency (ms)": round(r["seconds"] * 1000),
+                "error": r.get("error")
+            }
+            for r in sorted(records, key=lambda record: record["name"])
+        ],
+        use_container_width=True
+    )
+
 st.header("Upload Your Image")
 
 device_option = st.selectbox(
     "Select Device",
-    ["cpu", "cuda"],
+    ["cpu", "cuda", "auto"],
     index=0,
-    help="Choose whether to run inference on GPU (cuda) or CPU"
+    help="Choose whether to run inference on GPU (cuda) or CPU, or let the server pick the less loaded one (auto)"
 )
 
 cpu_threads = None
@@ -81,33 +236,61 @@ if device_option == "cpu":
         help=f"Number of CPU threads for inference (range: {CPU_THREADS_MIN}-{CPU_THREADS_MAX})"
     )
 
-uploaded_file = st.file_uploader(
-    "Choose an image file",
-    type=["jpg", "jpeg", "png", "bmp", "gif", "webp", "tiff"],
-    help="Upload an image to test human detection"
+with st.expander("Sending"):
+    concurrency = st.slider(
+        "Concurrent Requests", 1, MAX_CONCURRENCY, min(4, MAX_CONCURRENCY),
+        help="Requests in flight at once, each on a kept-alive connection"
+    )
+    batch_size = st.slider(
+        "Images per Request", 1, BATCH_MAX_ITEMS, 1,
+        help="1 sends each image to /detect/upload; more send groups to /detect/batch/upload"
+    )
+    downscale = st.checkbox(
+        "Downscale before sending", value=True,
+        help="Shrink images to the model input size in the browser session; boxes are mapped back to the original"
+    )
+    input_size = st.number_input("Model Input Size", min_value=32, max_value=4096, value=MODEL_INPUT_SIZE, step=32)
+
+upload_mode = st.radio("Upload", ["Files", "Folder"], horizontal=True)
+uploaded_files = st.file_uploader(
+    "Choose image files" if upload_mode == "Files" else "Choose a folder of images",
+    type=IMAGE_TYPES,
+    accept_multiple_files=True if upload_mode == "Files" else "directory",
+    help="Upload images to test human detection"
 )
 
-if uploaded_file:
+if uploaded_files:
     try:
-        image_bytes = uploaded_file.read()
-        image = Image.open(io.BytesIO(image_bytes))
-        
         # Initialize session state for results
-        if "result" not in st.session_state:
-            st.session_state.result = None
-            st.session_state.elapsed_time = None
-            st.session_state.result_image = None
+        if "run" not in st.session_state:
+            st.session_state.run = None
+            st.session_state.run_files = None
         
         if st.button("🔍 Detect Humans", type="primary", use_container_width=True):
+            params: dict = {"device": device_option}
+            if cpu_threads is not None:
+                params["cpu_threads"] = cpu_threads
             with st.spinner("Processing..."):
-                image_base64 = encode_image(image_bytes)
-                result, elapsed_time = call_detection_api(image_base64, device=device_option, cpu_threads=cpu_threads)
-                st.session_state.result = result
-                st.session_state.elapsed_time = elapsed_time
-                st.session_state.result_image = image
+                st.session_state.run = run_detection(
+                    uploaded_files,
+                    params,
+                    concurrency,
+                    batch_size,
+                    int(input_size) if downscale else None
+                )
+                st.session_state.run_files = [upload.file_id for upload in uploaded_files]
         
-        # Display results if they exist in session state
-        if st.session_state.result is not None and st.session_state.result_image is not None:
-            display_result(st.session_state.result, st.session_state.result_image, st.session_state.elapsed_time)
+        # Display results if they are for the current uploads
+        run = st.session_state.run
+        if run is not None and st.session_state.run_files == [upload.file_id for upload in uploaded_files]:
+            if len(uploaded_files) == 1:
+                record = run["records"][0]
+                if "error" in record:
+                    st.error(f"Error: {record['error']}")
+                else:
+                    image = Image.open(io.BytesIO(uploaded_files[0].getvalue()))
+                    display_result(record["result"], image, record["seconds"])
+            else:
+                display_run(run, sum(upload.size for upload in uploaded_files))
     except Exception as e:
         st.error(f"Error: {str(e)}")
@@ -4,7 +4,17 @@ import base64
 import numpy as np
 import cv2
 import os
+import json
+import threading
+import time
+import io
+import zipfile
+from prometheus_client import REGISTRY
+from src.backend.api import main
 from src.backend.api.main import app
+from src.backend.models.request_priority import RequestPriority
+from src.backend.services.admission import AdmissionController, RateLimit
+from src.backend.services.inference_pool import InferencePool
 
 os.environ['HUMAN_DETECTOR_ROOT_PATH'] = ''
 
@@ -65,3 +75,487 @@ def test_detect_endpoint_explicit_gpu():
         data={"device": "gpu"}
     )
     assert response.status_code in [200, 400]
+
+
+def test_detect_auto_device_routes_to_available_device():
+    img = np.zeros((100, 100, 3), dtype=np.uint8)
+    _, buffer = cv2.imencode('.jpg', img)
+    before = client.get("/stats/routing").json()["devices"].get("cpu", {}).get("routed", 0)
+    
+    response = client.post(
+        "/detect/upload",
+        files={"image": ("test.jpg", buffer.tobytes(), "image/jpeg")},
+        data={"device": "auto"}
+    )
+    
+    assert response.status_code == 200
+    stats = client.get("/stats/routing").json()
+    assert stats["devices"]["cpu"]["routed"] == before + 1
+    assert stats["devices"]["cpu"]["queueDepth"] == 0
+    assert stats["devices"]["cpu"]["secondsPerImage"] > 0
+
+
+def test_batching_stats():
+    response = client.get("/stats/batching")
+    assert response.status_code == 200
+    data = response.json()
+    assert "maxBatchSize" in data
+    assert "queueDepth" in data
+    assert "batchSizeHistogram" in data
+
+
+def test_detect_returns_503_when_queue_full(monkeypatch):
+    pool = InferencePool(max_workers=1, max_queue_size=0, retry_after=2)
+    monkeypatch.setattr(main, "inference_pool", pool)
+    release = threading.Event()
+    busy = pool.submit(release.wait)
+    
+    try:
+        response = client.post("/detect", json={"image_data": create_test_image(), "device": "cpu"})
+    finally:
+        release.set()
+        busy.result(timeout=5)
+        pool.shutdown()
+    
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "2"
+
+
+def test_detect_rate_limits_each_api_key(monkeypatch):
+    controller = AdmissionController(4, 4, {RequestPriority.INTERACTIVE: RateLimit(rate=0.01, burst=1)})
+    monkeypatch.setattr(main, "admission", controller)
+    monkeypatch.setattr(main.settings, "admission_api_keys", ["a", "b"])
+    body = {"image_data": create_test_image(), "device": "cpu"}
+    
+    first = client.post("/detect", json=body, headers={"X-API-Key": "a"})
+    limited = client.post("/detect", json=body, headers={"X-API-Key": "a"})
+    other = client.post("/detect", json=body, headers={"X-API-Key": "b"})
+    
+    assert first.status_code == 200
+    assert limited.status_code == 429
+    assert int(limited.headers["Retry-After"]) >= 1
+    assert other.status_code == 200
+    stats = client.get("/stats/admission").json()
+    assert stats["rateLimited"]["interactive"] == 1
+    assert stats["admitted"]["interactive"] == 2
+
+
+def test_unknown_api_keys_share_the_address_bucket(monkeypatch):
+    controller = AdmissionController(4, 4, {RequestPriority.INTERACTIVE: RateLimit(rate=0.01, burst=1)})
+    monkeypatch.setattr(main, "admission", controller)
+    body = {"image_data": create_test_image(), "device": "cpu"}
+    
+    first = client.post("/detect", json=body, headers={"X-API-Key": "random-1"})
+    second = client.post("/detect", json=body, headers={"X-API-Key": "random-2"})
+    anonymous = client.post("/detect", json=body)
+    
+    assert first.status_code == 200
+    assert second.status_code == 429
+    assert anonymous.status_code == 429
+    assert controller.get_stats().clients == 1
+
+
+def test_detect_drops_requests_past_their_deadline(monkeypatch):
+    # No request is ever admitted, so the deadline passes while it waits.
+    monkeypatch.setattr(main, "admission", AdmissionController(max_concurrent=0, max_queued=4))
+    
+    response = client.post(
+        "/detect",
+        json={"image_data": create_test_image(), "device": "cpu"},
+        headers={"X-Deadline-Ms": "50", "X-Priority": "bulk"}
+    )
+    
+    assert response.status_code == 504
+    assert client.get("/stats/admission").json()["dropped"] == {"interactive": 0, "bulk": 1}
+
+
+def test_detect_rejects_unknown_priority():
+    response = client.post(
+        "/detect",
+        json={"image_data": create_test_image(), "device": "cpu"},
+        headers={"X-Priority": "urgent"}
+    )
+    
+    assert response.status_code == 422
+
+
+
+def test_detect_raw_endpoint_valid_image():
+    img = np.zeros((100, 100, 3), dtype=np.uint8)
+    _, buffer = cv2.imencode('.jpg', img)
+    
+    response = client.post(
+        "/detect/raw?device=cpu",
+        content=buffer.tobytes(),
+        headers={"Content-Type": "application/octet-stream"}
+    )
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["humanDetected"] is False
+    assert data["boundingBoxes"] == []
+
+
+def test_detect_raw_endpoint_invalid_image():
+    response = client.post(
+        "/detect/raw",
+        content=b"not an image",
+        headers={"Content-Type": "application/octet-stream"}
+    )
+    assert response.status_code == 400
+
+
+def test_detect_raw_endpoint_with_regions():
+    img = np.zeros((200, 200, 3), dtype=np.uint8)
+    img[:100, :100] = 255
+    _, buffer = cv2.imencode('.png', img)
+    
+    response = client.post(
+        "/detect/raw",
+        params={"device": "cpu", "regions": json.dumps([{"x1": 0, "y1": 0, "x2": 100, "y2": 100}])},
+        content=buffer.tobytes(),
+        headers={"Content-Type": "application/octet-stream"}
+    )
+    assert response.status_code == 200
+    assert response.json()["humanDetected"] is True
+    assert "trackId" not in response.json()["boundingBoxes"][0]
+    
+    invalid = client.post(
+        "/detect/raw",
+        params={"device": "cpu", "regions": "not json"},
+        content=buffer.tobytes(),
+        headers={"Content-Type": "application/octet-stream"}
+    )
+    assert invalid.status_code == 400
+
+
+def test_detect_raw_endpoint_empty_body():
+    response = client.post("/detect/raw", content=b"")
+    assert response.status_code == 400
+
+
+def test_detect_rejects_images_over_the_limits(monkeypatch):
+    img = np.zeros((100, 100, 3), dtype=np.uint8)
+    _, buffer = cv2.imencode('.png', img)
+    
+    monkeypatch.setattr(main.detection_service, "max_image_pixels", 100 * 100 - 1)
+    raw = client.post("/detect/raw", content=buffer.tobytes(), headers={"Content-Type": "application/octet-stream"})
+    upload = client.post("/detect/upload", files={"image": ("test.png", buffer.tobytes(), "image/png")})
+    assert raw.status_code == 413
+    assert upload.status_code == 413
+    
+    monkeypatch.setattr(main.settings, "image_max_bytes", buffer.nbytes - 1)
+    raw = client.post("/detect/raw", content=buffer.tobytes(), headers={"Content-Type": "application/octet-stream"})
+    batch = client.post("/detect/batch/upload", files=[("images", ("test.png", buffer.tobytes(), "image/png"))])
+    assert raw.status_code == 413
+    assert "over the limit" in batch.json()["results"][0]["error"]
+
+
+def test_detect_batch_json_mixed_items():
+    response = client.post(
+        "/detect/batch",
+        json=[
+            {"image_data": create_test_image(), "device": "cpu"},
+            {"image_data": "not valid base64!@#$", "device": "cpu"},
+            {"image_data": create_test_image(), "device": "cpu"}
+        ]
+    )
+    
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert len(results) == 3
+    assert results[0]["result"]["humanDetected"] is False
+    assert results[0]["error"] is None
+    assert results[1]["result"] is None
+    assert "base64" in results[1]["error"]
+    assert results[2]["result"]["humanDetected"] is False
+
+
+def test_detect_batch_upload():
+    img = np.zeros((100, 100, 3), dtype=np.uint8)
+    _, buffer = cv2.imencode('.jpg', img)
+    
+    response = client.post(
+        "/detect/batch/upload",
+        files=[
+            ("images", ("a.jpg", buffer.tobytes(), "image/jpeg")),
+            ("images", ("b.txt", b"invalid!@#$", "text/plain")),
+        ],
+        data={"device": "cpu"}
+    )
+    
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert len(results) == 2
+    assert results[0]["result"]["humanDetected"] is False
+    assert results[1]["error"] is not None
+
+
+def test_detect_batch_too_many_items(monkeypatch):
+    monkeypatch.setattr(main.settings, "batch_request_max_items", 1)
+    
+    response = client.post(
+        "/detect/batch",
+        json=[{"image_data": create_test_image()}, {"image_data": create_test_image()}]
+    )
+    assert response.status_code == 400
+    
+    upload = client.post(
+        "/detect/batch/upload",
+        files=[("images", ("a.jpg", b"x", "image/jpeg")), ("images", ("b.jpg", b"x", "image/jpeg"))]
+    )
+    assert upload.status_code == 422
+    assert "maximum is 1" in upload.json()["detail"]
+
+
+def test_detect_video_streams_frames(tmp_path):
+    path = tmp_path / "clip.avi"
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48))
+    for _ in range(6):
+        writer.write(np.zeros((48, 64, 3), dtype=np.uint8))
+    writer.release()
+    
+    response = client.post(
+        "/detect/video",
+        files={"video": ("clip.avi", path.read_bytes(), "video/x-msvideo")},
+        data={"device": "cpu", "frame_stride": "2"}
+    )
+    
+    assert response.status_code == 200
+    frames = [json.loads(line) for line in response.text.splitlines()]
+    assert [frame["frameIndex"] for frame in frames] == [0, 2, 4]
+    assert all(frame["result"]["humanDetected"] is False for frame in frames)
+
+
+def test_detect_video_invalid_file():
+    response = client.post(
+        "/detect/video",
+        files={"video": ("clip.avi", b"not a video", "video/x-msvideo")}
+    )
+    assert response.status_code == 400
+
+
+def test_detect_video_rejects_oversized_upload(monkeypatch):
+    monkeypatch.setattr(main.settings, "video_max_bytes", 8)
+    
+    response = client.post(
+        "/detect/video",
+        files={"video": ("clip.avi", b"0123456789", "video/x-msvideo")}
+    )
+    
+    assert response.status_code == 413
+
+
+def test_detect_video_goes_through_admission(monkeypatch, tmp_path):
+    controller = AdmissionController(1, 0)
+    monkeypatch.setattr(main, "admission", controller)
+    path = tmp_path / "clip.avi"
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48))
+    writer.write(np.zeros((48, 64, 3), dtype=np.uint8))
+    writer.release()
+    
+    response = client.post(
+        "/detect/video",
+        files={"video": ("clip.avi", path.read_bytes(), "video/x-msvideo")},
+        data={"device": "cpu"}
+    )
+    
+    assert response.status_code == 200
+    stats = controller.get_stats()
+    assert stats.admitted["interactive"] == 1
+    assert stats.running == 0
+    
+    monkeypatch.setattr(main, "admission", AdmissionController(0, 0))
+    rejected = client.post(
+        "/detect/video",
+        files={"video": ("clip.avi", path.read_bytes(), "video/x-msvideo")}
+    )
+    assert rejected.status_code == 503
+
+
+def test_detect_stream_websocket():
+    img = np.zeros((100, 100, 3), dtype=np.uint8)
+    _, buffer = cv2.imencode('.jpg', img)
+    
+    with client.websocket_connect("/detect/stream?device=cpu&only_on_change=true") as websocket:
+        for _ in range(3):
+            websocket.send_bytes(buffer.tobytes())
+        websocket.send_bytes(b"not an image")
+        
+        first = websocket.receive_json()
+        error = websocket.receive_json()
+    
+    assert first["frameIndex"] == 0
+    assert first["result"]["humanDetected"] is False
+    assert error["frameIndex"] == 3
+    assert error["error"] is not None
+
+
+def test_cache_stats():
+    response = client.get("/stats/cache")
+    assert response.status_code == 200
+    data = response.json()
+    assert data is None or {"hits", "misses", "evictions"} <= set(data)
+
+
+def test_detect_compact_response():
+    response = client.post(
+        "/detect",
+        json={"image_data": create_test_image(), "device": "cpu"},
+        headers={"Accept": "application/vnd.human-detector.compact+json"}
+    )
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.human-detector.compact+json"
+    data = response.json()
+    assert data["humanDetected"] is False
+    assert data["boxes"] == []
+
+
+def test_detect_with_model_size():
+    response = client.post(
+        "/detect",
+        json={"image_data": create_test_image(), "device": "cpu", "model_size": "yolo11s.pt"}
+    )
+    assert response.status_code == 200
+    
+    stats = client.get("/stats/models").json()
+    assert "yolo11s.pt@cpu" in stats["loaded"]
+    assert stats["loads"] >= 1
+
+
+def test_detect_with_invalid_model_size():
+    response = client.post(
+        "/detect",
+        json={"image_data": create_test_image(), "device": "cpu", "model_size": "yolo99.pt"}
+    )
+    assert response.status_code == 422
+
+
+def test_metrics_endpoint():
+    client.post("/detect", json={"image_data": create_test_image(), "device": "cpu"})
+    
+    response = client.get("/metrics")
+    
+    assert response.status_code == 200
+    assert "human_detector_request_duration_seconds" in response.text
+    assert "human_detector_stage_duration_seconds" in response.text
+    assert "human_detector_requests_in_flight" in response.text
+
+
+def test_server_timing_header():
+    response = client.post("/detect", json={"image_data": create_test_image(), "device": "cpu"})
+    
+    assert response.status_code == 200
+    assert "total;dur=" in response.headers["Server-Timing"]
+    assert "read;dur=" in response.headers["Server-Timing"]
+
+
+def test_ready_reports_startup_progress(monkeypatch):
+    tracker = main.StartupTracker()
+    monkeypatch.setattr(main, "startup", tracker)
+    
+    with tracker.phase("service"):
+        pass
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["ready"] is False
+    
+    tracker.mark_ready()
+    response = client.get("/ready")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["ready"] is True
+    assert "service" in data["phases"]
+    assert data["secondsToReady"] >= 0
+
+
+def test_stream_id_reuses_results_for_still_frames():
+    img = np.full((120, 160, 3), 255, dtype=np.uint8)
+    _, buffer = cv2.imencode('.png', img)
+    params = {"device": "cpu", "stream_id": "test-camera"}
+    headers = {"Content-Type": "application/octet-stream"}
+    before = client.get("/stats/motion").json()
+    
+    first = client.post("/detect/raw", params=params, content=buffer.tobytes(), headers=headers)
+    second = client.post("/detect/raw", params=params, content=buffer.tobytes(), headers=headers)
+    
+    assert first.headers["X-Motion-Gate"] == "inferred"
+    assert second.headers["X-Motion-Gate"] == "reused"
+    assert second.json() == first.json()
+    after = client.get("/stats/motion").json()
+    assert after["framesReused"] == before["framesReused"] + 1
+    assert "X-Motion-Gate" not in client.post(
+        "/detect/raw", params={"device": "cpu"}, content=buffer.tobytes(), headers=headers
+    ).headers
+
+
+def test_reused_results_are_labelled_with_the_routed_device():
+    img = np.full((120, 160, 3), 255, dtype=np.uint8)
+    _, buffer = cv2.imencode('.png', img)
+    params = {"device": "auto", "stream_id": "auto-camera"}
+    headers = {"Content-Type": "application/octet-stream"}
+    
+    client.post("/detect/raw", params=params, content=buffer.tobytes(), headers=headers)
+    reused = client.post("/detect/raw", params=params, content=buffer.tobytes(), headers=headers)
+    
+    assert reused.headers["X-Motion-Gate"] == "reused"
+    assert REGISTRY.get_sample_value(
+        "human_detector_request_duration_seconds_count",
+        {"endpoint": "/detect/raw", "device": "auto", "model_size": main.detection_service.model_size.value}
+    ) is None
+
+
+def test_track_returns_track_ids_and_propagates_between_detections():
+    img = np.full((120, 160, 3), 255, dtype=np.uint8)
+    _, buffer = cv2.imencode('.png', img)
+    params = {"device": "cpu", "stream_id": "tracked-camera", "track": "true", "detect_every": 2}
+    headers = {"Content-Type": "application/octet-stream"}
+    
+    first = client.post("/detect/raw", params=params, content=buffer.tobytes(), headers=headers)
+    second = client.post("/detect/raw", params=params, content=buffer.tobytes(), headers=headers)
+    third = client.post("/detect/raw", params=params, content=buffer.tobytes(), headers=headers)
+    
+    assert [r.headers["X-Tracking"] for r in (first, second, third)] == ["detected", "propagated", "detected"]
+    track_ids = [[box["trackId"] for box in r.json()["boundingBoxes"]] for r in (first, second, third)]
+    assert track_ids[0] and track_ids[0] == track_ids[1] == track_ids[2]
+    assert client.get("/stats/tracking").json()["framesPropagated"] >= 1
+    
+    missing_stream = client.post("/detect/raw", params={"track": "true"}, content=buffer.tobytes(), headers=headers)
+    assert missing_stream.status_code == 400
+
+
+def test_job_api_runs_uploaded_archive(monkeypatch, tmp_path):
+    manager = main.JobManager(str(tmp_path / "jobs"), main._run_job_chunk)
+    monkeypatch.setattr(main, "job_manager", manager)
+    manager.start()
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("person.png", cv2.imencode('.png', np.full((120, 160, 3), 255, dtype=np.uint8))[1].tobytes())
+        archive.writestr("empty.png", cv2.imencode('.png', np.zeros((120, 160, 3), dtype=np.uint8))[1].tobytes())
+    
+    try:
+        submitted = client.post(
+            "/jobs/upload",
+            files={"archive": ("frames.zip", buffer.getvalue(), "application/zip")},
+            data={"device": "cpu"}
+        )
+        assert submitted.status_code == 202
+        job_id = submitted.json()["id"]
+        for _ in range(500):
+            status = client.get(f"/jobs/{job_id}").json()
+            if status["state"] == "completed":
+                break
+            time.sleep(0.01)
+    finally:
+        manager.shutdown()
+    
+    assert (status["total"], status["processed"]) == (2, 2)
+    results = [json.loads(line) for line in client.get(f"/jobs/{job_id}/results").text.splitlines()]
+    assert [r["result"]["humanDetected"] for r in results] == [True, False]
+    assert client.get("/jobs/unknown").status_code == 404
+    assert client.post("/jobs", json={"paths": ["/etc"]}).status_code == 400
+    
+    monkeypatch.setattr(main.settings, "job_archive_max_bytes", len(buffer.getvalue()) - 1)
+    too_large = client.post("/jobs/upload", files={"archive": ("frames.zip", buffer.getvalue(), "application/zip")})
+    assert too_large.status_code == 413
@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+from src.benchmarks.backends import FIXTURES_DIR, load_fixture_images
+from src.benchmarks.decode import benchmark_decode, box_agreement, parse_size
+
+
+def test_parse_size():
+    assert parse_size("4000x3000") == (4000, 3000)
+
+
+def test_box_agreement():
+    boxes = np.array([[0, 0, 10, 10, 0.9]], dtype=np.float32)
+    
+    assert box_agreement(boxes, boxes) == pytest.approx(1.0)
+    assert box_agreement(boxes, boxes + [5, 0, 5, 0, 0]) == pytest.approx(1 / 3)
+    assert box_agreement(boxes, boxes[:0]) == 0.0
+    assert box_agreement(boxes[:0], boxes[:0]) is None
+
+
+def test_benchmark_decode_reduces_large_images():
+    images = load_fixture_images(FIXTURES_DIR)[:1]
+    
+    results = benchmark_decode(images, [(2600, 1400), (800, 600)], rounds=1)
+    
+    assert [result["factor"] for result in results] == [4, 1]
+    assert results[0]["reduced_mb"] < results[0]["full_mb"]
+    assert results[1]["reduced_ms"] == results[1]["full_ms"]
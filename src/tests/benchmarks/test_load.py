@@ -0,0 +1,45 @@
+from src.benchmarks.load import compare, summarize
+
+
+def make_result(images_per_second: float, p95_ms: float) -> dict:
+    return {
+        "target": "service",
+        "model_size": "yolo11n.pt",
+        "device": "cpu",
+        "cpu_threads": 4,
+        "concurrency": 8,
+        "images_per_second": images_per_second,
+        "p95_ms": p95_ms
+    }
+
+
+def test_summarize_reports_percentiles_and_errors():
+    summary = summarize([0.01] * 98 + [0.1, None], wall_seconds=1.0)
+    
+    assert summary["requests"] == 100
+    assert summary["errors"] == 1
+    assert summary["images_per_second"] == 99.0
+    assert summary["p50_ms"] == 10.0
+    assert summary["p99_ms"] > summary["p50_ms"]
+
+
+def test_summarize_with_only_errors():
+    summary = summarize([None, None], wall_seconds=1.0)
+    
+    assert summary["errors"] == 2
+    assert summary["p95_ms"] is None
+
+
+def test_compare_flags_regressions_beyond_tolerance():
+    baseline = [make_result(100.0, 50.0)]
+    
+    assert compare([make_result(95.0, 52.0)], baseline, tolerance=0.1) == []
+    regressions = compare([make_result(80.0, 60.0)], baseline, tolerance=0.1)
+    assert len(regressions) == 2
+
+
+def test_compare_ignores_new_configurations():
+    result = make_result(1.0, 1000.0)
+    result["concurrency"] = 1
+    
+    assert compare([result], [make_result(100.0, 50.0)]) == []
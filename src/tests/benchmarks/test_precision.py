@@ -0,0 +1,25 @@
+import argparse
+import pytest
+from src.backend.models.inference_precision import InferencePrecision
+from src.backend.services.precision import ModelTuning
+from src.benchmarks.backends import FIXTURES_DIR, load_fixture_images
+from src.benchmarks.precision import compare_tunings, parse_tuning
+
+
+def test_parse_tuning_round_trips_describe():
+    tuning = ModelTuning(precision=InferencePrecision.BF16, channels_last=True, compile=True)
+    
+    assert parse_tuning(tuning.describe()) == tuning
+    assert parse_tuning("fp16") == ModelTuning(precision=InferencePrecision.FP16)
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_tuning("bf16+sparse")
+
+
+def test_channels_last_matches_fp32_on_fixtures():
+    images = load_fixture_images(FIXTURES_DIR)
+    
+    reference, channels_last = compare_tunings(images, [ModelTuning(channels_last=True)], rounds=1, warmup=0)
+    
+    assert reference["accurate"]
+    assert channels_last["effective_tuning"] == "fp32+channels-last"
+    assert channels_last["accurate"]
@@ -0,0 +1,131 @@
+import csv
+import json
+import tarfile
+import cv2
+import numpy as np
+import pytest
+from src.backend.cli import scan
+from src.backend.services.image_decoding import ImageTooLargeError
+
+
+@pytest.fixture
+def images(tmp_path):
+    directory = tmp_path / "images"
+    (directory / "nested").mkdir(parents=True)
+    cv2.imwrite(str(directory / "a.jpg"), np.full((120, 160, 3), 255, dtype=np.uint8))
+    cv2.imwrite(str(directory / "nested" / "b.png"), np.zeros((120, 160, 3), dtype=np.uint8))
+    (directory / "c.jpg").write_bytes(b"not an image")
+    (directory / "notes.txt").write_text("skipped")
+    return directory
+
+
+def read_jsonl(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_scans_directories_and_plain_tars_in_order(tmp_path, images):
+    archive = tmp_path / "images.tar"
+    with tarfile.open(archive, "w") as tar:
+        tar.add(images, arcname="images")
+    output = tmp_path / "results.jsonl"
+    
+    assert scan.main([str(images), str(archive), "--output", str(output), "--batch-size", "2"]) == 0
+    
+    results = read_jsonl(output)
+    names = [result["path"].rsplit("/", 1)[-1] for result in results]
+    assert names == ["a.jpg", "c.jpg", "b.png"] * 2
+    assert [result["index"] for result in results] == list(range(6))
+    assert results[0]["result"]["humanDetected"] is True
+    assert results[1]["error"] == "Failed to decode image"
+    assert results[3]["path"] == f"{archive}:images/a.jpg"
+    assert results[3]["result"] == results[0]["result"]
+
+
+def test_resume_continues_after_the_last_complete_record(tmp_path, images):
+    output = tmp_path / "results.jsonl"
+    scan.main([str(images), "--output", str(output)])
+    expected = output.read_text()
+    
+    first_line = expected.splitlines(keepends=True)[0]
+    output.write_text(first_line + '{"index": 1, "pa')
+    scan.main([str(images), "--output", str(output), "--resume"])
+    
+    assert output.read_text() == expected
+
+
+def test_csv_output_and_resume(tmp_path, images):
+    output = tmp_path / "results.csv"
+    scan.main([str(images), "--output", str(output)])
+    expected = output.read_text()
+    
+    output.write_text("".join(expected.splitlines(keepends=True)[:2]))
+    scan.main([str(images), "--output", str(output), "--resume"])
+    
+    assert output.read_text() == expected
+    rows = list(csv.DictReader(expected.splitlines()))
+    assert [row["human_detected"] for row in rows] == ["True", "", "False"]
+    assert json.loads(rows[0]["boxes"])[0][4] == pytest.approx(0.9)
+
+
+def test_csv_resume_handles_multi_line_errors(tmp_path):
+    output = tmp_path / "results.csv"
+    with open(output, "w", newline="") as stream:
+        writer = scan.ResultWriter(stream, "csv", header=True, sync=False)
+        writer.write(0, "a.jpg", ValueError("Failed to decode image\n7,b.jpg,,,,"))
+        writer.write(1, "b\nc.jpg", ValueError("broken\nfile"))
+    complete = output.read_bytes()
+    output.write_bytes(complete + b'2,d.jpg,,,,"partial\n')
+    
+    assert scan.completed_records(output, "csv", block_size=16) == 2
+    assert output.read_bytes() == complete
+    
+    output.write_bytes(b"index,path,human_detected,max_confidence,boxes,error\n0,a.jpg")
+    assert scan.completed_records(output, "csv") == 0
+    assert output.read_bytes().count(b"\n") == 1
+
+
+def test_inputs_start_after_skipped_archives_and_directories(tmp_path, images, monkeypatch):
+    archive = tmp_path / "images.tar.gz"
+    with tarfile.open(archive, "w:gz") as tar:
+        tar.add(images, arcname="images")
+    read = []
+    original = scan.iter_archive
+    monkeypatch.setattr(scan, "iter_archive", lambda *args: read.append(args[1:]) or original(*args))
+    
+    names = [name.rsplit("/", 1)[-1] for name, _ in scan.iter_inputs([str(images), str(archive), str(images)], 4)]
+    
+    assert names == ["c.jpg", "b.png", "a.jpg", "c.jpg", "b.png"]
+    assert read == [(1, None)]
+    assert [name for name, _ in scan.iter_inputs([str(images), str(images)], 5)] == [str(images / "nested" / "b.png")]
+
+
+def test_archive_members_over_the_byte_limit_are_errors(tmp_path, images):
+    archive = tmp_path / "images.tar.gz"
+    with tarfile.open(archive, "w:gz") as tar:
+        tar.add(images, arcname="images")
+    
+    inputs = {name.rsplit("/", 1)[-1]: data for name, data in scan.iter_inputs([str(archive)], max_bytes=20)}
+    
+    assert isinstance(inputs["a.jpg"], ImageTooLargeError)
+    assert isinstance(inputs["b.png"], ImageTooLargeError)
+    assert inputs["c.jpg"] == b"not an image"
+
+
+def test_scanner_pipelines_batches(images):
+    calls = []
+    
+    class RecordingService:
+        def decode_for_detection(self, data, timer, options):
+            return cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR), (1.0, 1.0)
+        
+        def detect_decoded(self, decoded, *args):
+            calls.append(len(decoded))
+            return [len(image) for image in decoded]
+    
+    scanner = scan.Scanner(RecordingService(), batch_size=2, workers=2, prefetch=2)
+    inputs = [(str(index), (images / "a.jpg").read_bytes()) for index in range(5)]
+    
+    outcomes = list(scanner.run(inputs))
+    
+    assert [name for name, _ in outcomes] == ["0", "1", "2", "3", "4"]
+    assert calls == [2, 2, 1]
@@ -18,3 +18,11 @@ def test_bounding_box_confidence_validation():
     
     with pytest.raises(ValidationError):
         BoundingBox(x1=10.0, y1=20.0, x2=100.0, y2=200.0, confidence=-0.1)
+
+
+def test_bounding_box_serializes_track_id_only_when_tracked():
+    untracked = BoundingBox(x1=10.0, y1=20.0, x2=100.0, y2=200.0, confidence=0.95)
+    tracked = BoundingBox(x1=10.0, y1=20.0, x2=100.0, y2=200.0, confidence=0.95, track_id=4)
+    
+    assert "trackId" not in untracked.model_dump(by_alias=True)
+    assert tracked.model_dump(by_alias=True)["trackId"] == 4
@@ -1,13 +1,14 @@
 import pytest
 import base64
 from pydantic import ValidationError
+from src.backend.config import settings
 from src.backend.models.detection_request import DetectionRequest
 
 
 def test_detection_request_valid():
     valid_image = base64.b64encode(b"fake image data").decode('utf-8')
     request = DetectionRequest(image_data=valid_image)
-    assert request.image_data == valid_image
+    assert request.image_data == b"fake image data"
 
 
 def test_detection_request_invalid_base64():
@@ -17,4 +18,30 @@ def test_detection_request_invalid_base64():
 
 def test_detection_request_empty_string():
     request = DetectionRequest(image_data="")
-    assert request.image_data == ""
+    assert request.image_data == b""
+
+
+def test_detection_request_rejects_oversized_payload_before_decoding(monkeypatch):
+    monkeypatch.setattr(settings, "image_max_bytes", 30)
+    
+    assert len(DetectionRequest(image_data=base64.b64encode(b"x" * 30).decode()).image_data) == 30
+    with pytest.raises(ValidationError, match="over the limit"):
+        # Not valid base64 either: the length alone rejects it.
+        DetectionRequest(image_data="!" * 48)
+
+
+def test_detection_request_regions_and_imgsz():
+    valid_image = base64.b64encode(b"fake image data").decode('utf-8')
+    request = DetectionRequest(
+        image_data=valid_image,
+        regions=[{"x1": 0, "y1": 0, "x2": 10, "y2": 10}, {"polygon": [[0, 0], [5, 0], [5, 5]]}],
+        imgsz=320
+    )
+    assert len(request.detection_options().regions) == 2
+    
+    with pytest.raises(ValidationError):
+        DetectionRequest(image_data=valid_image, imgsz=300)
+    with pytest.raises(ValidationError):
+        DetectionRequest(image_data=valid_image, regions=[{"x1": 10, "y1": 0, "x2": 5, "y2": 10}])
+    with pytest.raises(ValidationError):
+        DetectionRequest(image_data=valid_image, regions=[{"polygon": [[0, 0], [5, 0]]}])
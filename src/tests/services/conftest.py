@@ -0,0 +1,8 @@
+class FakeClock:
+    """A monotonic clock for tests; advance it by setting ``now``."""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self) -> float:
+        return self.now
@@ -0,0 +1,183 @@
+import asyncio
+import pytest
+from src.backend.models.request_priority import RequestPriority
+from src.backend.services.admission import (
+    AdmissionController,
+    AdmissionQueueFullError,
+    AdmissionTicket,
+    DeadlineExceededError,
+    RateLimit,
+    RateLimitedError,
+    TokenBucket
+)
+from src.tests.services.conftest import FakeClock
+
+
+INTERACTIVE = RequestPriority.INTERACTIVE
+BULK = RequestPriority.BULK
+
+
+async def hold(controller: AdmissionController, ticket: AdmissionTicket, order: list, release: asyncio.Event) -> None:
+    async with controller.admit(ticket):
+        order.append(ticket.client)
+        await release.wait()
+
+
+async def settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_token_bucket_refills_at_its_rate():
+    bucket = TokenBucket(RateLimit(rate=2.0, burst=4.0), now=0.0)
+    
+    assert bucket.take(3, now=0.0) == 0.0
+    assert bucket.take(3, now=0.0) == pytest.approx(1.0)
+    assert bucket.take(3, now=1.0) == 0.0
+    # Requests larger than the burst pass on a full bucket instead of never.
+    assert bucket.take(10, now=10.0) == 0.0
+
+
+def test_clients_are_rate_limited_separately():
+    clock = FakeClock()
+    controller = AdmissionController(4, 4, {INTERACTIVE: RateLimit(rate=1.0, burst=2.0)}, clock=clock)
+    
+    async def run(client: str, images: int = 1) -> None:
+        async with controller.admit(AdmissionTicket(client), images):
+            pass
+    
+    asyncio.run(run("a", 2))
+    with pytest.raises(RateLimitedError) as error:
+        asyncio.run(run("a"))
+    asyncio.run(run("b", 2))
+    clock.now = 1.0
+    asyncio.run(run("a"))
+    
+    assert error.value.status_code == 429
+    assert error.value.retry_after == 1
+    stats = controller.get_stats()
+    assert stats.rate_limited == {"interactive": 1, "bulk": 0}
+    assert stats.admitted["interactive"] == 3
+    assert stats.clients == 2
+
+
+def test_bulk_has_its_own_limit():
+    controller = AdmissionController(
+        4, 4, {INTERACTIVE: RateLimit(rate=0.0), BULK: RateLimit(rate=1.0, burst=1.0)}, clock=FakeClock()
+    )
+    
+    async def run(priority: RequestPriority) -> None:
+        async with controller.admit(AdmissionTicket("a", priority)):
+            pass
+    
+    asyncio.run(run(BULK))
+    with pytest.raises(RateLimitedError):
+        asyncio.run(run(BULK))
+    for _ in range(10):
+        asyncio.run(run(INTERACTIVE))
+
+
+def test_queued_interactive_requests_run_before_bulk():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queued=8)
+        release = asyncio.Event()
+        order = []
+        first = asyncio.create_task(hold(controller, AdmissionTicket("first"), order, release))
+        await settle()
+        waiting = [
+            asyncio.create_task(hold(controller, AdmissionTicket(name, priority), order, release))
+            for name, priority in [("bulk-1", BULK), ("interactive-1", INTERACTIVE), ("bulk-2", BULK), ("interactive-2", INTERACTIVE)]
+        ]
+        await settle()
+        assert controller.get_stats().queued == {"interactive": 2, "bulk": 2}
+        release.set()
+        await asyncio.gather(first, *waiting)
+        return order, controller.get_stats()
+    
+    order, stats = asyncio.run(scenario())
+    
+    assert order == ["first", "interactive-1", "interactive-2", "bulk-1", "bulk-2"]
+    assert stats.running == 0
+    assert stats.queued == {"interactive": 0, "bulk": 0}
+
+
+def test_full_queue_sheds_bulk_for_interactive():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queued=2)
+        release = asyncio.Event()
+        order = []
+        tasks = [asyncio.create_task(hold(controller, AdmissionTicket("running"), order, release))]
+        await settle()
+        for name, priority in [("bulk-1", BULK), ("bulk-2", BULK), ("interactive", INTERACTIVE), ("bulk-3", BULK)]:
+            tasks.append(asyncio.create_task(hold(controller, AdmissionTicket(name, priority), order, release)))
+            await settle()
+        release.set()
+        outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+        return order, outcomes, controller.get_stats()
+    
+    order, outcomes, stats = asyncio.run(scenario())
+    
+    assert order == ["running", "interactive", "bulk-1"]
+    assert isinstance(outcomes[2], AdmissionQueueFullError)
+    assert isinstance(outcomes[4], AdmissionQueueFullError)
+    assert stats.shed == {"interactive": 0, "bulk": 2}
+
+
+def test_queued_requests_are_dropped_at_their_deadline():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queued=8)
+        release = asyncio.Event()
+        order = []
+        running = asyncio.create_task(hold(controller, AdmissionTicket("running"), order, release))
+        await settle()
+        expiring = asyncio.create_task(
+            hold(controller, AdmissionTicket("expiring", deadline=controller.now() + 0.02), order, release)
+        )
+        patient = asyncio.create_task(hold(controller, AdmissionTicket("patient"), order, release))
+        await asyncio.sleep(0.05)
+        release.set()
+        outcomes = await asyncio.gather(running, expiring, patient, return_exceptions=True)
+        return order, outcomes, controller.get_stats()
+    
+    order, outcomes, stats = asyncio.run(scenario())
+    
+    assert order == ["running", "patient"]
+    assert isinstance(outcomes[1], DeadlineExceededError)
+    assert outcomes[1].status_code == 504
+    assert stats.dropped["interactive"] == 1
+    assert stats.running == 0
+
+
+def test_expired_requests_are_never_admitted():
+    clock = FakeClock()
+    clock.now = 5.0
+    controller = AdmissionController(max_concurrent=1, max_queued=1, clock=clock)
+    
+    async def run() -> None:
+        async with controller.admit(AdmissionTicket("late", deadline=4.0)):
+            pass
+    
+    with pytest.raises(DeadlineExceededError):
+        asyncio.run(run())
+    assert controller.get_stats().admitted["interactive"] == 0
+
+
+def test_cancelled_waiter_gives_up_its_place():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queued=8)
+        release = asyncio.Event()
+        order = []
+        running = asyncio.create_task(hold(controller, AdmissionTicket("running"), order, release))
+        await settle()
+        gone = asyncio.create_task(hold(controller, AdmissionTicket("gone"), order, release))
+        after = asyncio.create_task(hold(controller, AdmissionTicket("after"), order, release))
+        await settle()
+        gone.cancel()
+        release.set()
+        await asyncio.gather(running, gone, after, return_exceptions=True)
+        return order, controller.get_stats()
+    
+    order, stats = asyncio.run(scenario())
+    
+    assert order == ["running", "after"]
+    assert stats.running == 0
@@ -0,0 +1,130 @@
+import pytest
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from src.backend.services.human_detection_service import HumanDetectionService
+from src.backend.services.admission import DeadlineExceededError, request_deadline
+from src.backend.services.batch_scheduler import BatchScheduler
+from src.backend.models.device_type import DeviceType
+from src.backend.models.yolo_model_size import YoloModelSize
+
+
+@pytest.fixture
+def detection_service():
+    return HumanDetectionService(supported_devices=[DeviceType.CPU])
+
+
+def create_test_image() -> np.ndarray:
+    return np.zeros((100, 100, 3), dtype=np.uint8)
+
+
+def test_concurrent_requests_are_batched(detection_service):
+    scheduler = BatchScheduler(detection_service, max_batch_size=4, max_wait_ms=200)
+    
+    futures = [scheduler.submit(create_test_image(), DeviceType.CPU) for _ in range(4)]
+    responses = [future.result(timeout=30) for future in futures]
+    scheduler.shutdown()
+    
+    assert len(responses) == 4
+    assert all(response.human_detected is False for response in responses)
+    stats = scheduler.get_stats()
+    assert stats.images_processed == 4
+    assert stats.batches_processed < 4
+    assert max(stats.batch_size_histogram) <= 4
+
+
+def test_batch_size_is_bounded(detection_service):
+    scheduler = BatchScheduler(detection_service, max_batch_size=2, max_wait_ms=50)
+    
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        responses = list(executor.map(
+            lambda _: scheduler.detect(create_test_image(), DeviceType.CPU),
+            range(5)
+        ))
+    scheduler.shutdown()
+    
+    assert len(responses) == 5
+    stats = scheduler.get_stats()
+    assert stats.images_processed == 5
+    assert set(stats.batch_size_histogram) <= {1, 2}
+
+
+def test_unsupported_device_fails_each_request(detection_service):
+    scheduler = BatchScheduler(detection_service, max_batch_size=4, max_wait_ms=10)
+    
+    future = scheduler.submit(create_test_image(), DeviceType.GPU)
+    
+    with pytest.raises(ValueError, match="not supported"):
+        future.result(timeout=30)
+    scheduler.shutdown()
+
+
+def test_images_past_their_deadline_are_dropped_at_dequeue(detection_service):
+    scheduler = BatchScheduler(detection_service, max_batch_size=4, max_wait_ms=10, clock=lambda: 100.0)
+    
+    token = request_deadline.set(50.0)
+    try:
+        expired = scheduler.submit(create_test_image(), DeviceType.CPU)
+    finally:
+        request_deadline.reset(token)
+    token = request_deadline.set(150.0)
+    try:
+        live = scheduler.submit(create_test_image(), DeviceType.CPU)
+    finally:
+        request_deadline.reset(token)
+    
+    with pytest.raises(DeadlineExceededError):
+        expired.result(timeout=30)
+    assert live.result(timeout=30).human_detected is False
+    scheduler.shutdown()
+    assert scheduler.get_stats().expired == 1
+    assert scheduler.get_stats().images_processed == 1
+
+
+def test_submit_after_shutdown(detection_service):
+    scheduler = BatchScheduler(detection_service)
+    scheduler.shutdown()
+    
+    with pytest.raises(RuntimeError):
+        scheduler.submit(create_test_image(), DeviceType.CPU)
+
+
+def test_requests_are_routed_to_nearest_cpu_worker(detection_service):
+    scheduler = BatchScheduler(
+        detection_service,
+        default_cpu_threads=8,
+        cpu_worker_threads=[2, 8]
+    )
+    
+    assert scheduler.route_cpu_threads(1) == 2
+    assert scheduler.route_cpu_threads(4) == 8
+    assert scheduler.route_cpu_threads(32) == 8
+    assert scheduler.route_cpu_threads(None) == 8
+    scheduler.shutdown()
+
+
+def test_cpu_workers_use_their_own_thread_count(detection_service):
+    scheduler = BatchScheduler(detection_service, max_wait_ms=10)
+    
+    responses = [
+        scheduler.submit(create_test_image(), DeviceType.CPU, cpu_threads).result(timeout=30)
+        for cpu_threads in (1, 2)
+    ]
+    stats = scheduler.get_stats()
+    scheduler.shutdown()
+    
+    assert len(responses) == 2
+    assert set(stats.cpu_workers) == {1, 2}
+
+
+def test_mixed_model_sizes_in_one_batch(detection_service):
+    scheduler = BatchScheduler(detection_service, max_batch_size=4, max_wait_ms=200, default_cpu_threads=1)
+    
+    futures = [
+        scheduler.submit(create_test_image(), DeviceType.CPU, model_size=model_size)
+        for model_size in (YoloModelSize.NANO, YoloModelSize.SMALL, YoloModelSize.NANO)
+    ]
+    responses = [future.result(timeout=30) for future in futures]
+    scheduler.shutdown()
+    
+    assert len(responses) == 3
+    assert detection_service.models.is_loaded(YoloModelSize.SMALL, DeviceType.CPU)
@@ -0,0 +1,67 @@
+from src.backend.services.cpu_affinity import (
+    CpuAllocator,
+    available_cpus,
+    cgroup_cpu_quota,
+    effective_cpu_count,
+    numa_node_cpus,
+    parse_cpu_list
+)
+
+
+def test_available_cpus_is_not_empty():
+    assert len(available_cpus()) >= 1
+
+
+def test_allocations_are_disjoint_until_cores_run_out():
+    allocator = CpuAllocator([0, 1, 2, 3])
+    
+    first = allocator.allocate(2)
+    second = allocator.allocate(2)
+    third = allocator.allocate(1)
+    
+    assert first == {0, 1}
+    assert second == {2, 3}
+    assert third == {0}
+
+
+def test_allocation_is_capped_at_available_cores():
+    allocator = CpuAllocator([0, 1])
+    
+    assert allocator.allocate(8) == {0, 1}
+    assert allocator.allocate(0) == {0}
+
+
+def test_parses_kernel_cpu_lists():
+    assert parse_cpu_list("0-3,8,10-11\n") == [0, 1, 2, 3, 8, 10, 11]
+    assert parse_cpu_list("") == []
+
+
+def test_reads_numa_node_cpus(tmp_path):
+    (tmp_path / "node1").mkdir()
+    (tmp_path / "node1" / "cpulist").write_text("16-19,48-51\n")
+    
+    assert numa_node_cpus(1, root=str(tmp_path)) == [16, 17, 18, 19, 48, 49, 50, 51]
+
+
+def test_reads_cgroup_v2_quota(tmp_path):
+    (tmp_path / "cpu.max").write_text("250000 100000\n")
+    
+    assert cgroup_cpu_quota(str(tmp_path)) == 2.5
+    assert effective_cpu_count(list(range(64)), root=str(tmp_path)) == 3
+    assert effective_cpu_count([0, 1], root=str(tmp_path)) == 2
+
+
+def test_reads_cgroup_v1_quota(tmp_path):
+    (tmp_path / "cpu").mkdir()
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("400000\n")
+    (tmp_path / "cpu" / "cpu.cfs_period_us").write_text("100000\n")
+    
+    assert cgroup_cpu_quota(str(tmp_path)) == 4.0
+
+
+def test_unlimited_cgroup_leaves_every_cpu(tmp_path):
+    (tmp_path / "cpu.max").write_text("max 100000\n")
+    
+    assert cgroup_cpu_quota(str(tmp_path)) is None
+    assert cgroup_cpu_quota(str(tmp_path / "missing")) is None
+    assert effective_cpu_count(list(range(8)), root=str(tmp_path)) == 8
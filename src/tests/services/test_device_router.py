@@ -0,0 +1,140 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from src.backend.models.device_type import DeviceType
+from src.backend.services.device_router import DeviceRouter
+from src.tests.services.conftest import FakeClock
+
+
+class FakeBackend:
+    """Serves one image at a time, like a device whose work is serialized."""
+    
+    def __init__(self, seconds_per_image: float):
+        self.seconds_per_image = seconds_per_image
+        self.images = 0
+        self._lock = threading.Lock()
+    
+    def run(self, images: int) -> None:
+        with self._lock:
+            time.sleep(self.seconds_per_image * images)
+            self.images += images
+
+
+def measure(router: DeviceRouter, clock: FakeClock, device: DeviceType, seconds: float) -> None:
+    with router.route(device):
+        clock.now += seconds
+
+
+def test_explicit_devices_pass_through():
+    router = DeviceRouter(lambda: [DeviceType.GPU, DeviceType.CPU])
+    
+    with router.route(DeviceType.CPU) as device:
+        assert device == DeviceType.CPU
+        assert router.get_stats().devices["cpu"].queue_depth == 1
+    
+    stats = router.get_stats()
+    assert stats.devices["cpu"].queue_depth == 0
+    assert stats.devices["cpu"].routed == 0
+
+
+def test_unmeasured_devices_are_tried_with_accelerator_first():
+    clock = FakeClock()
+    router = DeviceRouter(lambda: [DeviceType.CPU, DeviceType.GPU], clock=clock)
+    
+    with router.route(DeviceType.AUTO) as first:
+        clock.now += 0.01
+    with router.route(DeviceType.AUTO) as second:
+        pass
+    
+    assert first == DeviceType.GPU
+    assert second == DeviceType.CPU
+
+
+def test_auto_picks_lowest_expected_completion():
+    clock = FakeClock()
+    router = DeviceRouter(lambda: [DeviceType.GPU, DeviceType.CPU], spill_queue_depth=100, clock=clock)
+    measure(router, clock, DeviceType.GPU, 0.01)
+    measure(router, clock, DeviceType.CPU, 0.05)
+    
+    with router.route(DeviceType.GPU, images=4):
+        # 5 images at 10ms on the GPU still beat 1 at 50ms on the CPU.
+        with router.route(DeviceType.AUTO) as device:
+            assert device == DeviceType.GPU
+        with router.route(DeviceType.GPU, images=2):
+            # 7 at 10ms no longer do.
+            with router.route(DeviceType.AUTO) as device:
+                assert device == DeviceType.CPU
+
+
+def test_saturated_accelerator_spills_to_cpu():
+    clock = FakeClock()
+    router = DeviceRouter(lambda: [DeviceType.GPU, DeviceType.CPU], spill_queue_depth=2, clock=clock)
+    measure(router, clock, DeviceType.GPU, 0.001)
+    measure(router, clock, DeviceType.CPU, 1.0)
+    
+    with router.route(DeviceType.AUTO, images=2) as busy:
+        with router.route(DeviceType.AUTO) as spilled:
+            pass
+    
+    assert busy == DeviceType.GPU
+    assert spilled == DeviceType.CPU
+    assert router.get_stats().spilled == 1
+
+
+def test_without_cpu_saturation_keeps_accelerator():
+    router = DeviceRouter(lambda: [DeviceType.GPU], spill_queue_depth=1)
+    
+    with router.route(DeviceType.AUTO):
+        with router.route(DeviceType.AUTO) as device:
+            assert device == DeviceType.GPU
+
+
+def test_latency_is_per_queued_image_and_smoothed():
+    clock = FakeClock()
+    router = DeviceRouter(lambda: [DeviceType.CPU], smoothing=0.5, clock=clock)
+    
+    measure(router, clock, DeviceType.CPU, 0.1)
+    with router.route(DeviceType.CPU):
+        # Waited behind one image: 0.4s over two images.
+        measure(router, clock, DeviceType.CPU, 0.4)
+        
+        assert router.get_stats().devices["cpu"].seconds_per_image == pytest.approx(0.15)
+
+
+def test_failures_do_not_update_latency():
+    router = DeviceRouter(lambda: [DeviceType.CPU])
+    
+    with pytest.raises(RuntimeError):
+        with router.route(DeviceType.AUTO):
+            raise RuntimeError("model failed")
+    
+    load = router.get_stats().devices["cpu"]
+    assert load.queue_depth == 0
+    assert load.seconds_per_image is None
+
+
+def test_no_available_device_is_an_error():
+    router = DeviceRouter(lambda: [])
+    
+    with pytest.raises(ValueError):
+        with router.route(DeviceType.AUTO):
+            pass
+
+
+def test_routing_favours_fast_backend_and_spills_under_load():
+    backends = {DeviceType.GPU: FakeBackend(0.002), DeviceType.CPU: FakeBackend(0.02)}
+    router = DeviceRouter(lambda: list(backends), spill_queue_depth=8)
+    
+    def request(_) -> DeviceType:
+        with router.route(DeviceType.AUTO) as device:
+            backends[device].run(1)
+        return device
+    
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        devices = list(pool.map(request, range(200)))
+    
+    stats = router.get_stats()
+    assert devices.count(DeviceType.GPU) > devices.count(DeviceType.CPU) > 0
+    assert stats.devices["cuda"].seconds_per_image < stats.devices["cpu"].seconds_per_image
+    assert all(load.queue_depth == 0 for load in stats.devices.values())
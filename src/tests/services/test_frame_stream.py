@@ -0,0 +1,79 @@
+import pytest
+import numpy as np
+import cv2
+from pathlib import Path
+from src.backend.services.frame_stream import FrameStream, VideoFrameReader
+from src.backend.models.bounding_box import BoundingBox
+from src.backend.models.detection_response import DetectionResponse
+
+
+def create_test_video(path: Path, frame_count: int = 10) -> str:
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48))
+    for i in range(frame_count):
+        writer.write(np.full((48, 64, 3), i * 20, dtype=np.uint8))
+    writer.release()
+    return str(path)
+
+
+def create_response(box_count: int) -> DetectionResponse:
+    boxes = [BoundingBox(x1=0, y1=0, x2=10, y2=10, confidence=0.9) for _ in range(box_count)]
+    return DetectionResponse(
+        human_detected=box_count > 0,
+        bounding_boxes=boxes,
+        max_confidence=0.9 if box_count else 0.0
+    )
+
+
+def test_frame_stride():
+    stream = FrameStream(frame_stride=3)
+    assert [i for i in range(10) if stream.should_process(i)] == [0, 3, 6, 9]
+
+
+def test_invalid_frame_stride():
+    with pytest.raises(ValueError):
+        FrameStream(frame_stride=0)
+
+
+def test_only_on_change():
+    stream = FrameStream(only_on_change=True)
+    
+    assert stream.should_emit(create_response(0)) is True
+    assert stream.should_emit(create_response(0)) is False
+    assert stream.should_emit(create_response(1)) is True
+    assert stream.should_emit(create_response(1)) is False
+    assert stream.should_emit(create_response(2)) is True
+
+
+def test_emits_everything_by_default():
+    stream = FrameStream()
+    assert all(stream.should_emit(create_response(0)) for _ in range(3))
+
+
+def test_video_reader_applies_stride(tmp_path):
+    reader = VideoFrameReader(create_test_video(tmp_path / "clip.avi"), frame_stride=4)
+    
+    frames = reader.read_batch(100)
+    reader.close()
+    
+    assert [index for index, _, _ in frames] == [0, 4, 8]
+    assert frames[0][2].shape == (48, 64, 3)
+    assert frames[1][1] == pytest.approx(400.0)
+
+
+def test_video_reader_batches(tmp_path):
+    reader = VideoFrameReader(create_test_video(tmp_path / "clip.avi"))
+    
+    sizes = []
+    while batch := reader.read_batch(4):
+        sizes.append(len(batch))
+    reader.close()
+    
+    assert sizes == [4, 4, 2]
+
+
+def test_video_reader_invalid_file(tmp_path):
+    path = tmp_path / "broken.avi"
+    path.write_bytes(b"not a video")
+    
+    with pytest.raises(ValueError, match="Failed to open video"):
+        VideoFrameReader(str(path))
@@ -4,6 +4,10 @@ import numpy as np
 import cv2
 from src.backend.services.human_detection_service import HumanDetectionService
 from src.backend.models.device_type import DeviceType
+from src.backend.models.yolo_model_size import YoloModelSize
+from src.backend.models.inference_backend import InferenceBackend
+from src.backend.models.detection_options import DetectionOptions
+from src.backend.models.region_of_interest import RegionOfInterest
 
 
 def create_test_image() -> str:
@@ -44,3 +48,116 @@ def test_unsupported_device():
     
     with pytest.raises(ValueError, match="not supported"):
         service.detect_humans(test_image, device=DeviceType.GPU)
+
+
+def test_detect_humans_accepts_raw_buffers():
+    service = HumanDetectionService(supported_devices=[DeviceType.CPU])
+    img = np.zeros((100, 100, 3), dtype=np.uint8)
+    _, buffer = cv2.imencode('.jpg', img)
+    
+    for image_data in (buffer.tobytes(), memoryview(buffer.tobytes()), buffer):
+        response = service.detect_humans(image_data, device=DeviceType.CPU)
+        assert response.human_detected is False
+
+
+def test_decode_image_rejects_empty_buffer():
+    service = HumanDetectionService(supported_devices=[DeviceType.CPU])
+    
+    with pytest.raises(ValueError, match="Failed to decode"):
+        service.decode_image(b"")
+
+
+def test_detect_humans_many_reports_per_item_errors():
+    service = HumanDetectionService(supported_devices=[DeviceType.CPU])
+    test_image = create_test_image()
+    
+    outcomes = service.detect_humans_many([
+        (test_image, DeviceType.CPU, None, None, None),
+        (b"not an image", DeviceType.CPU, None, None, None),
+        (test_image, DeviceType.GPU, None, None, None),
+        (test_image, DeviceType.CPU, None, None, None)
+    ])
+    
+    assert len(outcomes) == 4
+    assert outcomes[0].human_detected is False
+    assert isinstance(outcomes[1], ValueError)
+    assert isinstance(outcomes[2], ValueError)
+    assert outcomes[3].human_detected is False
+
+
+def test_model_sizes_are_loaded_on_first_use():
+    service = HumanDetectionService(supported_devices=[DeviceType.CPU], max_loaded_models=1)
+    assert service.models.loaded() == [(YoloModelSize.NANO, DeviceType.CPU)]
+    
+    response = service.detect_humans(create_test_image(), DeviceType.CPU, model_size=YoloModelSize.SMALL)
+    
+    assert response.human_detected is False
+    assert service.models.loaded() == [(YoloModelSize.SMALL, DeviceType.CPU)]
+
+
+def test_backend_fallback_is_recorded_per_model_size(monkeypatch):
+    service = HumanDetectionService(supported_devices=[DeviceType.CPU], backend=InferenceBackend.ONNX, preload=False)
+    
+    def resolve(model_size):
+        if model_size == YoloModelSize.SMALL:
+            raise RuntimeError("export failed")
+        return str(service.exporter.weights_path(model_size))
+    
+    monkeypatch.setattr(service.exporter, "resolve", resolve)
+    service.get_model(DeviceType.CPU, YoloModelSize.NANO)
+    service.get_model(DeviceType.CPU, YoloModelSize.SMALL)
+    
+    assert service.backends[DeviceType.CPU, YoloModelSize.NANO] == InferenceBackend.ONNX
+    assert service.backends[DeviceType.CPU, YoloModelSize.SMALL] == InferenceBackend.PYTORCH
+
+
+def test_disallowed_model_size():
+    service = HumanDetectionService(
+        supported_devices=[DeviceType.CPU],
+        allowed_model_sizes=[YoloModelSize.NANO]
+    )
+    
+    with pytest.raises(ValueError, match="not enabled"):
+        service.detect_humans(create_test_image(), DeviceType.CPU, model_size=YoloModelSize.XLARGE)
+
+
+def test_region_boxes_are_mapped_to_original_coordinates():
+    service = HumanDetectionService(supported_devices=[DeviceType.CPU])
+    image = np.zeros((300, 400, 3), dtype=np.uint8)
+    image[100:200, 200:300] = 255
+    _, buffer = cv2.imencode('.png', image)
+    options = DetectionOptions(regions=[RegionOfInterest(x1=200, y1=100, x2=300, y2=200)])
+    
+    response = service.detect_humans(buffer.tobytes(), DeviceType.CPU, options=options)
+    
+    assert response.human_detected is True
+    box = response.bounding_boxes[0]
+    assert (box.x1, box.y1, box.x2, box.y2) == pytest.approx((210, 110, 250, 190))
+    assert service.detect_humans(buffer.tobytes(), DeviceType.CPU).human_detected is False
+
+
+def test_large_jpegs_are_decoded_at_reduced_size():
+    service = HumanDetectionService(supported_devices=[DeviceType.CPU])
+    _, buffer = cv2.imencode('.jpg', np.full((1700, 2600, 3), 255, dtype=np.uint8))
+    
+    image, scale = service.decode_for_detection(buffer)
+    response = service.detect_humans(buffer.tobytes(), DeviceType.CPU)
+    
+    assert image.shape[:2] == (425, 650)
+    assert scale == (4.0, 4.0)
+    box = response.bounding_boxes[0]
+    assert (box.x1, box.y1, box.x2, box.y2) == pytest.approx((260, 170, 1300, 1530))
+
+
+def test_reduced_decode_maps_regions_like_a_full_decode():
+    image = np.zeros((2000, 2800, 3), dtype=np.uint8)
+    image[400:1800, 1000:2400] = 255
+    _, buffer = cv2.imencode('.jpg', image)
+    options = DetectionOptions(regions=[RegionOfInterest(x1=1000, y1=400, x2=2400, y2=1800)])
+    
+    reduced = HumanDetectionService(supported_devices=[DeviceType.CPU])
+    full = HumanDetectionService(supported_devices=[DeviceType.CPU], reduced_decode=False)
+    
+    assert reduced.decode_for_detection(buffer, options=options)[1] == (2.0, 2.0)
+    assert reduced.detect_humans(buffer.tobytes(), DeviceType.CPU, options=options) == \
+        full.detect_humans(buffer.tobytes(), DeviceType.CPU, options=options)
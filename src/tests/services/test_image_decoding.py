@@ -0,0 +1,112 @@
+import cv2
+import numpy as np
+import pytest
+import struct
+from src.backend.models.detection_options import DetectionOptions
+from src.backend.models.detection_response import DetectionResponse
+from src.backend.models.region_of_interest import RegionOfInterest
+from src.backend.services.image_decoding import (
+    ImageHeader,
+    ImageTooLargeError,
+    check_image,
+    decode_reduced,
+    image_header,
+    jpeg_size,
+    reduction_factor,
+    rescale
+)
+
+
+def encode(extension: str, height: int, width: int) -> np.ndarray:
+    _, buffer = cv2.imencode(extension, np.zeros((height, width, 3), dtype=np.uint8))
+    return buffer
+
+
+def test_jpeg_size_reads_the_frame_header():
+    assert jpeg_size(encode('.jpg', 480, 640)) == (640, 480)
+    
+    progressive = cv2.imencode(
+        '.jpg', np.zeros((90, 120, 3), dtype=np.uint8), [cv2.IMWRITE_JPEG_PROGRESSIVE, 1]
+    )[1]
+    assert jpeg_size(progressive) == (120, 90)
+
+
+def test_jpeg_size_ignores_other_and_broken_data():
+    jpeg = encode('.jpg', 480, 640)
+    
+    assert jpeg_size(encode('.png', 480, 640)) is None
+    assert jpeg_size(jpeg[:20]) is None
+    assert jpeg_size(np.frombuffer(b"", np.uint8)) is None
+
+
+@pytest.mark.parametrize("extension,image_format", [
+    ('.jpg', "jpeg"), ('.png', "png"), ('.bmp', "bmp"), ('.tiff', "tiff"), ('.webp', "webp")
+])
+def test_image_header_reads_the_size_without_decoding(extension, image_format):
+    assert image_header(encode(extension, 90, 120)) == ImageHeader(image_format, 120, 90)
+
+
+def test_image_header_reads_hand_built_headers():
+    gif = b"GIF89a" + struct.pack("<HH", 320, 200) + b"\x00" * 8
+    vp8x = b"RIFF" + struct.pack("<I", 22) + b"WEBPVP8X" + struct.pack("<I", 10) + b"\x00" * 4 \
+        + (7999).to_bytes(3, "little") + (5999).to_bytes(3, "little")
+    top_down_bmp = b"BM" + b"\x00" * 12 + struct.pack("<Iii", 40, 64, -48)
+    
+    assert image_header(gif) == ImageHeader("gif", 320, 200)
+    assert image_header(vp8x) == ImageHeader("webp", 8000, 6000)
+    assert image_header(top_down_bmp) == ImageHeader("bmp", 64, 48)
+
+
+def test_image_header_ignores_other_and_broken_data():
+    assert image_header(b"not an image") is None
+    assert image_header(b"") is None
+    assert image_header(encode('.png', 90, 120)[:20]) is None
+    assert image_header(b"GIF89a" + struct.pack("<HH", 0, 200)) is None
+
+
+def test_check_image_enforces_the_limits():
+    png = encode('.png', 90, 120)
+    
+    assert check_image(png, max_bytes=png.nbytes, max_pixels=120 * 90).format == "png"
+    with pytest.raises(ImageTooLargeError):
+        check_image(png, max_bytes=png.nbytes - 1)
+    with pytest.raises(ImageTooLargeError):
+        check_image(png, max_pixels=120 * 90 - 1)
+    with pytest.raises(ValueError, match="Failed to decode image"):
+        check_image(b"not an image")
+
+
+def test_reduction_factor_keeps_the_inference_size():
+    assert reduction_factor(640, 480) == 1
+    assert reduction_factor(1279, 720) == 1
+    assert reduction_factor(1920, 1080) == 2
+    assert reduction_factor(4000, 3000) == 4
+    assert reduction_factor(8000, 6000) == 8
+    assert reduction_factor(4000, 3000, DetectionOptions(imgsz=1280)) == 2
+    assert reduction_factor(4000, 3000, DetectionOptions(tile=True)) == 1
+
+
+def test_reduction_factor_uses_the_largest_region():
+    options = DetectionOptions(regions=[
+        RegionOfInterest(x1=0, y1=0, x2=700, y2=300),
+        RegionOfInterest(polygon=[(0, 0), (1300, 0), (0, 100)])
+    ])
+    
+    assert reduction_factor(4000, 3000, options) == 2
+    assert reduction_factor(4000, 3000, DetectionOptions(regions=options.regions[:1])) == 1
+
+
+def test_decode_reduced_reports_the_scale_to_the_original():
+    image, scale = decode_reduced(encode('.jpg', 1001, 1500), 1500, 1001, 4)
+    
+    assert image.shape[:2] == (251, 375)
+    assert scale == pytest.approx((4.0, 1001 / 251))
+
+
+def test_rescale_maps_boxes_back():
+    response = DetectionResponse.from_boxes(np.array([[10, 20, 30, 40, 0.8]], dtype=np.float32))
+    
+    box = rescale(response, (2.0, 4.0)).bounding_boxes[0]
+    
+    assert (box.x1, box.y1, box.x2, box.y2, box.confidence) == pytest.approx((20, 80, 60, 160, 0.8))
+    assert rescale(response, (1.0, 1.0)) is response
@@ -0,0 +1,46 @@
+import pytest
+import asyncio
+import threading
+from src.backend.services.inference_pool import InferencePool, InferencePoolFullError
+
+
+def test_run_returns_result():
+    pool = InferencePool(max_workers=2, max_queue_size=2)
+    
+    result = asyncio.run(pool.run(lambda x: x * 2, 21))
+    pool.shutdown()
+    
+    assert result == 42
+    assert pool.in_flight == 0
+
+
+def test_rejects_when_full():
+    pool = InferencePool(max_workers=1, max_queue_size=1, retry_after=3)
+    release = threading.Event()
+    
+    running = pool.submit(release.wait)
+    queued = pool.submit(release.wait)
+    
+    with pytest.raises(InferencePoolFullError) as exc_info:
+        pool.submit(release.wait)
+    assert exc_info.value.retry_after == 3
+    assert exc_info.value.capacity == 2
+    
+    release.set()
+    running.result(timeout=5)
+    queued.result(timeout=5)
+    pool.shutdown()
+    assert pool.in_flight == 0
+
+
+def test_exceptions_release_capacity():
+    pool = InferencePool(max_workers=1, max_queue_size=0)
+    
+    def fail():
+        raise ValueError("boom")
+    
+    with pytest.raises(ValueError, match="boom"):
+        pool.submit(fail).result(timeout=5)
+    
+    assert pool.submit(lambda: "ok").result(timeout=5) == "ok"
+    pool.shutdown()
@@ -0,0 +1,252 @@
+import io
+import json
+import os
+import tarfile
+import threading
+import time
+import zipfile
+import numpy as np
+import pytest
+from src.backend.models.detection_response import DetectionResponse
+from src.backend.models.job_request import JobRequest
+from src.backend.models.job_spec import JobSpec
+from src.backend.models.job_state import JobState
+from src.backend.services.job_queue import ArchiveTooLargeError, JobManager, JobNotFoundError
+
+
+def fake_runner(calls=None):
+    def run_chunk(tasks):
+        if calls is not None:
+            calls.append(len(tasks))
+        outcomes = []
+        for image_data, *_ in tasks:
+            if image_data == b"bad":
+                outcomes.append(ValueError("Failed to decode image"))
+            else:
+                confidence = len(image_data) / 100
+                outcomes.append(DetectionResponse.from_boxes(np.array([[0, 0, 1, 1, confidence]], dtype=np.float32)))
+        return outcomes
+    return run_chunk
+
+
+def wait_for(manager, job_id, states=(JobState.COMPLETED, JobState.FAILED, JobState.CANCELLED)):
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        status = manager.get(job_id)
+        if status.state in states:
+            return status
+        time.sleep(0.01)
+    raise AssertionError(f"Job stayed {status.state}")
+
+
+def read_results(manager, job_id):
+    return [json.loads(line) for line in b"".join(manager.results(job_id)).splitlines()]
+
+
+@pytest.fixture
+def images(tmp_path):
+    directory = tmp_path / "images"
+    (directory / "nested").mkdir(parents=True)
+    (directory / "a.jpg").write_bytes(b"x" * 10)
+    (directory / "nested" / "b.png").write_bytes(b"x" * 20)
+    (directory / "c.jpg").write_bytes(b"bad")
+    (directory / "notes.txt").write_bytes(b"not an image")
+    return directory
+
+
+def test_manifest_job_processes_directories_in_chunks(tmp_path, images):
+    calls = []
+    manager = JobManager(str(tmp_path / "jobs"), fake_runner(calls), chunk_size=2, input_dirs=[str(images)])
+    manager.start()
+    try:
+        job = manager.submit_manifest(JobRequest(paths=[str(images), str(images / "missing.jpg")]))
+        status = wait_for(manager, job.id)
+    finally:
+        manager.shutdown()
+    
+    assert status.state == JobState.COMPLETED
+    assert (status.total, status.processed, status.errors) == (4, 4, 2)
+    assert calls == [2, 1]
+    results = read_results(manager, job.id)
+    assert [os.path.basename(r["path"]) for r in results] == ["a.jpg", "c.jpg", "b.png", "missing.jpg"]
+    assert [r["index"] for r in results] == [0, 1, 2, 3]
+    assert results[0]["result"]["maxConfidence"] == pytest.approx(0.1)
+    assert results[1]["error"] and results[3]["error"]
+
+
+def test_manifest_paths_must_be_inside_input_dirs(tmp_path, images):
+    manager = JobManager(str(tmp_path / "jobs"), fake_runner(), input_dirs=[str(images / "nested")])
+    with pytest.raises(ValueError):
+        manager.submit_manifest(JobRequest(paths=[str(images / "a.jpg")]))
+    with pytest.raises(ValueError):
+        manager.submit_manifest(JobRequest(paths=[str(images / "nested" / ".." / "a.jpg")]))
+    with pytest.raises(ValueError):
+        JobManager(str(tmp_path / "jobs"), fake_runner()).submit_manifest(JobRequest(paths=[str(images)]))
+
+
+def test_manifest_skips_symlinks_leading_outside_input_dirs(tmp_path, images):
+    secret = tmp_path / "secret.jpg"
+    secret.write_bytes(b"x" * 50)
+    (images / "link.jpg").symlink_to(secret)
+    (images / "inside.jpg").symlink_to(images / "a.jpg")
+    
+    manager = JobManager(str(tmp_path / "jobs"), fake_runner(), input_dirs=[str(images)])
+    manager.start()
+    try:
+        job = manager.submit_manifest(JobRequest(paths=[str(images)]))
+        status = wait_for(manager, job.id)
+    finally:
+        manager.shutdown()
+    
+    paths = [os.path.basename(r["path"]) for r in read_results(manager, job.id)]
+    assert status.total == 4
+    assert "inside.jpg" in paths and "link.jpg" not in paths
+
+
+@pytest.mark.parametrize("kind", ["zip", "tar.gz"])
+def test_archive_job(tmp_path, kind):
+    buffer = io.BytesIO()
+    members = {"frames/1.jpg": b"x" * 30, "frames/readme.md": b"skip", "frames/2.jpg": b"x" * 40}
+    if kind == "zip":
+        with zipfile.ZipFile(buffer, "w") as archive:
+            for name, data in members.items():
+                archive.writestr(name, data)
+    else:
+        with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+            for name, data in members.items():
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                archive.addfile(info, io.BytesIO(data))
+    buffer.seek(0)
+    
+    manager = JobManager(str(tmp_path / "jobs"), fake_runner())
+    manager.start()
+    try:
+        job = manager.submit_archive(buffer, f"upload.{kind}", JobSpec())
+        status = wait_for(manager, job.id)
+    finally:
+        manager.shutdown()
+    
+    assert (status.state, status.total, status.processed) == (JobState.COMPLETED, 2, 2)
+    assert [r["path"] for r in read_results(manager, job.id)] == ["frames/1.jpg", "frames/2.jpg"]
+    with pytest.raises(ValueError):
+        manager.submit_archive(io.BytesIO(b"data"), "upload.rar", JobSpec())
+    
+    limited = JobManager(str(tmp_path / "limited"), fake_runner(), max_archive_bytes=10)
+    with pytest.raises(ArchiveTooLargeError):
+        limited.submit_archive(io.BytesIO(b"x" * 11), f"upload.{kind}", JobSpec())
+    assert not os.listdir(tmp_path / "limited")
+
+
+@pytest.mark.parametrize("kind", ["zip", "tar", "tar.gz"])
+def test_archive_members_over_the_size_limit_are_not_read(tmp_path, kind):
+    buffer = io.BytesIO()
+    members = {"small.jpg": b"x" * 30, "huge.jpg": b"x" * 1000}
+    if kind == "zip":
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+            for name, data in members.items():
+                archive.writestr(name, data)
+    else:
+        with tarfile.open(fileobj=buffer, mode="w:gz" if kind == "tar.gz" else "w") as archive:
+            for name, data in members.items():
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                archive.addfile(info, io.BytesIO(data))
+    buffer.seek(0)
+    
+    manager = JobManager(str(tmp_path / "jobs"), fake_runner(), max_image_bytes=100)
+    manager.start()
+    try:
+        job = manager.submit_archive(buffer, f"upload.{kind}", JobSpec())
+        status = wait_for(manager, job.id)
+    finally:
+        manager.shutdown()
+    
+    assert (status.state, status.processed, status.errors) == (JobState.COMPLETED, 2, 1)
+    results = read_results(manager, job.id)
+    assert "result" in results[0]
+    assert "over the limit of 100" in results[1]["error"]
+
+
+def test_interrupted_job_resumes_from_its_checkpoint(tmp_path, images):
+    root = str(tmp_path / "jobs")
+    manager = JobManager(root, fake_runner(), chunk_size=1, input_dirs=[str(images)])
+    manager.start()
+    job = manager.submit_manifest(JobRequest(paths=[str(images)]))
+    wait_for(manager, job.id)
+    manager.shutdown()
+    expected = read_results(manager, job.id)
+    
+    # Simulate a crash after the first checkpoint, with a partly written chunk after it.
+    record_path = os.path.join(root, job.id, "job.json")
+    with open(record_path) as record:
+        record_data = json.load(record)
+    first_line = len(open(os.path.join(root, job.id, "results.jsonl"), "rb").readline())
+    record_data["status"].update(state="running", processed=1, errors=0, finishedAt=None)
+    record_data["resultsBytes"] = first_line
+    with open(record_path, "w") as record:
+        json.dump(record_data, record)
+    with open(os.path.join(root, job.id, "results.jsonl"), "r+b") as results:
+        results.truncate(first_line + 5)
+    
+    calls = []
+    resumed = JobManager(root, fake_runner(calls), chunk_size=1, input_dirs=[str(images)])
+    resumed.start()
+    try:
+        status = wait_for(resumed, job.id)
+    finally:
+        resumed.shutdown()
+    
+    assert calls == [1, 1]
+    assert (status.state, status.processed, status.errors) == (JobState.COMPLETED, 3, 1)
+    assert read_results(resumed, job.id) == expected
+
+
+def test_jobs_yield_to_interactive_requests(tmp_path, images):
+    load = {"in_flight": 1}
+    calls = []
+    manager = JobManager(
+        str(tmp_path / "jobs"),
+        fake_runner(calls),
+        input_dirs=[str(images)],
+        interactive_load=lambda: load["in_flight"],
+        max_yield_seconds=5.0
+    )
+    manager.start()
+    try:
+        job = manager.submit_manifest(JobRequest(paths=[str(images / "a.jpg")]))
+        time.sleep(0.1)
+        assert calls == [] and manager.get(job.id).state == JobState.RUNNING
+        load["in_flight"] = 0
+        assert wait_for(manager, job.id).state == JobState.COMPLETED
+    finally:
+        manager.shutdown()
+
+
+def test_cancel_and_delete(tmp_path, images):
+    release = threading.Event()
+    runner = fake_runner()
+    
+    def blocking_runner(tasks):
+        release.wait(5)
+        return runner(tasks)
+    
+    manager = JobManager(str(tmp_path / "jobs"), blocking_runner, chunk_size=1, input_dirs=[str(images)])
+    manager.start()
+    try:
+        running = manager.submit_manifest(JobRequest(paths=[str(images)]))
+        queued = manager.submit_manifest(JobRequest(paths=[str(images)]))
+        wait_for(manager, running.id, states=(JobState.RUNNING,))
+        
+        assert manager.cancel(queued.id).state == JobState.CANCELLED
+        manager.cancel(running.id)
+        release.set()
+        status = wait_for(manager, running.id)
+    finally:
+        manager.shutdown()
+    
+    assert (status.state, status.processed) == (JobState.CANCELLED, 1)
+    manager.cancel(running.id)
+    with pytest.raises(JobNotFoundError):
+        manager.get(running.id)
+    assert not os.path.exists(tmp_path / "jobs" / running.id)
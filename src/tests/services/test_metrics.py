@@ -0,0 +1,39 @@
+import pickle
+from src.backend.services.metrics import StageTimer, optional_stage
+
+
+def test_stages_accumulate():
+    timer = StageTimer()
+    
+    timer.add("imdecode", 0.002)
+    timer.add("imdecode", 0.003)
+    with timer.stage("inference"):
+        pass
+    
+    assert abs(timer.stages["imdecode"] - 0.005) < 1e-9
+    assert "inference" in timer.stages
+
+
+def test_server_timing_header():
+    timer = StageTimer()
+    timer.add("inference", 0.0125)
+    
+    header = timer.server_timing()
+    
+    assert header.startswith("inference;dur=12.50")
+    assert ", total;dur=" in header
+
+
+def test_optional_stage_without_timer():
+    with optional_stage(None, "inference"):
+        pass
+
+
+def test_timer_survives_pickling():
+    timer = StageTimer()
+    timer.add("inference", 0.01)
+    
+    restored = pickle.loads(pickle.dumps(timer))
+    restored.add("inference", 0.01)
+    
+    assert abs(restored.stages["inference"] - 0.02) < 1e-9
@@ -0,0 +1,31 @@
+from src.backend.services.model_exporter import ModelExporter
+from src.backend.models.inference_backend import InferenceBackend
+from src.backend.models.yolo_model_size import YoloModelSize
+
+
+def test_pytorch_resolves_to_weights():
+    exporter = ModelExporter()
+    assert exporter.resolve(YoloModelSize.NANO) == "yolo11n.pt"
+
+
+def test_model_dir_is_used_for_weights(tmp_path):
+    exporter = ModelExporter(model_dir=str(tmp_path / "models"))
+    
+    assert exporter.resolve(YoloModelSize.SMALL) == str(tmp_path / "models" / "yolo11s.pt")
+    assert (tmp_path / "models").is_dir()
+
+
+def test_cached_onnx_export_is_reused(tmp_path):
+    cached = tmp_path / "yolo11n.onnx"
+    cached.write_bytes(b"cached")
+    exporter = ModelExporter(backend=InferenceBackend.ONNX, model_dir=str(tmp_path))
+    
+    assert exporter.resolve(YoloModelSize.NANO) == str(cached)
+
+
+def test_cached_int8_openvino_export_is_reused(tmp_path):
+    cached = tmp_path / "yolo11n_int8_openvino_model"
+    cached.mkdir()
+    exporter = ModelExporter(backend=InferenceBackend.OPENVINO, model_dir=str(tmp_path), int8=True)
+    
+    assert exporter.resolve(YoloModelSize.NANO) == str(cached)
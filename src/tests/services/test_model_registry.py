@@ -0,0 +1,67 @@
+import threading
+import pytest
+from src.backend.services.model_registry import ModelRegistry
+from src.backend.models.device_type import DeviceType
+from src.backend.models.yolo_model_size import YoloModelSize
+
+
+class CountingLoader:
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+    
+    def __call__(self, model_size, device):
+        with self._lock:
+            self.calls.append((model_size, device))
+        return object()
+
+
+def test_models_are_loaded_lazily_and_reused():
+    loader = CountingLoader()
+    registry = ModelRegistry(loader, max_loaded=2)
+    assert loader.calls == []
+    
+    first = registry.get(YoloModelSize.NANO, DeviceType.CPU)
+    second = registry.get(YoloModelSize.NANO, DeviceType.CPU)
+    
+    assert first is second
+    assert loader.calls == [(YoloModelSize.NANO, DeviceType.CPU)]
+
+
+def test_least_recently_used_model_is_evicted():
+    registry = ModelRegistry(CountingLoader(), max_loaded=2)
+    
+    registry.get(YoloModelSize.NANO, DeviceType.CPU)
+    registry.get(YoloModelSize.SMALL, DeviceType.CPU)
+    registry.get(YoloModelSize.NANO, DeviceType.CPU)
+    registry.get(YoloModelSize.LARGE, DeviceType.CPU)
+    
+    assert registry.loaded() == [
+        (YoloModelSize.NANO, DeviceType.CPU),
+        (YoloModelSize.LARGE, DeviceType.CPU)
+    ]
+    stats = registry.get_stats()
+    assert stats.loads == 3
+    assert stats.evictions == 1
+    assert stats.loaded == ["yolo11n.pt@cpu", "yolo11l.pt@cpu"]
+
+
+def test_concurrent_first_use_loads_once():
+    loader = CountingLoader()
+    registry = ModelRegistry(loader)
+    
+    threads = [
+        threading.Thread(target=registry.get, args=(YoloModelSize.MEDIUM, DeviceType.CPU))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert loader.calls == [(YoloModelSize.MEDIUM, DeviceType.CPU)]
+
+
+def test_max_loaded_must_be_positive():
+    with pytest.raises(ValueError):
+        ModelRegistry(CountingLoader(), max_loaded=0)
@@ -0,0 +1,101 @@
+import cv2
+import numpy as np
+from src.backend.models.detection_response import DetectionResponse
+from src.backend.services.motion_gate import (
+    THUMBNAIL_WIDTH,
+    MotionGate,
+    MotionGateRegistry,
+    encoded_thumbnail,
+    frame_thumbnail
+)
+from src.tests.services.conftest import FakeClock
+
+
+def scene(person_at: int = 0) -> np.ndarray:
+    frame = np.full((480, 640, 3), 90, dtype=np.uint8)
+    cv2.rectangle(frame, (person_at, 200), (person_at + 60, 400), (250, 250, 250), -1)
+    return frame
+
+
+def detection(confidence: float) -> DetectionResponse:
+    return DetectionResponse.from_boxes(np.array([[1, 2, 3, 4, confidence]], dtype=np.float32))
+
+
+def test_thumbnails_of_encoded_and_decoded_frames_match():
+    frame = scene(100)
+    _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 95])
+    
+    encoded = encoded_thumbnail(buffer)
+    decoded = frame_thumbnail(frame)
+    
+    assert encoded.shape == decoded.shape == (120, THUMBNAIL_WIDTH)
+    assert np.abs(encoded.astype(int) - decoded.astype(int)).max() < 25
+
+
+def test_unchanged_frames_reuse_the_last_result():
+    gate = MotionGate()
+    first = detection(0.9)
+    
+    assert gate.reuse(frame_thumbnail(scene(100))) is None
+    gate.record(frame_thumbnail(scene(100)), first)
+    
+    assert gate.reuse(frame_thumbnail(scene(100))) is first
+    assert gate.reuse(frame_thumbnail(scene(300))) is None
+
+
+def test_sensitivity_controls_what_counts_as_motion():
+    still = frame_thumbnail(scene(100))
+    moved = frame_thumbnail(scene(104))
+    
+    sensitive = MotionGate(min_changed_fraction=0.0)
+    sensitive.record(still, detection(0.9))
+    tolerant = MotionGate(min_changed_fraction=0.05)
+    tolerant.record(still, detection(0.9))
+    
+    assert sensitive.reuse(moved) is None
+    assert tolerant.reuse(moved) is not None
+
+
+def test_inference_is_forced_periodically():
+    clock = FakeClock()
+    thumbnail = frame_thumbnail(scene())
+    gate = MotionGate(refresh_frames=2, refresh_seconds=5.0, clock=clock)
+    gate.record(thumbnail, detection(0.9))
+    
+    assert gate.reuse(thumbnail) is not None
+    assert gate.reuse(thumbnail) is not None
+    assert gate.reuse(thumbnail) is None
+    
+    gate.record(thumbnail, detection(0.8))
+    clock.now = 5.0
+    assert gate.reuse(thumbnail) is None
+
+
+def test_results_are_only_reused_for_the_same_settings():
+    thumbnail = frame_thumbnail(scene())
+    gate = MotionGate()
+    gate.record(thumbnail, detection(0.9), key=("cpu", "yolo11n.pt"))
+    
+    assert gate.reuse(thumbnail, key=("cpu", "yolo11n.pt")) is not None
+    assert gate.reuse(thumbnail, key=("cpu", "yolo11x.pt")) is None
+
+
+def test_registry_is_bounded_and_expires_idle_streams():
+    clock = FakeClock()
+    registry = MotionGateRegistry(lambda: MotionGate(clock=clock), max_streams=2, ttl_seconds=60.0, clock=clock)
+    
+    first = registry.get("camera-1")
+    assert registry.get("camera-1") is first
+    registry.get("camera-2")
+    registry.get("camera-3")
+    assert registry.get_stats().streams == 2
+    assert registry.get("camera-1") is not first
+    
+    clock.now = 61.0
+    registry.get("camera-4")
+    assert registry.get_stats().streams == 1
+    
+    registry.count(reused=True)
+    registry.count(reused=False)
+    stats = registry.get_stats()
+    assert (stats.frames_reused, stats.frames_inferred) == (1, 1)
@@ -0,0 +1,91 @@
+import pytest
+import torch
+from src.backend.models.device_type import DeviceType
+from src.backend.models.inference_precision import InferencePrecision
+from src.backend.services.precision import ModelTuning, fallbacks, precision_supported, tune_model
+
+
+class TinyNetwork(torch.nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.conv = torch.nn.Conv2d(3, 4, 3, padding=1)
+    
+    def forward(self, x):
+        return self.conv(x), [x.mean()]
+
+
+def test_fp32_is_always_supported():
+    assert precision_supported(InferencePrecision.FP32, DeviceType.CPU)
+    assert precision_supported(InferencePrecision.FP32, DeviceType.GPU)
+
+
+def test_fallbacks_drop_compile_then_precision():
+    tuning = ModelTuning(precision=InferencePrecision.BF16, channels_last=True, compile=True)
+    
+    assert fallbacks(tuning) == [
+        tuning,
+        ModelTuning(precision=InferencePrecision.BF16, channels_last=True),
+        ModelTuning(channels_last=True),
+        ModelTuning()
+    ]
+    assert fallbacks(ModelTuning()) == [ModelTuning()]
+
+
+def test_default_tuning_leaves_network_untouched():
+    network = TinyNetwork()
+    
+    assert tune_model(network, DeviceType.CPU, ModelTuning()) == ModelTuning()
+    assert "forward" not in network.__dict__
+
+
+def test_channels_last_keeps_outputs():
+    network = TinyNetwork().eval()
+    image = torch.rand(2, 3, 16, 16)
+    with torch.inference_mode():
+        expected, _ = network(image)
+    
+    tuning = tune_model(network, DeviceType.CPU, ModelTuning(channels_last=True))
+    with torch.inference_mode():
+        actual, _ = network(image)
+    
+    assert tuning == ModelTuning(channels_last=True)
+    assert network.conv.weight.is_contiguous(memory_format=torch.channels_last)
+    assert torch.allclose(expected, actual, atol=1e-5)
+
+
+def test_autocast_outputs_are_fp32():
+    if not precision_supported(InferencePrecision.BF16, DeviceType.CPU):
+        pytest.skip("No native bf16 on this CPU")
+    network = TinyNetwork().eval()
+    
+    tuning = tune_model(network, DeviceType.CPU, ModelTuning(precision=InferencePrecision.BF16))
+    with torch.inference_mode():
+        features, (mean,) = network(torch.rand(1, 3, 16, 16))
+    
+    assert tuning.precision == InferencePrecision.BF16
+    assert features.dtype == torch.float32
+    assert mean.dtype == torch.float32
+
+
+def test_unsupported_precision_falls_back_to_fp32(monkeypatch):
+    monkeypatch.setattr("src.backend.services.precision.precision_supported", lambda precision, device: False)
+    
+    tuning = tune_model(TinyNetwork(), DeviceType.CPU, ModelTuning(precision=InferencePrecision.FP16, channels_last=True))
+    
+    assert tuning == ModelTuning(channels_last=True)
+
+
+def test_failed_compile_falls_back(monkeypatch):
+    def broken_compile(function, **kwargs):
+        def compiled(*args, **kwargs):
+            raise RuntimeError("no compiler")
+        return compiled
+    monkeypatch.setattr(torch, "compile", broken_compile)
+    network = TinyNetwork().eval()
+    
+    tuning = tune_model(network, DeviceType.CPU, ModelTuning(channels_last=True, compile=True))
+    with torch.inference_mode():
+        features, _ = network(torch.rand(1, 3, 16, 16))
+    
+    assert tuning == ModelTuning(channels_last=True)
+    assert features.shape == (1, 4, 16, 16)
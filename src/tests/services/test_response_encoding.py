@@ -0,0 +1,76 @@
+import json
+import msgpack
+import numpy as np
+from src.backend.models.batch_detection_item import BatchDetectionItem
+from src.backend.models.batch_detection_response import BatchDetectionResponse
+from src.backend.models.detection_response import DetectionResponse
+from src.backend.models.response_format import ResponseFormat
+from src.backend.services.response_encoding import encode_response, negotiate_format
+
+
+def create_response() -> DetectionResponse:
+    return DetectionResponse.from_boxes(np.array([
+        [10.0, 20.0, 30.0, 40.0, 0.9],
+        [50.5, 60.0, 70.0, 80.0, 0.6]
+    ], dtype=np.float32))
+
+
+def test_negotiate_format():
+    assert negotiate_format(None) == ResponseFormat.JSON
+    assert negotiate_format("*/*") == ResponseFormat.JSON
+    assert negotiate_format("application/msgpack") == ResponseFormat.MSGPACK
+    assert negotiate_format("application/x-msgpack, */*") == ResponseFormat.MSGPACK
+    assert negotiate_format(
+        "application/json;q=0.5, application/vnd.human-detector.compact+json"
+    ) == ResponseFormat.COMPACT_JSON
+    assert negotiate_format("application/msgpack;q=0") == ResponseFormat.JSON
+
+
+def test_from_boxes_matches_validated_model():
+    response = create_response()
+    
+    validated = DetectionResponse.model_validate(response.model_dump())
+    
+    assert validated == response
+    assert response.human_detected is True
+    assert response.max_confidence == np.float32(0.9)
+    assert len(response.bounding_boxes) == 2
+
+
+def test_compact_json_uses_flat_boxes():
+    response = create_response()
+    
+    document = json.loads(encode_response(response, ResponseFormat.COMPACT_JSON))
+    
+    assert document["humanDetected"] is True
+    assert document["boxFields"] == ["x1", "y1", "x2", "y2", "confidence"]
+    assert document["boxes"] == [10.0, 20.0, 30.0, 40.0, 0.9, 50.5, 60.0, 70.0, 80.0, 0.6]
+    assert len(encode_response(response, ResponseFormat.COMPACT_JSON)) < len(
+        encode_response(response, ResponseFormat.JSON)
+    )
+    assert "trackIds" not in document
+    
+    tracked = DetectionResponse.from_boxes(response.box_array(), [3, 7])
+    assert json.loads(encode_response(tracked, ResponseFormat.COMPACT_JSON))["trackIds"] == [3, 7]
+
+
+def test_msgpack_boxes_are_float32():
+    response = create_response()
+    
+    document = msgpack.unpackb(encode_response(response, ResponseFormat.MSGPACK))
+    boxes = np.frombuffer(document["boxes"], "<f4").reshape(-1, 5)
+    
+    np.testing.assert_array_equal(boxes, response.box_array())
+
+
+def test_compact_batch_and_cached_responses():
+    cached = DetectionResponse.model_validate_json(create_response().model_dump_json())
+    batch = BatchDetectionResponse(results=[
+        BatchDetectionItem(result=cached),
+        BatchDetectionItem(error="Failed to decode image")
+    ])
+    
+    document = json.loads(encode_response(batch, ResponseFormat.COMPACT_JSON))
+    
+    assert len(document["results"][0]["result"]["boxes"]) == 10
+    assert document["results"][1] == {"result": None, "error": "Failed to decode image"}
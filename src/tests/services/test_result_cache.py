@@ -0,0 +1,93 @@
+import time
+import numpy as np
+import cv2
+from src.backend.services.result_cache import InMemoryCacheStore, ResultCache
+from src.backend.services.human_detection_service import HumanDetectionService
+from src.backend.models.detection_response import DetectionResponse
+from src.backend.models.device_type import DeviceType
+
+
+def create_response() -> DetectionResponse:
+    return DetectionResponse(human_detected=False, bounding_boxes=[], max_confidence=0.0)
+
+
+class FailingStore:
+    name = "redis"
+    evictions = 0
+    
+    def get(self, key):
+        raise ConnectionError("redis unavailable")
+    
+    def set(self, key, value):
+        raise ConnectionError("redis unavailable")
+
+
+def test_key_depends_on_bytes_and_params():
+    key = ResultCache.make_key(b"image", "yolo11n.pt", 0.5, DeviceType.CPU)
+    
+    assert key == ResultCache.make_key(b"image", "yolo11n.pt", 0.5, DeviceType.CPU)
+    assert key != ResultCache.make_key(b"other", "yolo11n.pt", 0.5, DeviceType.CPU)
+    assert key != ResultCache.make_key(b"image", "yolo11n.pt", 0.6, DeviceType.CPU)
+    assert key != ResultCache.make_key(b"image", "yolo11n.pt", 0.5, DeviceType.GPU)
+
+
+def test_hits_and_misses():
+    cache = ResultCache(InMemoryCacheStore(max_bytes=1024 * 1024, ttl_seconds=60))
+    
+    assert cache.get("a") is None
+    cache.put("a", create_response())
+    assert cache.get("a") == create_response()
+    
+    stats = cache.get_stats()
+    assert stats.hits == 1
+    assert stats.misses == 1
+    assert stats.entries == 1
+
+
+def test_memory_bound_evicts_least_recently_used():
+    entry_size = len("a") + len(create_response().model_dump_json())
+    cache = ResultCache(InMemoryCacheStore(max_bytes=entry_size * 2, ttl_seconds=60))
+    
+    cache.put("a", create_response())
+    cache.put("b", create_response())
+    cache.get("a")
+    cache.put("c", create_response())
+    
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+    stats = cache.get_stats()
+    assert stats.evictions == 1
+    assert stats.size_bytes <= stats.max_bytes
+
+
+def test_entries_expire():
+    cache = ResultCache(InMemoryCacheStore(max_bytes=1024 * 1024, ttl_seconds=0.01))
+    
+    cache.put("a", create_response())
+    time.sleep(0.02)
+    
+    assert cache.get("a") is None
+    assert cache.get_stats().entries == 0
+
+
+def test_store_failures_are_misses():
+    cache = ResultCache(FailingStore())
+    
+    cache.put("a", create_response())
+    assert cache.get("a") is None
+    assert cache.get_stats().misses == 1
+
+
+def test_service_answers_repeated_images_from_cache():
+    cache = ResultCache(InMemoryCacheStore(max_bytes=1024 * 1024, ttl_seconds=60))
+    service = HumanDetectionService(supported_devices=[DeviceType.CPU], result_cache=cache)
+    _, buffer = cv2.imencode('.jpg', np.zeros((100, 100, 3), dtype=np.uint8))
+    
+    first = service.detect_humans(buffer.tobytes(), device=DeviceType.CPU)
+    second = service.detect_humans(buffer.tobytes(), device=DeviceType.CPU)
+    
+    assert first == second
+    stats = cache.get_stats()
+    assert stats.hits == 1
+    assert stats.misses == 1
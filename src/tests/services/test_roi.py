@@ -0,0 +1,72 @@
+import numpy as np
+from src.backend.models.detection_options import DetectionOptions
+from src.backend.models.detection_response import DetectionResponse
+from src.backend.models.region_of_interest import RegionOfInterest
+from src.backend.services.roi import Window, merge_windows, plan_windows, points_in_polygon
+
+
+def response_with(*boxes) -> DetectionResponse:
+    return DetectionResponse.from_boxes(np.array(boxes, dtype=np.float32).reshape(-1, 5))
+
+
+def test_no_options_runs_the_whole_image():
+    assert plan_windows(1080, 1920, None) is None
+    assert plan_windows(1080, 1920, DetectionOptions(imgsz=320)) is None
+
+
+def test_regions_are_clipped_to_the_image():
+    options = DetectionOptions(regions=[
+        RegionOfInterest(x1=-10, y1=10.5, x2=100, y2=50),
+        RegionOfInterest(polygon=[(150, 0), (300, 80), (150, 80)]),
+        RegionOfInterest(x1=500, y1=500, x2=600, y2=600)
+    ])
+    
+    windows = plan_windows(200, 200, options)
+    
+    assert [window[:4] for window in windows] == [(0, 10, 100, 50), (150, 0, 200, 80)]
+    assert windows[1].polygon is not None
+
+
+def test_tiles_cover_the_image_with_overlap():
+    windows = plan_windows(1080, 1920, DetectionOptions(imgsz=640, tile=True))
+    
+    assert all(window.x2 - window.x1 == 640 and window.y2 - window.y1 == 640 for window in windows)
+    assert max(window.x2 for window in windows) == 1920
+    assert max(window.y2 for window in windows) == 1080
+    assert len({window.x1 for window in windows}) == 4
+    assert len({window.y1 for window in windows}) == 2
+
+
+def test_small_images_are_not_tiled():
+    windows = plan_windows(480, 640, DetectionOptions(imgsz=640, tile=True))
+    
+    assert windows == [Window(0, 0, 640, 480)]
+
+
+def test_points_in_polygon():
+    square = np.array([[0, 0], [10, 0], [10, 10], [0, 10]], dtype=np.float32)
+    points = np.array([[5, 5], [15, 5], [0.5, 9.5], [-1, -1]], dtype=np.float32)
+    
+    assert points_in_polygon(points, square).tolist() == [True, False, True, False]
+
+
+def test_merge_offsets_boxes_and_filters_by_polygon():
+    polygon = np.array([[100, 100], [200, 100], [200, 200], [100, 200]], dtype=np.float32)
+    windows = [Window(100, 100, 300, 300, polygon)]
+    
+    merged = merge_windows(windows, [response_with([10, 10, 50, 50, 0.9], [150, 150, 190, 190, 0.8])])
+    
+    np.testing.assert_allclose(merged.box_array(), [[110, 110, 150, 150, 0.9]])
+
+
+def test_merge_removes_duplicates_across_tiles():
+    windows = [Window(0, 0, 100, 100), Window(60, 0, 160, 100)]
+    responses = [
+        response_with([70, 10, 100, 90, 0.6]),
+        response_with([10, 10, 40, 90, 0.9], [25, 10, 35, 30, 0.7])
+    ]
+    
+    merged = merge_windows(windows, responses)
+    
+    assert len(merged.bounding_boxes) == 2
+    assert merged.max_confidence == np.float32(0.9)
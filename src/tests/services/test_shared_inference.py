@@ -0,0 +1,140 @@
+import mmap
+import os
+import stat
+import threading
+import numpy as np
+import pytest
+from src.backend.models.detection_response import DetectionResponse
+from src.backend.models.device_type import DeviceType
+from src.backend.services.metrics import StageTimer
+from src.backend.services.shared_inference import FrameRing, InferenceServer, SharedInferenceClient
+
+
+class FakeModel:
+    """Reports each image's mean and whether it arrived through the shared ring."""
+    
+    def __init__(self):
+        self.shared = []
+    
+    def run_batch(self, images, device, cpu_threads, timers, model_size, imgsz, confidence):
+        if device != DeviceType.CPU:
+            raise ValueError(f"Device '{device.value}' is not available")
+        for timer in {id(timer): timer for timer in timers if timer is not None}.values():
+            timer.add("inference", 0.5)
+        self.shared.extend(isinstance(image.base, mmap.mmap) for image in images)
+        return [
+            DetectionResponse.from_boxes(np.array([[0, 0, 1, 1, image.mean() / 255]], dtype=np.float32))
+            for image in images
+        ]
+
+
+@pytest.fixture
+def served(tmp_path):
+    model = FakeModel()
+    server = InferenceServer(
+        str(tmp_path / "inference.sock"), model.run_batch, lambda: "ready", max_workers=4, stats=lambda: {"batches": 3}
+    )
+    server.start()
+    client = SharedInferenceClient(server.address, slots=2, slot_bytes=64 * 64 * 3)
+    yield model, server, client
+    client.close()
+    server.close()
+
+
+def image(value: int, size: int = 64) -> np.ndarray:
+    return np.full((size, size, 3), value, dtype=np.uint8)
+
+
+def test_ring_round_trips_strided_crops():
+    ring = FrameRing.create(slots=2, slot_bytes=1024)
+    reader = FrameRing.attach(ring.name, 2, 1024)
+    frame = np.arange(16 * 16 * 3, dtype=np.uint8).reshape(16, 16, 3)
+    crop = frame[4:12, 2:10]
+    
+    slot, shape, dtype = ring.write(ring.acquire(1)[0], crop)
+    
+    assert np.array_equal(reader.view(slot, shape, dtype), crop)
+    reader.close()
+    ring.close()
+
+
+def test_ring_hands_out_at_most_every_slot_at_once():
+    ring = FrameRing.create(slots=2, slot_bytes=16)
+    
+    taken = ring.acquire(5)
+    waiter = threading.Thread(target=ring.acquire, args=(1,))
+    waiter.start()
+    waiter.join(timeout=0.1)
+    blocked = waiter.is_alive()
+    ring.release(taken)
+    waiter.join(timeout=1)
+    
+    assert sorted(taken) == [0, 1]
+    assert blocked and not waiter.is_alive()
+    ring.close()
+
+
+def test_frames_run_in_server_through_the_ring(served):
+    model, server, client = served
+    timer = StageTimer()
+    
+    responses = client.detect_batch([image(51), image(102)], DeviceType.CPU, None, [timer, timer])
+    
+    assert [response.max_confidence for response in responses] == pytest.approx([0.2, 0.4])
+    assert model.shared == [True, True]
+    assert timer.stages["inference"] == pytest.approx(0.5)
+    assert client.stats() == {"batches": 3}
+    assert stat.S_IMODE(os.stat(server.address).st_mode) == 0o600
+
+
+def test_frames_beyond_the_ring_are_sent_inline(served):
+    model, _, client = served
+    
+    responses = client.detect_batch([image(51), image(102, size=128), image(153), image(204)], DeviceType.CPU)
+    
+    assert [response.max_confidence for response in responses] == pytest.approx([0.2, 0.4, 0.6, 0.8])
+    assert model.shared == [True, False, True, False]
+
+
+def test_concurrent_callers_share_the_connection(served):
+    _, _, client = served
+    results = {}
+    
+    def call(value):
+        results[value] = client.detect_batch([image(value)] * 3, DeviceType.CPU)[0].max_confidence
+    
+    threads = [threading.Thread(target=call, args=(value,)) for value in range(0, 250, 10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert results == pytest.approx({value: value / 255 for value in range(0, 250, 10)})
+
+
+def test_errors_are_raised_in_the_client(served):
+    _, _, client = served
+    
+    with pytest.raises(ValueError, match="not available"):
+        client.detect_batch([image(51)], DeviceType.GPU)
+    assert client.status() == "ready"
+
+
+def test_client_reconnects_after_server_restart(served):
+    model, server, client = served
+    client.detect_batch([image(51)], DeviceType.CPU)
+    server.close()
+    
+    restarted = InferenceServer(server.address, model.run_batch, lambda: "ready")
+    restarted.start()
+    try:
+        # A call racing the old connection's teardown may fail; the next one reconnects.
+        for _ in range(2):
+            try:
+                response = client.detect_batch([image(102)], DeviceType.CPU)[0]
+                break
+            except ConnectionError:
+                continue
+        assert response.max_confidence == pytest.approx(0.4)
+    finally:
+        restarted.close()
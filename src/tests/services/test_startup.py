@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+from src.backend.models.device_type import DeviceType
+from src.backend.models.yolo_model_size import YoloModelSize
+from src.backend.services.human_detection_service import HumanDetectionService
+from src.backend.config import Settings
+from src.backend.services.startup import StartupTracker, process_uptime, warm_up, warmup_plan
+
+
+class NoBoxes:
+    data = np.zeros((0, 6), dtype=np.float32)
+    
+    def cpu(self):
+        return self
+    
+    def numpy(self):
+        return self
+
+
+class EmptyResult:
+    boxes = NoBoxes()
+    speed = {}
+
+
+class RecordingModel:
+    def __init__(self, calls):
+        self.calls = calls
+    
+    def __call__(self, images, **kwargs):
+        self.calls.append(len(images))
+        return [EmptyResult() for _ in images]
+
+
+class FailingService(HumanDetectionService):
+    def _load_model(self, model_size, device):
+        raise RuntimeError("no weights")
+
+
+def test_process_uptime_is_measured():
+    uptime = process_uptime()
+    
+    assert uptime is None or uptime >= 0
+
+
+def test_tracker_reports_phases_until_ready():
+    tracker = StartupTracker()
+    with tracker.phase("service"):
+        pass
+    tracker.add("warmup", 0.5)
+    tracker.add("warmup", 0.25)
+    
+    status = tracker.get_status()
+    assert status.ready is False
+    assert status.seconds_to_ready is None
+    assert status.phases["warmup"] == 0.75
+    assert list(status.phases)[-2:] == ["service", "warmup"]
+    
+    tracker.mark_ready()
+    
+    status = tracker.get_status()
+    assert status.ready is True
+    assert tracker.wait(0)
+    assert status.seconds_to_ready >= 0
+
+
+def test_warm_up_runs_each_batch_size_per_cpu_worker(monkeypatch):
+    calls = []
+    monkeypatch.setattr(HumanDetectionService, "_load_model", lambda self, model_size, device: RecordingModel(calls))
+    service = HumanDetectionService(supported_devices=[DeviceType.CPU], preload=False)
+    tracker = StartupTracker()
+    
+    warm_up(service, tracker, [YoloModelSize.NANO, YoloModelSize.SMALL], [1, 4], [2, 8])
+    
+    assert calls == [1, 4, 1, 4] * 2
+    assert service.models.is_loaded(YoloModelSize.SMALL, DeviceType.CPU)
+    phases = tracker.phases()
+    assert "load yolo11n.pt@cpu" in phases
+    assert "warmup yolo11s.pt@cpu batch=4 threads=8" in phases
+
+
+def test_warm_up_drops_devices_that_cannot_load():
+    service = FailingService(supported_devices=[DeviceType.CPU], preload=False)
+    assert service.available_devices == [DeviceType.CPU]
+    
+    warm_up(service, StartupTracker(), [YoloModelSize.NANO], [1], [None])
+    
+    assert service.available_devices == []
+    with pytest.raises(ValueError, match="not available"):
+        service.get_model(DeviceType.CPU)
+
+
+def test_warmup_plan_defaults_and_limits():
+    plan = warmup_plan(Settings(batch_max_size=8, cpu_worker_threads=[]), 4)
+    
+    assert plan.batch_sizes == [1, 8]
+    assert plan.cpu_threads == [4]
+    
+    limited = Settings(
+        warmup_model_sizes=[YoloModelSize.NANO, YoloModelSize.XLARGE, YoloModelSize.SMALL, YoloModelSize.MEDIUM],
+        allowed_model_sizes=[YoloModelSize.NANO, YoloModelSize.SMALL, YoloModelSize.MEDIUM],
+        max_loaded_models=2,
+        cpu_worker_threads=[2, 8]
+    )
+    assert warmup_plan(limited, 4) == ([YoloModelSize.NANO, YoloModelSize.SMALL], [1, limited.batch_max_size], [2, 8])
@@ -0,0 +1,118 @@
+import numpy as np
+from src.backend.models.detection_response import DetectionResponse
+from src.backend.services.tracker import StreamTracker, TrackerRegistry, greedy_match, iou_matrix
+from src.tests.services.conftest import FakeClock
+
+
+def detections(*rows) -> DetectionResponse:
+    return DetectionResponse.from_boxes(np.array(rows, dtype=np.float32).reshape(-1, 5))
+
+
+def test_iou_and_greedy_matching():
+    a = np.array([[0, 0, 10, 10], [20, 0, 30, 10]], dtype=np.float32)
+    b = np.array([[21, 0, 31, 10, 0.9], [0, 0, 10, 10, 0.9]], dtype=np.float32)
+    iou = iou_matrix(a, b)
+    
+    assert iou[0, 1] == 1.0 and iou[0, 0] == 0.0
+    assert sorted(greedy_match(iou, 0.3)) == [(0, 1), (1, 0)]
+    assert greedy_match(iou_matrix(a, b[:0]), 0.3) == []
+
+
+def test_track_ids_are_stable_across_detections():
+    tracker = StreamTracker(detect_every=1)
+    ids = []
+    for step in range(3):
+        frame, due = tracker.next_frame()
+        assert due
+        response = tracker.update(frame, detections(
+            [10 + step * 5, 10, 50 + step * 5, 90, 0.9],
+            [200, 10, 240, 90, 0.8]
+        ), 0.5)
+        ids.append(response.track_ids())
+    
+    assert ids[0] == [1, 2]
+    assert ids[1] == ids[2] == ids[0]
+
+
+def test_detector_runs_every_n_frames_and_tracks_are_propagated():
+    tracker = StreamTracker(detect_every=3)
+    schedule = []
+    for step in range(7):
+        frame, due = tracker.next_frame()
+        schedule.append(due)
+        if due:
+            response = tracker.update(frame, detections([10 + step * 6, 10, 50 + step * 6, 90, 0.9]), 0.5)
+        else:
+            response = tracker.propagate(frame)
+    
+    assert schedule == [True, False, False, True, False, False, True]
+    # After the second detection the track moves 6px per frame, so propagation keeps up.
+    frame, due = tracker.next_frame()
+    propagated = tracker.propagate(frame)
+    np.testing.assert_allclose(propagated.box_array()[0, :4], [10 + 7 * 6, 10, 50 + 7 * 6, 90], atol=3)
+    assert propagated.track_ids() == response.track_ids()
+    assert tracker.next_frame(detect_every=1)[1]
+
+
+def test_propagated_boxes_stay_inside_the_frame():
+    tracker = StreamTracker(detect_every=10)
+    for step in range(2):
+        frame, _ = tracker.next_frame(detect_every=1)
+        tracker.update(frame, detections([20 + step * 20, 20 - step * 10, 60 + step * 20, 90, 0.9]), 0.5)
+    
+    frame, _ = tracker.next_frame()
+    for _ in range(4):
+        frame, _ = tracker.next_frame()
+    
+    np.testing.assert_allclose(tracker.propagate(frame, (100, 80)).box_array()[0, :4], [90, 0, 100, 80])
+
+
+def test_low_confidence_boxes_only_continue_existing_tracks():
+    tracker = StreamTracker(detect_every=1)
+    frame, _ = tracker.next_frame()
+    first = tracker.update(frame, detections([10, 10, 50, 90, 0.9], [200, 10, 240, 90, 0.2]), 0.5)
+    assert first.track_ids() == [1]
+    
+    frame, _ = tracker.next_frame()
+    occluded = tracker.update(frame, detections([12, 10, 52, 90, 0.3]), 0.5)
+    assert occluded.track_ids() == [1]
+    assert occluded.bounding_boxes[0].confidence == np.float32(0.3)
+
+
+def test_lost_tracks_expire_and_settings_changes_restart_tracking():
+    tracker = StreamTracker(detect_every=1, max_lost_frames=2)
+    frame, _ = tracker.next_frame()
+    tracker.update(frame, detections([10, 10, 50, 90, 0.9]), 0.5)
+    for _ in range(3):
+        frame, _ = tracker.next_frame()
+        assert tracker.update(frame, detections(), 0.5).track_ids() is None
+    frame, _ = tracker.next_frame()
+    assert tracker.update(frame, detections([10, 10, 50, 90, 0.9]), 0.5).track_ids() == [2]
+    
+    frame, due = tracker.next_frame(key=("cpu", "yolo11x.pt"))
+    assert due
+    assert tracker.propagate(frame).bounding_boxes == []
+
+
+def test_failed_detection_is_retried_on_the_next_frame():
+    tracker = StreamTracker(detect_every=5)
+    assert tracker.next_frame()[1]
+    tracker.reschedule()
+    assert tracker.next_frame()[1]
+
+
+def test_registry_counts_frames_and_expires_streams():
+    clock = FakeClock()
+    registry = TrackerRegistry(StreamTracker, max_streams=1, ttl_seconds=60.0, clock=clock)
+    
+    first = registry.get("camera-1")
+    assert registry.get("camera-1") is first
+    registry.get("camera-2")
+    assert registry.get("camera-1") is not first
+    
+    clock.now = 61.0
+    registry.get("camera-3")
+    registry.count(detected=True)
+    registry.count(detected=False)
+    stats = registry.get_stats()
+    assert (stats.streams, stats.frames_detected, stats.frames_propagated) == (1, 1, 1)
@@ -0,0 +1,17 @@
+import pytest
+from pydantic import ValidationError
+from src.backend.config import CPU_THREADS_DEFAULT, Settings
+
+
+def test_cpu_threads_are_split_between_web_workers(monkeypatch):
+    monkeypatch.setenv("WEB_CONCURRENCY", "2")
+    
+    assert Settings().cpu_threads == max(1, CPU_THREADS_DEFAULT // 2)
+    assert Settings(cpu_threads=8).cpu_threads == 8
+
+
+def test_invalid_web_concurrency_is_reported(monkeypatch):
+    monkeypatch.setenv("WEB_CONCURRENCY", "auto")
+    
+    with pytest.raises(ValidationError, match="WEB_CONCURRENCY must be an integer, got 'auto'"):
+        Settings()
@@ -75,3 +75,15 @@ def test_timing_metric_displayed(page: Page):
 
     expect(page.locator("text=Analysis Time")).to_be_visible()
     expect(page.locator("text=/\\d+ms/")).to_be_visible()
+
+def test_multiple_images_show_throughput(page: Page):
+    wait_for_streamlit(page)
+
+    image_paths = sorted((FIXTURES_DIR / "without_humans").glob("*.jpg"))
+    page.locator('input[type="file"]').set_input_files([str(path) for path in image_paths])
+    time.sleep(2)
+    page.get_by_role("button", name="🔍 Detect Humans").click()
+
+    expect(page.locator("text=Throughput")).to_be_visible(timeout=30000)
+    expect(page.locator("text=Latency per Image")).to_be_visible()
+    expect(page.locator("text=/\\d+\\.\\d img\\/s/")).to_be_visible()